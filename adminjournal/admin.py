@@ -1,8 +1,20 @@
+from django.conf import settings
+from django.conf.urls import url
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseRedirect, StreamingHttpResponse
+from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext_lazy as _
 
-from .models import Entry
+from . import exporting
+from .codec import decode_payload
+from .filters import AppLabelListFilter, UserReprListFilter
+from .importing import FORMAT_JSONL
+from .models import DailyCount, Entry
+from .paginator import CURSOR_VAR, JournalPaginator, parse_cursor
 
 
 try:
@@ -11,6 +23,18 @@ except ImportError:
     from django.core.urlresolvers import reverse
 
 
+class ExportChangeList(ChangeList):
+    """
+    Changelist used by the export, only the (filtered) queryset is needed.
+    """
+
+    def get_results(self, request):
+        """
+        `get_results` is overwritten to skip the paginator and its counts.
+        """
+        pass
+
+
 @admin.register(Entry)
 class EntryAdmin(admin.ModelAdmin):
     search_fields = ('user_repr',)
@@ -18,13 +42,88 @@ class EntryAdmin(admin.ModelAdmin):
         '__str__', 'action', 'content_type_repr', 'user_repr', 'object_id',
         'lazy_description'
     )
-    list_filter = ('action', 'content_type__app_label', 'user_repr')
+    list_filter = ('action', AppLabelListFilter, UserReprListFilter)
     date_hierarchy = 'timestamp'
     readonly_fields = (
-        'timestamp', 'action', 'user', 'user_repr', 'content_type', 'content_type_repr',
-        'object_id', 'object_repr', 'description', 'payload'
+        'timestamp', 'action', 'get_user', 'user_repr', 'get_content_type',
+        'content_type_repr',
+        'object_id', 'object_repr', 'description', 'decoded_payload'
     )
 
+    @property
+    def show_full_result_count(self):
+        """
+        The unfiltered number of entries is not counted when using the
+        ``ADMINJOURNAL_FAST_PAGINATION``.
+        """
+        return not getattr(settings, 'ADMINJOURNAL_FAST_PAGINATION', False)
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        """
+        If ``ADMINJOURNAL_FAST_PAGINATION`` is enabled, the `JournalPaginator`
+        is used to estimate the number of entries and to support keyset pagination.
+        """
+        if not getattr(settings, 'ADMINJOURNAL_FAST_PAGINATION', False):
+            return super(EntryAdmin, self).get_paginator(
+                request, queryset, per_page, orphans, allow_empty_first_page)
+
+        return JournalPaginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            cursor=getattr(request, 'adminjournal_cursor', None)
+        )
+
+    def get_changelist(self, request, **kwargs):
+        if getattr(request, 'adminjournal_export', False):
+            return ExportChangeList
+        return super(EntryAdmin, self).get_changelist(request, **kwargs)
+
+    def changelist_view(self, request, extra_context=None):
+        """
+        The keyset cursor is removed from the GET parameters before the changelist
+        is built, the changelist would treat it as filter otherwise.
+        """
+        if CURSOR_VAR in request.GET:
+            request.GET = request.GET.copy()
+            request.adminjournal_cursor = parse_cursor(request.GET.pop(CURSOR_VAR)[0])
+
+        return super(EntryAdmin, self).changelist_view(request, extra_context)
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            url(
+                r'^export/$', self.admin_site.admin_view(self.export_view),
+                name='%s_%s_export' % info),
+        ] + super(EntryAdmin, self).get_urls()
+
+    def export_view(self, request):
+        """
+        Streams the entries of the changelist (using the same filters and search)
+        as JSON lines or CSV file (``format`` parameter). Payloads are decoded.
+        """
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+
+        request.GET = request.GET.copy()
+        request.adminjournal_export = True
+        format = request.GET.pop('format', [FORMAT_JSONL])[0]
+        if format not in exporting.CONTENT_TYPES:
+            format = FORMAT_JSONL
+
+        try:
+            queryset = self.get_changelist_instance(request).get_queryset(request)
+        except IncorrectLookupParameters:
+            return HttpResponseRedirect(reverse('admin:adminjournal_entry_changelist'))
+        lines = exporting.dump_records(
+            exporting.iter_records(queryset, decode=True), format)
+
+        response = StreamingHttpResponse(lines, content_type=exporting.CONTENT_TYPES[format])
+        response['Content-Disposition'] = 'attachment; filename="adminjournal-{}.{}"'.format(
+            timezone.now().strftime('%Y%m%d%H%M%S'), format)
+        return response
+
     def has_add_permission(self, request, obj=None):
         """
         `has_add_permission` is overwritten to ensure no entries can be added.
@@ -42,18 +141,25 @@ class EntryAdmin(admin.ModelAdmin):
         Helper to return the human readable entry description. If no description
         is available, the payload will be returned.
         """
-        return str(obj.description or obj.payload or 'n/a')
+        return str(obj.description or decode_payload(obj.payload) or 'n/a')
     lazy_description.short_description = _('Entry description')
 
+    def decoded_payload(self, obj):
+        """
+        Helper to show the payload with decoded values (see `adminjournal.codec`).
+        """
+        return decode_payload(obj.payload)
+    decoded_payload.short_description = _('Payload')
+
     def object_repr(self, obj):
         """
         Helper to get the str-representation of the logged object.
         """
-        if not obj.object_id or not obj.content_type:
+        if not obj.object_id or not obj.content_type_id:
             return 'n/a'
 
         try:
-            instance = obj.content_type.get_object_for_this_type(pk=obj.object_id)
+            instance = obj.get_content_type().get_object_for_this_type(pk=obj.object_id)
 
             if instance._meta.model in self.admin_site._registry:
                 return mark_safe('<a href="{}">{}</a>'.format(
@@ -68,3 +174,24 @@ class EntryAdmin(admin.ModelAdmin):
         except:
             return 'n/a'
     object_repr.short_description = _('Object')
+
+
+@admin.register(DailyCount)
+class DailyCountAdmin(admin.ModelAdmin):
+    list_display = ('date', 'action', 'content_type_repr', 'user_repr', 'count')
+    list_filter = ('action', UserReprListFilter)
+    date_hierarchy = 'date'
+    search_fields = ('user_repr', 'content_type_repr')
+    readonly_fields = ('date', 'user_repr', 'content_type_repr', 'action', 'count')
+
+    def has_add_permission(self, request, obj=None):
+        """
+        Daily counts are calculated from the entries, see `adminjournal.rollup`.
+        """
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        """
+        Daily counts are calculated from the entries, see `adminjournal.rollup`.
+        """
+        return False
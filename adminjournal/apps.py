@@ -1,6 +1,8 @@
 from django.apps import AppConfig
 from django.conf import settings
 from django.contrib import admin
+from django.core.signals import request_finished, setting_changed
+from django.db.models.signals import post_migrate
 
 from .monkeypatch import patch_admin_site
 
@@ -13,6 +15,32 @@ class AdminjournalConfig(AppConfig):
         When loading the adminjournal app, we patch the Django admin site to
         ensure every model admin is hooked to the admin journal mixin if the
         setting ``ADMINJOURNAL_PATCH_ADMINSITE`` is set to True (default).
+
+        The caches of `adminjournal.entry` are warmed and cleared if the database
+        is migrated or flushed. In addition, the facets for the list filters and
+        the daily counts (if ``ADMINJOURNAL_ROLLUP`` is enabled) are updated
+        whenever entries are persisted to the database. Entries of rolled back
+        transactions buffered by `adminjournal.persistence_backends.buffered_db`
+        are written when the request is finished. The foreign key constraints of
+        the journal are synced after every migration (see `adminjournal.constraints`).
         """
         if getattr(settings, 'ADMINJOURNAL_PATCH_ADMINSITE', True):
             patch_admin_site(admin.site)
+
+        from .constraints import sync_foreign_key_constraints
+        from .entry import clear_caches, warm_caches
+        from .facets import record_persisted
+        from .persistence_backends.buffered_db import flush_rolled_back
+        from .rollup import increment_persisted
+        from .signals import entries_persisted
+        entries_persisted.connect(record_persisted, dispatch_uid='adminjournal_facets')
+        entries_persisted.connect(increment_persisted, dispatch_uid='adminjournal_rollup')
+
+        post_migrate.connect(clear_caches, dispatch_uid='adminjournal_entry_caches')
+        post_migrate.connect(
+            sync_foreign_key_constraints, sender=self,
+            dispatch_uid='adminjournal_foreign_key_constraints')
+        setting_changed.connect(clear_caches, dispatch_uid='adminjournal_entry_caches')
+        request_finished.connect(
+            flush_rolled_back, dispatch_uid='adminjournal_buffered_db_rolled_back')
+        warm_caches()
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from django.utils import timezone
+
+from .rollup import get_date
+from .spool import FIELDS
+
+
+def get_checksum(path):
+    """
+    Returns the SHA-256 checksum (hex) of the file.
+    """
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+class Archive(object):
+    """
+    Directory of gzip compressed JSON lines files (the format read by
+    ``importadminjournal``) with the archived journal entries.
+
+    Entries are written in segments per batch and day, stored as
+    ``YYYY/MM/DD/entries-<first id>-<last id>.jsonl.gz``. Every segment is listed
+    in the manifest (``manifest.jsonl``) with the number of entries, the id range
+    and the SHA-256 checksum. Segments and manifest are synced to disk before
+    `write` returns. Segments written again (e.g. if the entries were archived but
+    not deleted) are listed once.
+    """
+    manifest_name = 'manifest.jsonl'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._listed = None
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, self.manifest_name)
+
+    def write(self, rows):
+        """
+        Archive the rows, ``(id, *adminjournal.spool.FIELDS)`` tuples ordered by
+        id. Returns the manifest entries of the written segments.
+        """
+        days = OrderedDict()
+        for row in rows:
+            record = dict(zip(FIELDS, row[1:]))
+            days.setdefault(get_date(record['timestamp']), []).append((row[0], record))
+
+        segments = [self.write_segment(day, items) for day, items in days.items()]
+
+        if self._listed is None:
+            self._listed = {
+                (segment['path'], segment['sha256']) for segment in self.read_manifest()}
+
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            for segment in segments:
+                if (segment['path'], segment['sha256']) not in self._listed:
+                    f.write(json.dumps(segment, sort_keys=True) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._listed.update((segment['path'], segment['sha256']) for segment in segments)
+
+        return segments
+
+    def write_segment(self, day, items):
+        """
+        Write the ``(id, record)`` items of the day to a new segment, returns its
+        manifest entry.
+        """
+        first_id, last_id = items[0][0], items[-1][0]
+        name = os.path.join(
+            day.strftime('%Y'), day.strftime('%m'), day.strftime('%d'),
+            'entries-{}-{}.jsonl.gz'.format(first_id, last_id))
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # The segment is complete or missing, a segment of the same entries
+        # written again has the same content.
+        with open(path + '.tmp', 'wb') as f:
+            with gzip.GzipFile(filename='', mode='wb', fileobj=f, mtime=0) as output:
+                for id_, record in items:
+                    record['timestamp'] = record['timestamp'].isoformat()
+                    output.write(
+                        (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+
+        return {
+            'path': name,
+            'date': day.isoformat(),
+            'entries': len(items),
+            'first_id': first_id,
+            'last_id': last_id,
+            'sha256': get_checksum(path),
+            'created': timezone.now().isoformat(),
+        }
+
+    def read_manifest(self):
+        """
+        Returns the manifest entries of all segments.
+        """
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def verify(self):
+        """
+        Returns the paths of the segments which are missing or don't match the
+        checksum of the manifest.
+        """
+        invalid = []
+        for segment in self.read_manifest():
+            path = os.path.join(self.directory, segment['path'])
+            if not os.path.exists(path) or get_checksum(path) != segment['sha256']:
+                invalid.append(segment['path'])
+        return invalid
@@ -0,0 +1,160 @@
+import base64
+import json
+import zlib
+
+from django.conf import settings
+
+
+#: Key marking an encoded value in the payload.
+CODEC_KEY = '__codec__'
+
+CODEC_RANGES, CODEC_DELTAS, CODEC_ZLIB = ('ranges', 'deltas', 'zlib')
+
+
+def get_threshold():
+    """
+    Returns the size (in bytes of JSON) from which payload values are encoded, or
+    `None` if payloads are not encoded (the default).
+    """
+    return getattr(settings, 'ADMINJOURNAL_PAYLOAD_COMPRESS_THRESHOLD', None)
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+def _compress(value):
+    return base64.b64encode(zlib.compress(_dumps(value).encode('utf-8'))).decode('ascii')
+
+
+def _decompress(data):
+    return json.loads(zlib.decompress(base64.b64decode(data)).decode('utf-8'))
+
+
+def _as_ids(value):
+    """
+    Returns the list of integers of `value` (a list of integers or strings of
+    integers) and if they were strings, or `None` if the list holds other items.
+    """
+    if all(type(item) is int for item in value):
+        return value, False
+
+    if all(isinstance(item, str) for item in value):
+        try:
+            ids = [int(item) for item in value]
+        except ValueError:
+            return None
+        # The strings need to be restored as they were.
+        if all(str(id_) == item for id_, item in zip(ids, value)):
+            return ids, True
+
+    return None
+
+
+def get_ranges(ids):
+    """
+    Returns the sorted, distinct ids as flat list of ``start, end`` pairs of
+    consecutive ids.
+    """
+    ranges = []
+    for id_ in sorted(set(ids)):
+        if ranges and ranges[-1] == id_ - 1:
+            ranges[-1] = id_
+        else:
+            ranges.extend((id_, id_))
+    return ranges
+
+
+def encode_value(value, threshold=None):
+    """
+    Encode a payload value if its JSON representation reaches the threshold
+    (defaults to `get_threshold`, nothing is encoded if it is `None`).
+
+    Lists of (string) integer ids are stored as sorted ranges, or as compressed
+    deltas if the ranges are still too large. The order and duplicates of the
+    ids are not kept. Other values are compressed using zlib. Values are returned
+    unchanged if the encoding is not smaller.
+    """
+    threshold = get_threshold() if threshold is None else threshold
+    if threshold is None:
+        return value
+
+    size = len(_dumps(value))
+    if size < threshold:
+        return value
+
+    encoded = None
+    ids = _as_ids(value) if isinstance(value, list) else None
+    if ids is not None:
+        ids, as_str = ids
+        ranges = get_ranges(ids)
+        encoded = {CODEC_KEY: CODEC_RANGES, 'data': ranges, 'str': as_str}
+
+        if len(_dumps(ranges)) >= threshold:
+            distinct = sorted(set(ids))
+            deltas = [b - a for a, b in zip([0] + distinct, distinct)]
+            encoded = {CODEC_KEY: CODEC_DELTAS, 'data': _compress(deltas), 'str': as_str}
+    else:
+        encoded = {CODEC_KEY: CODEC_ZLIB, 'data': _compress(value)}
+
+    return encoded if len(_dumps(encoded)) < size else value
+
+
+def decode_value(value):
+    """
+    Decode a value encoded by `encode_value`, other values are returned unchanged.
+    """
+    if not isinstance(value, dict) or CODEC_KEY not in value:
+        return value
+
+    codec = value[CODEC_KEY]
+    if codec == CODEC_ZLIB:
+        return _decompress(value['data'])
+
+    if codec == CODEC_RANGES:
+        data = value['data']
+        ids = [
+            id_
+            for start, end in zip(data[::2], data[1::2])
+            for id_ in range(start, end + 1)
+        ]
+    elif codec == CODEC_DELTAS:
+        ids = []
+        current = 0
+        for delta in _decompress(value['data']):
+            current += delta
+            ids.append(current)
+    else:
+        raise ValueError('Unknown payload codec: {}'.format(codec))
+
+    return [str(id_) for id_ in ids] if value.get('str') else ids
+
+
+def encode_payload(payload, threshold=None):
+    """
+    Encode the large values of the payload (and of nested dicts) using `encode_value`.
+    """
+    threshold = get_threshold() if threshold is None else threshold
+    if threshold is None or not isinstance(payload, dict):
+        return payload
+
+    return {
+        key: (
+            encode_payload(value, threshold) if isinstance(value, dict)
+            else encode_value(value, threshold)
+        )
+        for key, value in payload.items()
+    }
+
+
+def decode_payload(payload):
+    """
+    Decode a payload encoded by `encode_payload`.
+    """
+    if not isinstance(payload, dict):
+        return payload
+
+    if CODEC_KEY in payload:
+        return decode_value(payload)
+
+    return {key: decode_payload(value) for key, value in payload.items()}
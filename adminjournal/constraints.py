@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db import connections, router
+
+from .models import Entry
+
+
+#: The foreign keys of `Entry` which are backed by database constraints.
+FOREIGN_KEYS = ('user', 'content_type')
+
+
+def has_foreign_key_constraints(using):
+    """
+    Returns `True` if the foreign keys of the journal entries in the database are
+    backed by constraints. The journal has no constraints if it is stored in a
+    database of its own (``ADMINJOURNAL_DATABASE``) or if users and content types
+    are stored in another database.
+    """
+    if getattr(settings, 'ADMINJOURNAL_DATABASE', None):
+        return False
+
+    return all(
+        router.db_for_write(Entry._meta.get_field(name).related_model) == using
+        for name in FOREIGN_KEYS
+    )
+
+
+def get_constraint_name(field):
+    return '{}_{}_fk'.format(Entry._meta.db_table, field.column)
+
+
+def sync_foreign_key_constraints(using='default', **kwargs):
+    """
+    Add or drop the foreign key constraints of the journal entries in the database,
+    depending on `has_foreign_key_constraints`. The constraints set the foreign
+    keys of deleted users and content types to ``NULL``.
+
+    The model itself has no constraints, this is called after every migration
+    (``post_migrate``) so the constraints follow changes of the settings.
+    """
+    if not router.allow_migrate_model(using, Entry):
+        return
+
+    connection = connections[using]
+    table = Entry._meta.db_table
+    quote_name = connection.ops.quote_name
+    enabled = has_foreign_key_constraints(using)
+
+    with connection.cursor() as cursor:
+        if table not in connection.introspection.table_names(cursor):
+            return
+
+        constraints = connection.introspection.get_constraints(cursor, table)
+        for name in FOREIGN_KEYS:
+            field = Entry._meta.get_field(name)
+            existing = [
+                constraint_name
+                for constraint_name, constraint in constraints.items()
+                if constraint['foreign_key'] and constraint['columns'] == [field.column]
+            ]
+
+            if not enabled:
+                for constraint_name in existing:
+                    cursor.execute('ALTER TABLE {} DROP CONSTRAINT {}'.format(
+                        quote_name(table), quote_name(constraint_name)))
+            elif not existing:
+                cursor.execute(
+                    'ALTER TABLE {} ADD CONSTRAINT {} FOREIGN KEY ({}) REFERENCES {} ({}) '
+                    'ON DELETE SET NULL DEFERRABLE INITIALLY DEFERRED'.format(
+                        quote_name(table),
+                        quote_name(get_constraint_name(field)),
+                        quote_name(field.column),
+                        quote_name(field.related_model._meta.db_table),
+                        quote_name(field.target_field.column),
+                    )
+                )
@@ -5,18 +5,98 @@ from django.utils import timezone
 from . import persistence
 
 
+_user_model = None
+
+#: Content type per model class.
+_content_types = {}
+
+#: Model class per ``(app_label, model)`` of a content type.
+_model_classes = {}
+
+
+def get_user_model_class():
+    """
+    Returns the user model class, cached per process.
+    """
+    global _user_model
+    if _user_model is None:
+        _user_model = get_user_model()
+    return _user_model
+
+
+def get_content_type(model):
+    """
+    Returns the content type of the model class or instance (proxy models get
+    their own content type), cached per process.
+    """
+    model_class = model._meta.model
+    try:
+        return _content_types[model_class]
+    except KeyError:
+        content_type = _content_types[model_class] = get_content_type_for_model(model_class)
+        return content_type
+
+
+def get_model_class(content_type):
+    """
+    Returns the model class of the content type, cached per process.
+    """
+    key = (content_type.app_label, content_type.model)
+    try:
+        return _model_classes[key]
+    except KeyError:
+        model_class = _model_classes[key] = content_type.model_class()
+        return model_class
+
+
+def clear_caches(setting=None, **kwargs):
+    """
+    Clear the per process caches. Connected to the ``post_migrate`` signal,
+    content types might be recreated by a database flush, and to the
+    ``setting_changed`` signal for ``AUTH_USER_MODEL``.
+    """
+    global _user_model
+    if setting not in (None, 'AUTH_USER_MODEL'):
+        return
+
+    _user_model = None
+    _content_types.clear()
+    _model_classes.clear()
+
+
+def warm_caches():
+    """
+    Resolve the user model without accessing the database, used when the app is loaded.
+    """
+    get_user_model_class()
+
+
 class Entry(object):
     """
     This class represents a journal entry and provides methods to get
     information about the action which was tracked.
+
+    Entries are plain value objects. The following attributes are available:
+
+        * `timestamp`: Point in time when the event happend.
+        * `action`: One of the ``ACTION_*`` constants.
+        * `user`: User who issued the event.
+        * `content_type`: Content type of the affected model.
+        * `model`: Affected model instance (optional).
+        * `description`: Human-readable representation of the event.
+        * `payload`: Dict-like object holding any other information related to the event.
+
+    The string representations (`user_repr`, `content_type_repr` and ``str(entry)``)
+    are computed on first access and memoized.
     """
-    ACTION_VIEW, ACTION_ADD, ACTION_CHANGE, ACTION_DELETE = ('view', 'add', 'change', 'delete')
+    __slots__ = (
+        'timestamp', 'action', 'user', 'content_type', 'model', 'description', 'payload',
+        '_user_repr', '_content_type_repr', '_str'
+    )
 
-    #: Point in time when the event happend.
-    timestamp = None
+    ACTION_VIEW, ACTION_ADD, ACTION_CHANGE, ACTION_DELETE = ('view', 'add', 'change', 'delete')
 
-    #: Dict-like object holding any other information related to the event.
-    payload = None
+    ACTIONS = frozenset((ACTION_VIEW, ACTION_ADD, ACTION_CHANGE, ACTION_DELETE))
 
     def __init__(
         self, action, user, model_class=None, model=None, description=None, timestamp=None,
@@ -44,21 +124,14 @@ class Entry(object):
         The parameter `description` is useful to provide a human-readable representation
         of what happened.
         """
-        from django.contrib.contenttypes.models import ContentType
-
         self.timestamp = timestamp or timezone.now()
 
-        if action not in (
-            self.ACTION_VIEW,
-            self.ACTION_ADD,
-            self.ACTION_CHANGE,
-            self.ACTION_DELETE
-        ):
+        if action not in self.ACTIONS:
             raise ValueError('Invalid `action` provided: {}'.format(action))
 
         self.action = action
 
-        if not isinstance(user, get_user_model()):
+        if not isinstance(user, get_user_model_class()):
             raise ValueError('Invalid `user` provided: {} ({})'.format(user, user.__class__))
 
         self.user = user
@@ -66,15 +139,23 @@ class Entry(object):
         if not model_class and not model:
             raise ValueError('Missing `model_class` and/or `model`')
 
-        if isinstance(model_class, ContentType):
-            self.content_type = model_class
+        if model_class is None:
+            # Derived from the model, no need to validate.
+            self.content_type = get_content_type(model)
         else:
-            self.content_type = get_content_type_for_model(model_class or model)
-
-        class_from_ct = self.content_type.model_class()
-        if model and not isinstance(model, class_from_ct):
-            raise ValueError('Model / model_class missmatch: {} vs {}'.format(
-                model, class_from_ct))
+            if (
+                not isinstance(model_class, type) and
+                model_class._meta.label_lower == 'contenttypes.contenttype'
+            ):
+                self.content_type = model_class
+            else:
+                self.content_type = get_content_type(model_class)
+
+            if model is not None:
+                class_from_ct = get_model_class(self.content_type)
+                if not isinstance(model, class_from_ct):
+                    raise ValueError('Model / model_class missmatch: {} vs {}'.format(
+                        model, class_from_ct))
 
         self.model = model
 
@@ -82,31 +163,40 @@ class Entry(object):
 
         self.payload = payload or {}
 
+        self._user_repr = self._content_type_repr = self._str = None
+
     def __repr__(self):
         return '<Entry {}: {}>'.format(self.timestamp, str(self))
 
     def __str__(self):
-        return '{} by {} on {}{}: {}'.format(
-            self.action.upper(),
-            self.user_repr,
-            self.content_type_repr,
-            '.{}'.format(self.object_id) if self.object_id else '',
-            self.description or self.payload or 'n/a'
-        )
+        if self._str is None:
+            self._str = '{} by {} on {}{}: {}'.format(
+                self.action.upper(),
+                self.user_repr,
+                self.content_type_repr,
+                '.{}'.format(self.object_id) if self.object_id else '',
+                self.description or self.payload or 'n/a'
+            )
+        return self._str
 
     @property
     def user_repr(self):
         """
         Returns a human readable version of the user object.
         """
-        return str(self.user)
+        if self._user_repr is None:
+            self._user_repr = str(self.user)
+        return self._user_repr
 
     @property
     def content_type_repr(self):
         """
         Returns a human readable version of the content type object.
         """
-        return '{}.{}'.format(self.content_type.app_label, self.content_type.model)
+        if self._content_type_repr is None:
+            self._content_type_repr = '{}.{}'.format(
+                self.content_type.app_label, self.content_type.model)
+        return self._content_type_repr
 
     @property
     def object_id(self):
@@ -117,3 +207,9 @@ class Entry(object):
         Triggers the persisting of the instance.
         """
         return persistence.persist(self)
+
+    async def apersist(self):
+        """
+        Async variant of `persist`.
+        """
+        return await persistence.apersist(self)
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+from .codec import decode_payload
+from .importing import FORMAT_CSV, FORMAT_JSONL
+from .spool import FIELDS
+
+
+#: Content types of the export formats.
+CONTENT_TYPES = {
+    FORMAT_JSONL: 'application/x-ndjson',
+    FORMAT_CSV: 'text/csv',
+}
+
+
+def filter_entries(
+    queryset, since=None, until=None, user=None, content_type=None, actions=None
+):
+    """
+    Filter the `adminjournal.models.Entry` queryset by time range (`since` including,
+    `until` excluding), user (``user_repr``), content type (``app_label.model``)
+    and a list of actions.
+    """
+    if since is not None:
+        queryset = queryset.filter(timestamp__gte=since)
+    if until is not None:
+        queryset = queryset.filter(timestamp__lt=until)
+    if user is not None:
+        queryset = queryset.filter(user_repr=user)
+    if content_type is not None:
+        queryset = queryset.filter(content_type_repr=content_type)
+    if actions:
+        queryset = queryset.filter(action__in=actions)
+    return queryset
+
+
+def iter_records(queryset, chunk_size=2000, decode=False):
+    """
+    Yields the entries of the queryset as records (dicts with the keys of
+    `adminjournal.spool.FIELDS`), fetched in chunks using a server-side cursor
+    (on PostgreSQL). If `decode` is set, the payloads are decoded (see
+    `adminjournal.codec`).
+    """
+    for values in queryset.values_list(*FIELDS).iterator(chunk_size=chunk_size):
+        record = dict(zip(FIELDS, values))
+        record['timestamp'] = record['timestamp'].isoformat()
+        if decode:
+            record['payload'] = decode_payload(record['payload'])
+        yield record
+
+
+def dump_records(records, format=FORMAT_JSONL):
+    """
+    Yields the records as lines of a JSON lines or CSV (with header row) file,
+    the format read by `adminjournal.importing.read_records`.
+    """
+    if format == FORMAT_CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(FIELDS)
+        for record in records:
+            payload = record['payload']
+            record['payload'] = None if payload is None else json.dumps(payload)
+            writer.writerow([record[field] for field in FIELDS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # The header is returned even if there are no records.
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for record in records:
+            yield json.dumps(record, separators=(',', ':')) + '\n'
@@ -0,0 +1,144 @@
+import time
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+
+from .models import Entry, Facet
+
+
+KIND_USER, KIND_APP_LABEL = ('user_repr', 'app_label')
+
+CACHE_KEY = 'adminjournal:facets:{}'
+
+
+def get_cache_timeout():
+    return getattr(settings, 'ADMINJOURNAL_FACETS_CACHE_TIMEOUT', 300)
+
+
+class KnownFacets(object):
+    """
+    Facets known to exist, to skip database lookups on every persisted entry.
+
+    The set is process-local. It is cleared after the cache timeout, facets
+    deleted by `refresh` in another process are created again after that time.
+    """
+
+    def __init__(self):
+        self.facets = set()
+        self.expires = 0
+
+    def get(self):
+        if time.monotonic() >= self.expires:
+            self.clear()
+        return self.facets
+
+    def update(self, facets):
+        self.get().update(facets)
+
+    def clear(self):
+        self.facets = set()
+        self.expires = time.monotonic() + get_cache_timeout()
+
+
+_known = KnownFacets()
+
+
+def get_facets(instance):
+    """
+    Returns a set of ``(kind, value)`` tuples for the `adminjournal.models.Entry`
+    instance.
+    """
+    facets = {(KIND_USER, instance.user_repr)}
+    if instance.content_type_id:
+        # The representation is ``app_label.model``, no content type is loaded.
+        facets.add((KIND_APP_LABEL, instance.content_type_repr.partition('.')[0]))
+    return facets
+
+
+def record(instances):
+    """
+    Store the facets of the given `adminjournal.models.Entry` instances, if
+    not already known.
+
+    The facets are marked as known (and the cached values are invalidated) when
+    the current transaction is committed, facets created in a transaction which
+    is rolled back are created again.
+    """
+    facets = set()
+    for instance in instances:
+        facets |= get_facets(instance)
+
+    using = router.db_for_write(Facet)
+    facets -= _known.get()
+    created_kinds = set()
+    for kind, value in facets:
+        try:
+            with transaction.atomic(using=using):
+                __, created = Facet.objects.get_or_create(kind=kind, value=value)
+        except IntegrityError:
+            # Created concurrently.
+            created = False
+
+        if created:
+            created_kinds.add(kind)
+
+    def commit():
+        if created_kinds:
+            cache.delete_many([CACHE_KEY.format(kind) for kind in created_kinds])
+        _known.update(facets)
+
+    if facets:
+        transaction.on_commit(commit, using=using)
+
+
+def record_persisted(sender, instances, **kwargs):
+    """
+    Receiver of the `adminjournal.signals.entries_persisted` signal.
+    """
+    record(instances)
+
+
+def get_values(kind):
+    """
+    Returns the sorted list of values for the given kind of facets. The list
+    is cached for ``ADMINJOURNAL_FACETS_CACHE_TIMEOUT`` seconds (default: 300).
+    """
+    return cache.get_or_set(
+        CACHE_KEY.format(kind),
+        lambda: list(Facet.objects.filter(kind=kind).order_by('value').values_list(
+            'value', flat=True)),
+        get_cache_timeout()
+    )
+
+
+def refresh():
+    """
+    Rebuild the facets from the journal entries. Facets of values no longer
+    present in the journal are removed.
+
+    Returns a ``(created, deleted)`` tuple with the number of changed facets.
+    """
+    facets = {(KIND_USER, value) for value in Entry.objects.order_by().values_list(
+        'user_repr', flat=True).distinct()}
+    # The content types might be stored in another database.
+    content_type_ids = list(Entry.objects.filter(content_type__isnull=False).order_by(
+        ).values_list('content_type_id', flat=True).distinct())
+    facets |= {(KIND_APP_LABEL, value) for value in ContentType.objects.filter(
+        pk__in=content_type_ids).values_list('app_label', flat=True).distinct()}
+
+    with transaction.atomic(using=router.db_for_write(Facet)):
+        existing = {
+            (kind, value): pk
+            for pk, kind, value in Facet.objects.values_list('pk', 'kind', 'value')
+        }
+        stale = [pk for facet, pk in existing.items() if facet not in facets]
+        Facet.objects.filter(pk__in=stale).delete()
+        Facet.objects.bulk_create([
+            Facet(kind=kind, value=value) for kind, value in facets - set(existing)])
+
+    _known.clear()
+    cache.delete_many([CACHE_KEY.format(kind) for kind in (KIND_USER, KIND_APP_LABEL)])
+
+    return len(facets - set(existing)), len(stale)
@@ -0,0 +1,45 @@
+from django.contrib import admin
+from django.contrib.contenttypes.models import ContentType
+from django.utils.translation import ugettext_lazy as _
+
+from . import facets
+
+
+class FacetListFilter(admin.SimpleListFilter):
+    """
+    List filter which gets its choices from the facets (see `adminjournal.facets`)
+    instead of querying the distinct values of the journal entries.
+    """
+    #: Kind of facets to use as choices.
+    kind = None
+
+    def lookups(self, request, model_admin):
+        return [(value, value) for value in facets.get_values(self.kind)]
+
+    def queryset(self, request, queryset):
+        if self.value() is not None:
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class UserReprListFilter(FacetListFilter):
+    title = _('User (repr)')
+    parameter_name = 'user_repr'
+    kind = facets.KIND_USER
+
+
+class AppLabelListFilter(FacetListFilter):
+    title = _('App label')
+    parameter_name = 'content_type__app_label'
+    kind = facets.KIND_APP_LABEL
+
+    def queryset(self, request, queryset):
+        """
+        The content types are resolved in a separate query, they might be stored
+        in another database than the journal.
+        """
+        if self.value() is not None:
+            content_types = ContentType.objects.filter(app_label=self.value())
+            return queryset.filter(
+                content_type__in=list(content_types.values_list('pk', flat=True)))
+        return queryset
@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.contrib.admin.options import get_content_type_for_model
+from django.contrib.admin.utils import quote
+
+from .codec import decode_value
+from .entry import Entry as JournalEntry
+from .models import Entry
+
+
+try:
+    from django.urls import NoReverseMatch, reverse
+except ImportError:
+    from django.core.urlresolvers import NoReverseMatch, reverse
+
+
+#: Journal actions shown in the admin history, like Django's ``LogEntry`` flags.
+HISTORY_ACTIONS = (
+    JournalEntry.ACTION_ADD, JournalEntry.ACTION_CHANGE, JournalEntry.ACTION_DELETE)
+
+
+def is_authoritative(model_admin=None):
+    """
+    Returns `True` if the journal replaces Django's ``LogEntry`` for the model admin
+    (``adminjournal_authoritative`` attribute) or globally (``ADMINJOURNAL_AUTHORITATIVE``).
+    """
+    value = getattr(model_admin, 'adminjournal_authoritative', None)
+    if value is None:
+        value = getattr(settings, 'ADMINJOURNAL_AUTHORITATIVE', False)
+    return value
+
+
+class LogEntryAdapter(object):
+    """
+    Wraps a `adminjournal.models.Entry` to provide the interface of Django's
+    ``LogEntry`` used by the admin templates (history page, recent actions).
+    """
+
+    def __init__(self, entry):
+        self.entry = entry
+
+    @property
+    def action_time(self):
+        return self.entry.timestamp
+
+    @property
+    def user(self):
+        return self.entry.get_user()
+
+    @property
+    def content_type(self):
+        return self.entry.get_content_type()
+
+    @property
+    def object_id(self):
+        return self.entry.object_id
+
+    @property
+    def object_repr(self):
+        """
+        The object representation is stored in the payload since the journal
+        is authoritative, older entries fall back to the object id.
+        """
+        payload = self.entry.payload or {}
+        return decode_value(payload.get('object_repr')) or self.entry.object_id or ''
+
+    def is_addition(self):
+        return self.entry.action == JournalEntry.ACTION_ADD
+
+    def is_change(self):
+        return self.entry.action == JournalEntry.ACTION_CHANGE
+
+    def is_deletion(self):
+        return self.entry.action == JournalEntry.ACTION_DELETE
+
+    def get_change_message(self):
+        return self.entry.description
+
+    def get_edited_object(self):
+        return self.content_type.get_object_for_this_type(pk=self.object_id)
+
+    def get_admin_url(self):
+        if self.content_type and self.object_id:
+            url_name = 'admin:{}_{}_change'.format(
+                self.content_type.app_label, self.content_type.model)
+            try:
+                return reverse(url_name, args=(quote(self.object_id),))
+            except NoReverseMatch:
+                pass
+        return None
+
+    def __str__(self):
+        return str(self.entry.description)
+
+
+def get_object_history(model, object_id):
+    """
+    Returns the additions, changes and deletions of the object as list of
+    `LogEntryAdapter` instances, ordered by time.
+    """
+    entries = Entry.objects.filter(
+        content_type=get_content_type_for_model(model),
+        object_id=str(object_id),
+        action__in=HISTORY_ACTIONS,
+    ).prefetch_related('user').order_by('timestamp')
+    return [LogEntryAdapter(entry) for entry in entries]
+
+
+def get_recent_actions(limit, user=None):
+    """
+    Returns the latest additions, changes and deletions (of the user, if given)
+    as list of `LogEntryAdapter` instances.
+    """
+    entries = Entry.objects.filter(action__in=HISTORY_ACTIONS)
+    if user is not None:
+        entries = entries.filter(user=user)
+    entries = entries.prefetch_related('content_type').order_by('-timestamp')[:limit]
+    return [LogEntryAdapter(entry) for entry in entries]
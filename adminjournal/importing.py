@@ -0,0 +1,257 @@
+import csv
+import gzip
+import io
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import facets
+from .models import Entry
+from .spool import FIELDS
+
+
+FORMAT_JSONL, FORMAT_CSV = ('jsonl', 'csv')
+
+
+def open_input(path):
+    """
+    Open the file for reading text, files ending with ``.gz`` are decompressed.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def get_format(path):
+    """
+    Returns the format of the file based on its name (``.csv`` or ``.csv.gz`` for
+    CSV, JSON lines otherwise).
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    return FORMAT_CSV if name.endswith('.csv') else FORMAT_JSONL
+
+
+def read_records(lines, format=FORMAT_JSONL):
+    """
+    Yields the records (dicts with the keys of `adminjournal.spool.FIELDS`) of the
+    lines of a JSON lines or CSV (with header row) file. In CSV files, the payload
+    is a JSON string and empty ids are `None`.
+    """
+    if format == FORMAT_CSV:
+        for row in csv.DictReader(lines):
+            row['payload'] = json.loads(row['payload']) if row.get('payload') else None
+            for field in ('user_id', 'content_type_id', 'object_id'):
+                row[field] = row.get(field) or None
+            yield row
+    else:
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+
+def get_timestamp(value):
+    """
+    Returns the timestamp (string or datetime) of a record as datetime, like Django
+    stores it: naive timestamps are in the current time zone, timestamps are aware
+    if ``USE_TZ`` is enabled and naive otherwise.
+    """
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if settings.USE_TZ and timezone.is_naive(value):
+        return timezone.make_aware(value)
+    if not settings.USE_TZ and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
+class ForeignKeyResolver(object):
+    """
+    In-memory lookup maps to resolve the user and content type of imported records.
+
+    The id of the record is kept if it exists and its representation matches the
+    one of the record (``app_label.model`` of the content type, ``str()`` of the
+    user like the journal entries). Otherwise the id is looked up by the
+    representation, the id of the record is kept if the representation is unknown
+    and the id exists. Otherwise the foreign key is `None`.
+    """
+
+    def __init__(self):
+        self.user_reprs = {
+            user.pk: str(user)
+            for user in get_user_model()._default_manager.iterator()
+        }
+        self.users = {value: pk for pk, value in self.user_reprs.items()}
+
+        self.content_type_reprs = {
+            pk: '{}.{}'.format(app_label, model)
+            for pk, app_label, model in ContentType.objects.values_list(
+                'pk', 'app_label', 'model')
+        }
+        self.content_types = {value: pk for pk, value in self.content_type_reprs.items()}
+
+    def resolve(self, record):
+        """
+        Returns the record with the resolved ``user_id`` and ``content_type_id``.
+        """
+        record['user_id'] = self._resolve(
+            self.users, self.user_reprs, record.get('user_repr'), record.get('user_id'))
+        record['content_type_id'] = self._resolve(
+            self.content_types, self.content_type_reprs,
+            record.get('content_type_repr'), record.get('content_type_id'))
+        return record
+
+    def _resolve(self, lookup, reprs, value, id_):
+        try:
+            id_ = int(id_) if id_ is not None else None
+        except ValueError:
+            id_ = None
+
+        if id_ in reprs and (not value or reprs[id_] == value):
+            return id_
+        if value in lookup:
+            return lookup[value]
+        return id_ if id_ in reprs else None
+
+
+class LineReader(object):
+    """
+    File-like object to read the lines of an iterator, used to stream rows to
+    ``COPY FROM STDIN`` without keeping them in memory.
+    """
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer += next(self.lines)
+            except StopIteration:
+                break
+
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def get_row(record):
+    """
+    Returns the values of the `adminjournal.spool.FIELDS` of the record as tuple.
+    """
+    return (
+        get_timestamp(record['timestamp']).isoformat(),
+        record['action'],
+        record.get('user_id'),
+        record.get('user_repr') or '',
+        record.get('content_type_id'),
+        record.get('content_type_repr') or '',
+        record.get('object_id'),
+        record.get('description') or '',
+        None if record.get('payload') is None else json.dumps(record['payload']),
+    )
+
+
+def copy_records(records, using):
+    """
+    Insert the records using PostgreSQL's ``COPY FROM STDIN`` (in CSV format).
+    Returns the number of inserted entries.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    columns = [qn(Entry._meta.get_field(field).column) for field in FIELDS]
+    # Empty values are read as NULL, except for the columns which are not nullable.
+    not_null = [
+        qn(Entry._meta.get_field(field).column)
+        for field in ('action', 'user_repr', 'content_type_repr', 'description')
+    ]
+    count = 0
+
+    def lines():
+        nonlocal count
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in records:
+            writer.writerow(get_row(record))
+            count += 1
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            'COPY {} ({}) FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL ({}))'.format(
+                qn(Entry._meta.db_table), ', '.join(columns), ', '.join(not_null)),
+            LineReader(lines())
+        )
+    return count
+
+
+def create_records(records, using, batch_size=10000):
+    """
+    Insert the records using ``bulk_create`` in batches of `batch_size`.
+    Returns the number of inserted entries.
+    """
+    count = 0
+    batch = []
+    for record in records:
+        data = {field: record.get(field) for field in FIELDS}
+        data['timestamp'] = get_timestamp(data['timestamp'])
+        data['user_repr'] = data['user_repr'] or ''
+        data['content_type_repr'] = data['content_type_repr'] or ''
+        data['description'] = data['description'] or ''
+        batch.append(Entry(**data))
+
+        if len(batch) >= batch_size:
+            count += len(Entry.objects.using(using).bulk_create(batch))
+            batch = []
+
+    if batch:
+        count += len(Entry.objects.using(using).bulk_create(batch))
+    return count
+
+
+def import_records(records, batch_size=10000):
+    """
+    Insert the records into the journal in one transaction, returns the number of
+    inserted entries. The foreign keys are resolved using `ForeignKeyResolver`.
+
+    On PostgreSQL, the records are streamed using ``COPY``, other databases use
+    batches of ``bulk_create``. Both do not send the
+    `adminjournal.signals.entries_persisted` signal, the facets of the imported
+    entries are recorded instead.
+    """
+    using = router.db_for_write(Entry)
+    resolver = ForeignKeyResolver()
+    # The distinct user and content type of the records, for the facets.
+    keys = set()
+
+    def resolve(records):
+        for record in records:
+            record = resolver.resolve(record)
+            keys.add((
+                record.get('user_repr') or '',
+                record['content_type_id'],
+                record.get('content_type_repr') or '',
+            ))
+            yield record
+
+    with transaction.atomic(using=using):
+        if connections[using].vendor == 'postgresql':
+            count = copy_records(resolve(records), using)
+        else:
+            count = create_records(resolve(records), using, batch_size)
+
+        facets.record([
+            Entry(user_repr=user_repr, content_type_id=content_type_id,
+                  content_type_repr=content_type_repr)
+            for user_repr, content_type_id, content_type_repr in keys
+        ])
+
+    return count
@@ -1,20 +1,182 @@
-from datetime import timedelta
+import time
 
-from django.conf import settings
+from django.core.exceptions import EmptyResultSet
 from django.core.management.base import BaseCommand
+from django.db import connections, router
 from django.utils import timezone
 
+from adminjournal import partitioning, retention, selection
+from adminjournal.archive import Archive
 from adminjournal.models import Entry
+from adminjournal.spool import FIELDS
 
 
 class Command(BaseCommand):
-    help = 'Clear adminjournal entries older than the configured lifetime.'
+    help = 'Clear adminjournal entries older than the configured retention policies.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Number of entries to delete per statement (default: 10000).')
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to sleep between two batches (default: 0).')
+        parser.add_argument(
+            '--max-runtime', type=float, default=None,
+            help='Stop after the given number of seconds, remaining entries are kept.')
+        parser.add_argument(
+            '--dry-run', action='store_true', default=False,
+            help='Only count the entries to delete.')
+        parser.add_argument(
+            '--archive-dir', default=None,
+            help='Write the entries to compressed archive files in the directory '
+                 'before they are deleted.')
 
     def handle(self, *args, **options):
-        days = getattr(settings, 'ADMINJOURNAL_ENTRY_EXPIRY_DAYS', 365)
+        self.verbosity = options['verbosity']
+        self.archive = options['archive_dir'] and Archive(options['archive_dir'])
+        policies = []
+        for policy in retention.get_policies():
+            # E.g. a removed app, no entry can match the policy.
+            if policy.content_type and not policy.get_content_type_ids():
+                self.stderr.write(
+                    'Policy {0}: Unknown content type, skipped.'.format(policy))
+                continue
+            policies.append(policy)
+
+        now = timezone.now()
+        expired = list(retention.get_expired(policies, now))
+        partition_cutoff = retention.get_partition_cutoff(policies, now)
+
+        if options['dry_run']:
+            total = 0
+            for policy, queryset in expired:
+                count = queryset.count()
+                total += count
+                if len(policies) > 1:
+                    self.stdout.write('Policy {0}: {1} entries would be deleted.'.format(
+                        policy, count))
+            self.stdout.write('Dry run. {0} entries would be deleted.'.format(total))
+            return
+
+        # When archiving, the partitions are dropped after their entries were archived.
+        if not self.archive:
+            self.drop_expired_partitions(partition_cutoff)
+
+        started = time.monotonic()
+        max_runtime = options['max_runtime']
+        deleted = 0
+        for policy, queryset in expired:
+            remaining = None
+            if max_runtime is not None:
+                remaining = max(max_runtime - (time.monotonic() - started), 0)
+
+            count = self.delete_in_batches(
+                queryset, options['batch_size'], options['sleep'], remaining)
+            deleted += count
+            if len(policies) > 1:
+                self.stdout.write('Policy {0}: {1} entries deleted.'.format(policy, count))
 
-        deleted = Entry.objects.filter(
-            timestamp__lt=timezone.now() - timedelta(days=days)).delete()
+            if remaining is not None and time.monotonic() - started >= max_runtime:
+                break
+
+        if self.archive and partitioning.get_interval() and not Entry.objects.filter(
+                timestamp__lt=partition_cutoff).exists():
+            self.drop_expired_partitions(partition_cutoff)
+
+        # Selections are referenced by entries of any policy, they are kept for
+        # the longest retention period.
+        selections = selection.delete_expired(partition_cutoff)
+        if selections:
+            self.stdout.write('{0} selections deleted.'.format(selections))
 
         self.stdout.write(
-            'Operation successful. {0} entries deleted.'.format(deleted[0]))
+            'Operation successful. {0} entries deleted.'.format(deleted))
+
+    def drop_expired_partitions(self, cutoff):
+        connection = connections[router.db_for_write(Entry)]
+        if partitioning.get_interval() and partitioning.is_partitioned(connection):
+            for name, count in partitioning.drop_expired_partitions(connection, cutoff):
+                self.stdout.write(
+                    'Partition {0} dropped (about {1} entries).'.format(name, count))
+
+    def delete_in_batches(self, queryset, batch_size, sleep=0, max_runtime=None):
+        """
+        Delete the entries of the queryset in primary key ordered batches.
+        Every batch is a single ``DELETE`` statement which is committed on its own.
+
+        Returns the number of deleted entries.
+        """
+        started = time.monotonic()
+        deleted = 0
+
+        while True:
+            elapsed = time.monotonic() - started
+            if max_runtime is not None and elapsed >= max_runtime:
+                self.stdout.write('Maximum runtime reached, stopping.')
+                break
+
+            if self.archive:
+                count = self.archive_batch(queryset, batch_size)
+            else:
+                count = self.delete_batch(queryset, batch_size)
+            deleted += count
+
+            if self.verbosity >= 1 and count:
+                elapsed = time.monotonic() - started
+                self.stdout.write('{0} entries deleted ({1:.0f} entries/s).'.format(
+                    deleted, deleted / elapsed if elapsed else deleted))
+
+            if count < batch_size:
+                break
+
+            if sleep:
+                time.sleep(sleep)
+
+        return deleted
+
+    def archive_batch(self, queryset, batch_size):
+        """
+        Write up to `batch_size` entries of the queryset to the archive and delete
+        exactly the archived entries. Returns the number of deleted entries.
+        """
+        using = router.db_for_write(Entry)
+        connection = connections[using]
+
+        rows = list(
+            queryset.using(using).order_by('pk').values_list('pk', *FIELDS)[:batch_size])
+        if not rows:
+            return 0
+
+        self.archive.write(rows)
+
+        pks = [row[0] for row in rows]
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {0} WHERE {1} IN ({2})'.format(
+                connection.ops.quote_name(Entry._meta.db_table),
+                connection.ops.quote_name(Entry._meta.pk.column),
+                ', '.join(['%s'] * len(pks))
+            ), pks)
+            return cursor.rowcount
+
+    def delete_batch(self, queryset, batch_size):
+        """
+        Delete up to `batch_size` entries of the queryset using a raw ``DELETE``
+        statement. Returns the number of deleted entries.
+        """
+        using = router.db_for_write(Entry)
+        connection = connections[using]
+
+        batch = queryset.order_by('pk').values('pk')[:batch_size]
+        try:
+            subquery, params = batch.query.get_compiler(using).as_sql()
+        except EmptyResultSet:
+            return 0
+
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {0} WHERE {1} IN ({2})'.format(
+                connection.ops.quote_name(Entry._meta.db_table),
+                connection.ops.quote_name(Entry._meta.pk.column),
+                subquery
+            ), params)
+            return cursor.rowcount
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+
+from adminjournal import partitioning
+from adminjournal.constraints import sync_foreign_key_constraints
+from adminjournal.models import Entry
+
+
+class Command(BaseCommand):
+    help = 'Create the adminjournal partitions for the upcoming periods.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count', type=int,
+            default=getattr(settings, 'ADMINJOURNAL_PARTITION_PRECREATE', 3),
+            help='Number of upcoming periods to create partitions for.')
+
+    def handle(self, *args, **options):
+        interval = partitioning.get_interval()
+        if not interval:
+            raise CommandError('Partitioning is disabled, see ADMINJOURNAL_PARTITION_INTERVAL.')
+
+        connection = connections[router.db_for_write(Entry)]
+
+        if not partitioning.is_partitioned(connection):
+            partitioning.convert_table(connection, interval)
+            # The current model has no constraints, they are managed separately.
+            sync_foreign_key_constraints(connection.alias)
+            self.stdout.write('Converted journal table to a partitioned table.')
+        elif partitioning.create_default_partition(connection):
+            self.stdout.write('Default partition created.')
+
+        created = partitioning.create_partitions(connection, interval, options['count'])
+        for name in created:
+            self.stdout.write('Partition {0} created.'.format(name))
+
+        self.stdout.write(
+            'Operation successful. {0} partitions created.'.format(len(created)))
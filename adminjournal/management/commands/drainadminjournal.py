@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from adminjournal import spool
+
+
+class Command(BaseCommand):
+    help = 'Store the entries of the adminjournal spool in the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of entries to store per transaction (default: 1000).')
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Keep running and drain the spool every given number of seconds.')
+
+    def handle(self, *args, **options):
+        journal_spool = spool.get_spool()
+
+        while True:
+            drained = spool.drain(journal_spool, options['batch_size'])
+            if options['interval'] is None:
+                break
+
+            if drained:
+                self.stdout.write('{0} entries drained.'.format(drained))
+            close_old_connections()
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            'Operation successful. {0} entries drained.'.format(drained))
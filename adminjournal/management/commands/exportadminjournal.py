@@ -0,0 +1,101 @@
+import gzip
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from adminjournal import exporting, importing
+from adminjournal.models import Entry
+
+
+def parse_timestamp(value):
+    """
+    Returns the datetime of a date (midnight) or datetime in ISO format, naive
+    values are in the current time zone.
+    """
+    try:
+        timestamp = parse_datetime(value)
+        if timestamp is None:
+            day = parse_date(value)
+            timestamp = day and datetime.combine(day, time.min)
+    except ValueError:
+        timestamp = None
+
+    if timestamp is None:
+        raise CommandError('Invalid date provided: {0}'.format(value))
+    if settings.USE_TZ and timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    return timestamp
+
+
+class Command(BaseCommand):
+    help = 'Export adminjournal entries as JSON lines or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='-',
+            help='File to write, files ending with ".gz" are compressed. '
+                 'Defaults to stdout.')
+        parser.add_argument(
+            '--format', choices=(importing.FORMAT_JSONL, importing.FORMAT_CSV), default=None,
+            help='Format of the export. Defaults to CSV for ".csv" files, JSON lines '
+                 'otherwise.')
+        parser.add_argument(
+            '--since', default=None,
+            help='Export entries from the date or time (including).')
+        parser.add_argument(
+            '--until', default=None, help='Export entries before the date or time.')
+        parser.add_argument('--user', default=None, help='Export entries of the user.')
+        parser.add_argument(
+            '--content-type', default=None,
+            help='Export entries of the content type (app_label.model).')
+        parser.add_argument(
+            '--action', action='append', default=None, dest='actions',
+            help='Export entries of the action, can be given multiple times.')
+        parser.add_argument(
+            '--decode', action='store_true', default=False,
+            help='Decode the compactly stored payload values.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of entries fetched from the database at once (default: 2000).')
+
+    def handle(self, *args, **options):
+        queryset = exporting.filter_entries(
+            Entry.objects.order_by('timestamp', 'pk'),
+            since=options['since'] and parse_timestamp(options['since']),
+            until=options['until'] and parse_timestamp(options['until']),
+            user=options['user'],
+            content_type=options['content_type'],
+            actions=options['actions'],
+        )
+
+        path = options['output']
+        format = options['format'] or importing.get_format(path)
+
+        self.exported = 0
+        records = exporting.iter_records(queryset, options['chunk_size'], options['decode'])
+        lines = exporting.dump_records(self.count(records), format)
+
+        if path == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        with self.open_output(path) as output:
+            for line in lines:
+                output.write(line)
+
+        self.stdout.write(
+            'Operation successful. {0} entries exported.'.format(self.exported))
+
+    def open_output(self, path):
+        if path.endswith('.gz'):
+            return gzip.open(path, 'wt', encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')
+
+    def count(self, records):
+        for record in records:
+            self.exported += 1
+            yield record
@@ -0,0 +1,68 @@
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adminjournal import importing, rollup
+
+
+class Command(BaseCommand):
+    help = 'Import adminjournal entries from JSON lines or CSV files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+', metavar='path',
+            help='Files to import, "-" reads JSON lines from stdin. Files ending '
+                 'with ".gz" are decompressed.')
+        parser.add_argument(
+            '--format', choices=(importing.FORMAT_JSONL, importing.FORMAT_CSV), default=None,
+            help='Format of the files. Defaults to CSV for ".csv" files, JSON lines otherwise.')
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Number of entries per insert if COPY is not available (default: 10000).')
+
+    def handle(self, *args, **options):
+        imported = 0
+
+        for path in options['paths']:
+            format = options['format'] or importing.get_format(path)
+            if path == '-':
+                count = self.import_lines(sys.stdin, format, options['batch_size'])
+            else:
+                try:
+                    lines = importing.open_input(path)
+                except OSError as exc:
+                    raise CommandError('Cannot open {0}: {1}'.format(path, exc))
+                with lines:
+                    count = self.import_lines(lines, format, options['batch_size'])
+
+            self.stdout.write('{0}: {1} entries imported.'.format(path, count))
+            imported += count
+
+        self.stdout.write(
+            'Operation successful. {0} entries imported.'.format(imported))
+
+    def import_lines(self, lines, format, batch_size):
+        self.counts = Counter()
+        records = importing.read_records(lines, format)
+        if rollup.is_enabled():
+            records = self.count(records)
+
+        count = importing.import_records(records, batch_size)
+        # The imported entries are added to the daily counts, rebuilding the days
+        # would lose the counts of expired entries.
+        rollup.add_counts(self.counts)
+        return count
+
+    def count(self, records):
+        """
+        Count the records per day, user, content type and action.
+        """
+        for record in records:
+            self.counts[(
+                rollup.get_date(importing.get_timestamp(record['timestamp'])),
+                record.get('user_repr') or '',
+                record.get('content_type_repr') or '',
+                record['action'],
+            )] += 1
+            yield record
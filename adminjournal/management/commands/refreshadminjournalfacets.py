@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from adminjournal import facets
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the adminjournal facets used by the list filters.'
+
+    def handle(self, *args, **options):
+        created, deleted = facets.refresh()
+
+        self.stdout.write(
+            'Operation successful. {0} facets created, {1} facets deleted.'.format(
+                created, deleted))
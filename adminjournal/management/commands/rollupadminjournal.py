@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils.dateparse import parse_date
+
+from adminjournal import rollup
+from adminjournal.models import DailyCount
+
+
+class Command(BaseCommand):
+    help = 'Calculate the daily counts of the adminjournal entries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', default=None,
+            help='First day (YYYY-MM-DD) to calculate. Defaults to the latest '
+                 'calculated day.')
+        parser.add_argument(
+            '--all', action='store_true', default=False,
+            help='Recalculate the counts of all days.')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            since = None
+        elif options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError('Invalid date provided: {0}'.format(options['since']))
+        else:
+            since = DailyCount.objects.aggregate(latest=Max('date'))['latest']
+
+        written = rollup.rebuild(since)
+
+        self.stdout.write(
+            'Operation successful. {0} daily counts written.'.format(written))
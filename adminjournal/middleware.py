@@ -0,0 +1,17 @@
+from django.utils.deprecation import MiddlewareMixin
+
+from .persistence_backends.buffered_db import buffering
+
+
+class JournalBufferMiddleware(MiddlewareMixin):
+    """
+    Middleware to write all journal entries of a request with a single bulk insert
+    when using ``adminjournal.persistence_backends.buffered_db.Backend``.
+
+    The buffer is written after the view (and a possible ``ATOMIC_REQUESTS``
+    transaction) finished, no matter whether the request failed or not.
+    """
+
+    def __call__(self, request):
+        with buffering():
+            return self.get_response(request)
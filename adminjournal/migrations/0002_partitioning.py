@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def partition_table(apps, schema_editor):
+    from adminjournal import partitioning
+
+    interval = partitioning.get_interval()
+    connection = schema_editor.connection
+    if interval and not partitioning.is_partitioned(connection):
+        partitioning.convert_table(
+            connection, interval, apps.get_model('adminjournal', 'Entry'))
+        partitioning.create_partitions(connection, interval, 3)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminjournal', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.28 on 2026-10-18 04:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminjournal', '0002_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['timestamp'], name='adminjournal_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['content_type', 'object_id', 'timestamp'], name='adminjournal_object_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['user', 'timestamp'], name='adminjournal_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['action', 'timestamp'], name='adminjournal_action_idx'),
+        ),
+        migrations.AlterField(
+            model_name='entry',
+            name='content_type',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='contenttypes.ContentType', verbose_name='Content type'),
+        ),
+        migrations.AlterField(
+            model_name='entry',
+            name='user',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.28 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+
+def populate_facets(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Entry = apps.get_model('adminjournal', 'Entry')
+    Facet = apps.get_model('adminjournal', 'Facet')
+    entries = Entry.objects.using(schema_editor.connection.alias).order_by()
+
+    facets = [
+        Facet(kind='user_repr', value=value)
+        for value in entries.values_list('user_repr', flat=True).distinct()
+    ]
+    # The content types might be stored in another database.
+    content_type_ids = list(entries.filter(content_type__isnull=False).values_list(
+        'content_type_id', flat=True).distinct())
+    facets.extend(
+        Facet(kind='app_label', value=value)
+        for value in ContentType.objects.filter(pk__in=content_type_ids).values_list(
+            'app_label', flat=True).distinct()
+    )
+    Facet.objects.using(schema_editor.connection.alias).bulk_create(facets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminjournal', '0003_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Facet',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32, verbose_name='Kind')),
+                ('value', models.CharField(max_length=255, verbose_name='Value')),
+            ],
+            options={
+                'verbose_name': 'Facet',
+                'verbose_name_plural': 'Facets',
+                'unique_together': {('kind', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_facets, migrations.RunPython.noop),
+    ]
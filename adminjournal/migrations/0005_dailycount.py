@@ -0,0 +1,30 @@
+# Generated by Django 2.2.28 on 2026-10-18 05:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminjournal', '0004_facets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('user_repr', models.CharField(max_length=255, verbose_name='User (repr)')),
+                ('content_type_repr', models.CharField(max_length=255, verbose_name='Content type (repr)')),
+                ('action', models.CharField(max_length=16, verbose_name='Action of entry')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Number of entries')),
+            ],
+            options={
+                'verbose_name': 'Daily count',
+                'verbose_name_plural': 'Daily counts',
+                'ordering': ('-date',),
+                'unique_together': {('date', 'user_repr', 'content_type_repr', 'action')},
+            },
+        ),
+    ]
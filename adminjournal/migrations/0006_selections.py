@@ -0,0 +1,40 @@
+# Generated by Django 2.2.28 on 2026-10-18 05:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminjournal', '0005_dailycount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Selection',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Timestamp')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Number of objects')),
+            ],
+            options={
+                'verbose_name': 'Selection',
+                'verbose_name_plural': 'Selections',
+            },
+        ),
+        migrations.CreateModel(
+            name='SelectedObject',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.TextField(verbose_name='Object ID')),
+                ('selection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='selected_objects', to='adminjournal.Selection', verbose_name='Selection')),
+            ],
+            options={
+                'verbose_name': 'Selected object',
+                'verbose_name_plural': 'Selected objects',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.28 on 2026-10-18 05:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminjournal', '0006_selections'),
+    ]
+
+    # The constraints are added again by adminjournal.constraints if the journal
+    # is stored in the database of the users and content types.
+    operations = [
+        migrations.AlterField(
+            model_name='entry',
+            name='content_type',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='contenttypes.ContentType', verbose_name='Content type'),
+        ),
+        migrations.AlterField(
+            model_name='entry',
+            name='user',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+    ]
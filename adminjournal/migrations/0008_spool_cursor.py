@@ -0,0 +1,25 @@
+# Generated by Django 2.2.28 on 2026-10-18 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminjournal', '0007_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpoolCursor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spool', models.CharField(max_length=36, unique=True, verbose_name='Spool')),
+                ('position', models.BigIntegerField(default=0, verbose_name='Position')),
+            ],
+            options={
+                'verbose_name': 'Spool cursor',
+                'verbose_name_plural': 'Spool cursors',
+            },
+        ),
+    ]
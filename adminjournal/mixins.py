@@ -1,10 +1,50 @@
 import json
+import logging
+import threading
+from contextlib import contextmanager
 
 from django.template.response import TemplateResponse
+from django.utils.functional import SimpleLazyObject
 
+from . import persistence
 from .entry import Entry
 
 
+logger = logging.getLogger(__name__)
+
+_batch = threading.local()
+
+
+@contextmanager
+def collecting_entries():
+    """
+    Context manager to collect all entries logged via `JournaledModelAdminMixin`
+    in the current thread and persist them at once (see
+    `adminjournal.persistence.persist_many`) when the outermost block is left.
+
+    The entries are persisted even if the wrapped code raises an exception. In
+    that case, errors while persisting the entries are logged and the original
+    exception is raised.
+    """
+    if getattr(_batch, 'entries', None) is not None:
+        yield
+        return
+
+    _batch.entries = []
+    try:
+        yield
+    except BaseException:
+        entries, _batch.entries = _batch.entries, None
+        try:
+            persistence.persist_many(entries)
+        except Exception:
+            logger.exception('Failed to persist %s journal entries.', len(entries))
+        raise
+
+    entries, _batch.entries = _batch.entries, None
+    persistence.persist_many(entries)
+
+
 class JournaledModelAdminMixin(object):
     """
     Mixin for ModelAdmin classes to issue journal entries on various actions
@@ -17,9 +57,23 @@ class JournaledModelAdminMixin(object):
         * Add object
         * Delete object
         * Changelist actions (selected action and selected objects)
+
+    If the journal is authoritative (``adminjournal_authoritative`` attribute or
+    ``ADMINJOURNAL_AUTHORITATIVE`` setting), Django's LogEntry is not written and
+    the history view shows the journal entries instead.
     """
 
-    def log_to_adminjournal(self, action, user, message, model=None, payload=None):
+    #: Skip Django's LogEntry, `None` to use the ``ADMINJOURNAL_AUTHORITATIVE`` setting.
+    #: The recent actions of the admin index page only follow the setting.
+    adminjournal_authoritative = None
+
+    #: Actions rendering a confirmation page first, they are executed on the POST
+    #: request containing ``post`` (like Django's ``delete_selected``).
+    adminjournal_confirmed_actions = ('delete_selected',)
+
+    def log_to_adminjournal(
+        self, action, user, message, model=None, payload=None, object_repr=None
+    ):
         """
         The log_to_adminjournal method requires at least the action type and the
         issuing user together with a human readable message or a change_message-style
@@ -32,6 +86,8 @@ class JournaledModelAdminMixin(object):
 
         If a str message is provided and the payload is a dictionary, the data is passed
         to the persistence layer.
+
+        If an `object_repr` is provided, it is added to the payload.
         """
 
         # Django 1.9 returns a string, 1.10+ returns a list
@@ -43,37 +99,87 @@ class JournaledModelAdminMixin(object):
             payload = payload
             description = message
 
-        Entry(
+        payload = payload if isinstance(payload, dict) else {}
+        if object_repr is not None:
+            payload = dict(payload, object_repr=object_repr)
+
+        entry = Entry(
             action,
             user,
             model_class=self.model,
             model=model,
             description=description,
-            payload=payload if isinstance(payload, dict) else {},
-        ).persist()
+            payload=payload,
+        )
+
+        if getattr(_batch, 'entries', None) is not None:
+            _batch.entries.append(entry)
+        else:
+            entry.persist()
+
+    def is_adminjournal_authoritative(self):
+        from .history import is_authoritative
+        return is_authoritative(self)
 
     def log_addition(self, request, model, message):
         """
         In addition to the Django LogEntry, add another entry to the adminjournal.
+        If the journal is authoritative, only the journal entry is written.
         """
+        if self.is_adminjournal_authoritative():
+            self.log_to_adminjournal(
+                Entry.ACTION_ADD, request.user, message, model, object_repr=str(model))
+            return None
+
         self.log_to_adminjournal(Entry.ACTION_ADD, request.user, message, model)
         return super(JournaledModelAdminMixin, self).log_addition(request, model, message)
 
     def log_change(self, request, model, message):
         """
         In addition to the Django LogEntry, add another entry to the adminjournal.
+        If the journal is authoritative, only the journal entry is written.
         """
+        if self.is_adminjournal_authoritative():
+            self.log_to_adminjournal(
+                Entry.ACTION_CHANGE, request.user, message, model, object_repr=str(model))
+            return None
+
         self.log_to_adminjournal(Entry.ACTION_CHANGE, request.user, message, model)
         return super(JournaledModelAdminMixin, self).log_change(request, model, message)
 
     def log_deletion(self, request, model, object_repr):
         """
         In addition to the Django LogEntry, add another entry to the adminjournal.
+        If the journal is authoritative, only the journal entry is written.
         """
+        if self.is_adminjournal_authoritative():
+            self.log_to_adminjournal(
+                Entry.ACTION_DELETE, request.user, 'Deleted "{}"'.format(object_repr), model,
+                object_repr=object_repr)
+            return None
+
         self.log_to_adminjournal(
             Entry.ACTION_DELETE, request.user, 'Deleted "{}"'.format(object_repr), model)
         return super(JournaledModelAdminMixin, self).log_deletion(request, model, object_repr)
 
+    def history_view(self, request, object_id, extra_context=None):
+        """
+        If the journal is authoritative, the history of the object is taken from
+        the journal entries (see `adminjournal.history`) instead of Django's LogEntry,
+        which is not queried then.
+        """
+        if self.is_adminjournal_authoritative():
+            from django.contrib.admin.utils import unquote
+
+            from .history import get_object_history
+
+            # Evaluated when rendered, after the permissions were checked.
+            extra_context = dict(extra_context or {}, action_list=SimpleLazyObject(
+                lambda: get_object_history(self.model, unquote(object_id))))
+
+        return super(JournaledModelAdminMixin, self).history_view(
+            request, object_id, extra_context)
+
     def render_change_form(self, request, *args, **kwargs):
         """
         If a object change view is requested (GET request on change view),
@@ -97,6 +203,14 @@ class JournaledModelAdminMixin(object):
 
         We don't know what the action does, therefore all actions are tracked
         as ACTION_VIEW.
+
+        Entries logged while the action runs (e.g. one deletion per object by
+        ``delete_selected``) are collected and persisted at once.
+
+        If all objects are selected and ``ADMINJOURNAL_SELECT_ACROSS_CAPTURE`` is
+        set, the affected objects are recorded as ``selection`` in the payload
+        (see `adminjournal.selection`) before the action runs. Actions listed in
+        `adminjournal_confirmed_actions` are only captured once confirmed.
         """
 
         try:
@@ -113,18 +227,29 @@ class JournaledModelAdminMixin(object):
 
         action_name = dict(self.get_action_choices(request))[action]
 
-        self.log_to_adminjournal(
-            Entry.ACTION_VIEW,
-            request.user,
-            'Action "{}" executed on {} objects.'.format(
-                action_name, 'all' if selected_all else len(selected_ids)),
-            payload={
-                'action': action,
-                'selected_all': selected_all,
-                'selected_ids': selected_ids if not selected_all else [],
-            }
-        )
-        return super(JournaledModelAdminMixin, self).response_action(request, queryset)
+        payload = {
+            'action': action,
+            'selected_all': selected_all,
+            'selected_ids': selected_ids if not selected_all else [],
+        }
+
+        confirmed = (
+            action not in self.adminjournal_confirmed_actions or 'post' in request.POST)
+
+        if selected_all and confirmed:
+            from .selection import capture, get_mode
+            if get_mode():
+                payload['selection'] = capture(queryset, dict(request.GET.items()))
+
+        with collecting_entries():
+            self.log_to_adminjournal(
+                Entry.ACTION_VIEW,
+                request.user,
+                'Action "{}" executed on {} objects.'.format(
+                    action_name, 'all' if selected_all else len(selected_ids)),
+                payload=payload
+            )
+            return super(JournaledModelAdminMixin, self).response_action(request, queryset)
 
     def changelist_view(self, request, *args, **kwargs):
         """
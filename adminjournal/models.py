@@ -1,5 +1,8 @@
+import uuid
+
 from django.conf import settings
 from django.contrib.postgres.fields import JSONField
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
@@ -9,14 +12,16 @@ class Entry(models.Model):
     timestamp = models.DateTimeField(_('Timestamp'), default=timezone.now)
     action = models.CharField(_('Action of entry'), max_length=16)
 
+    # The database constraints of the foreign keys (if any) are managed by
+    # `adminjournal.constraints`, they depend on the database of the journal.
     user = models.ForeignKey(
-        settings.AUTH_USER_MODEL, verbose_name=_('User'),
-        on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+        settings.AUTH_USER_MODEL, verbose_name=_('User'), blank=True, null=True,
+        related_name='+', db_index=False, on_delete=models.DO_NOTHING, db_constraint=False)
     user_repr = models.CharField(_('User (repr)'), max_length=255)
 
     content_type = models.ForeignKey(
-        'contenttypes.ContentType', verbose_name=_('Content type'),
-        on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+        'contenttypes.ContentType', verbose_name=_('Content type'), blank=True, null=True,
+        related_name='+', db_index=False, on_delete=models.DO_NOTHING, db_constraint=False)
     content_type_repr = models.CharField(_('Content type (repr)'), max_length=255)
 
     object_id = models.TextField(_('Object ID'), blank=True, null=True)
@@ -29,6 +34,120 @@ class Entry(models.Model):
         verbose_name = _('Journal entry')
         verbose_name_plural = _('Journal entries')
         ordering = ('-timestamp',)
+        # The foreign keys are covered by the composite indexes.
+        indexes = [
+            models.Index(fields=['timestamp'], name='adminjournal_timestamp_idx'),
+            models.Index(
+                fields=['content_type', 'object_id', 'timestamp'],
+                name='adminjournal_object_idx'),
+            models.Index(fields=['user', 'timestamp'], name='adminjournal_user_idx'),
+            models.Index(fields=['action', 'timestamp'], name='adminjournal_action_idx'),
+        ]
 
     def __str__(self):
         return str(self.timestamp)
+
+    def get_user(self):
+        """
+        Returns the user of the entry, `None` if the user does not exist anymore.
+        """
+        try:
+            return self.user
+        except ObjectDoesNotExist:
+            return None
+    get_user.short_description = _('User')
+
+    def get_content_type(self):
+        """
+        Returns the content type of the entry, `None` if it does not exist anymore.
+        """
+        try:
+            return self.content_type
+        except ObjectDoesNotExist:
+            return None
+    get_content_type.short_description = _('Content type')
+
+
+class Facet(models.Model):
+    """
+    Distinct values of entry fields used by the list filters of the entry admin.
+    See `adminjournal.facets`.
+    """
+    kind = models.CharField(_('Kind'), max_length=32)
+    value = models.CharField(_('Value'), max_length=255)
+
+    class Meta:
+        verbose_name = _('Facet')
+        verbose_name_plural = _('Facets')
+        unique_together = (('kind', 'value'),)
+
+    def __str__(self):
+        return '{}: {}'.format(self.kind, self.value)
+
+
+class DailyCount(models.Model):
+    """
+    Number of journal entries per day, user, content type and action.
+    See `adminjournal.rollup`.
+    """
+    date = models.DateField(_('Date'))
+    user_repr = models.CharField(_('User (repr)'), max_length=255)
+    content_type_repr = models.CharField(_('Content type (repr)'), max_length=255)
+    action = models.CharField(_('Action of entry'), max_length=16)
+    count = models.PositiveIntegerField(_('Number of entries'), default=0)
+
+    class Meta:
+        verbose_name = _('Daily count')
+        verbose_name_plural = _('Daily counts')
+        ordering = ('-date',)
+        unique_together = (('date', 'user_repr', 'content_type_repr', 'action'),)
+
+    def __str__(self):
+        return str(self.date)
+
+
+class Selection(models.Model):
+    """
+    Objects affected by a changelist action on all objects (``select_across``).
+    See `adminjournal.selection`.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    timestamp = models.DateTimeField(_('Timestamp'), default=timezone.now)
+    count = models.PositiveIntegerField(_('Number of objects'), default=0)
+
+    class Meta:
+        verbose_name = _('Selection')
+        verbose_name_plural = _('Selections')
+
+    def __str__(self):
+        return str(self.id)
+
+
+class SelectedObject(models.Model):
+    selection = models.ForeignKey(
+        Selection, verbose_name=_('Selection'), on_delete=models.CASCADE,
+        related_name='selected_objects')
+    object_id = models.TextField(_('Object ID'))
+
+    class Meta:
+        verbose_name = _('Selected object')
+        verbose_name_plural = _('Selected objects')
+
+    def __str__(self):
+        return self.object_id
+
+
+class SpoolCursor(models.Model):
+    """
+    Id of the last entry of a spool file stored in the journal.
+    See `adminjournal.spool`.
+    """
+    spool = models.CharField(_('Spool'), max_length=36, unique=True)
+    position = models.BigIntegerField(_('Position'), default=0)
+
+    class Meta:
+        verbose_name = _('Spool cursor')
+        verbose_name_plural = _('Spool cursors')
+
+    def __str__(self):
+        return '{}: {}'.format(self.spool, self.position)
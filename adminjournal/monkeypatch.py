@@ -14,6 +14,10 @@ def patch_admin_site(site):
 
     After patching the admin site, this helper checks all already registered
     model admins to be adminjournal enabled.
+
+    If the journal is authoritative (``ADMINJOURNAL_AUTHORITATIVE``), the recent
+    actions of the index page are taken from the journal. The
+    ``adminjournal_authoritative`` attribute of model admins is not considered.
     """
 
     # Check/set a marker that we already patched this admin site.
@@ -21,6 +25,9 @@ def patch_admin_site(site):
         return
     site._adminjournal_patched = True
 
+    if getattr(settings, 'ADMINJOURNAL_AUTHORITATIVE', False) and not site.index_template:
+        site.index_template = 'admin/adminjournal/index.html'
+
     # Remember original register method.
     vender_site_register = site.register
 
@@ -56,7 +63,7 @@ def patch_admin_site(site):
     site.register = types.MethodType(adminjournal_site_register, site)
 
     # Check already registered model admins for adminjournal mixin.
-    for model, admin_class in site._registry.items():
+    for model, admin_class in list(site._registry.items()):
         if not hasattr(admin_class, 'log_to_adminjournal'):
             # Mixin missing, re-register.
             site.unregister(model)
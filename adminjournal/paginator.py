@@ -0,0 +1,102 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+#: Name of the GET parameter holding the keyset cursor in the changelist.
+CURSOR_VAR = 'cursor'
+
+KEYSET_ORDERINGS = (('-timestamp', '-pk'), ('-timestamp', '-id'))
+
+
+def get_estimated_count(model, using):
+    """
+    Returns PostgreSQL's estimated number of rows of the model's table (including
+    all partitions), based on the statistics of the query planner.
+    """
+    table = model._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT COALESCE(SUM(GREATEST(reltuples, 0)), 0)::bigint FROM pg_class '
+            'WHERE oid = %s::regclass '
+            'OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)',
+            [table, table]
+        )
+        return cursor.fetchone()[0]
+
+
+def format_cursor(number, obj):
+    """
+    Returns the cursor pointing to page `number` which starts after `obj`.
+    """
+    return '{}:{}:{}'.format(number, obj.pk, obj.timestamp.isoformat())
+
+
+def parse_cursor(value):
+    """
+    Returns a ``(page number, pk, timestamp)`` tuple or `None` if the value is invalid.
+    """
+    try:
+        number, pk, timestamp = value.split(':', 2)
+        timestamp = parse_datetime(timestamp)
+        if timestamp is None:
+            return None
+        return int(number), int(pk), timestamp
+    except ValueError:
+        return None
+
+
+class JournalPaginator(Paginator):
+    """
+    Paginator for large journal tables.
+
+    * If the queryset is not filtered, the number of entries is estimated using
+      the planner statistics instead of running ``COUNT(*)``. Small tables
+      (below `estimate_threshold` entries) are counted anyway.
+    * If a `cursor` (see `format_cursor`) for the requested page is provided, the
+      page is fetched using keyset pagination on ``(timestamp, id)`` instead of
+      ``OFFSET``. The cursor of the following page is available as `next_cursor`
+      of the page.
+
+    The last requested page is kept as `current_page` to render the pagination.
+    """
+    estimate_threshold = 100000
+
+    def __init__(self, *args, **kwargs):
+        self.cursor = kwargs.pop('cursor', None)
+        super(JournalPaginator, self).__init__(*args, **kwargs)
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = get_estimated_count(self.object_list.model, self.object_list.db)
+            if estimate >= self.estimate_threshold:
+                return estimate
+
+        return super(JournalPaginator, self).count
+
+    @property
+    def keyset_enabled(self):
+        return tuple(self.object_list.query.order_by) in KEYSET_ORDERINGS
+
+    def page(self, number):
+        number = self.validate_number(number)
+
+        if self.keyset_enabled and self.cursor and self.cursor[0] == number:
+            number, pk, timestamp = self.cursor
+            object_list = list(self.object_list.filter(
+                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, pk__lt=pk)
+            )[:self.per_page])
+            page = self._get_page(object_list, number, self)
+        else:
+            page = super(JournalPaginator, self).page(number)
+            page.object_list = list(page.object_list)
+
+        page.next_cursor = None
+        if self.keyset_enabled and page.object_list and page.has_next():
+            page.next_cursor = format_cursor(number + 1, page.object_list[-1])
+
+        self.current_page = page
+        return page
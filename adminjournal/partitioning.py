@@ -0,0 +1,286 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Entry
+
+
+INTERVAL_MONTH, INTERVAL_WEEK = ('month', 'week')
+
+
+def get_interval():
+    """
+    Returns the configured partition interval or `None` if partitioning is disabled.
+    """
+    interval = getattr(settings, 'ADMINJOURNAL_PARTITION_INTERVAL', None)
+    if interval not in (None, INTERVAL_MONTH, INTERVAL_WEEK):
+        raise ImproperlyConfigured(
+            'Invalid `ADMINJOURNAL_PARTITION_INTERVAL` provided: {}'.format(interval))
+    return interval
+
+
+def _make_aware(value):
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value.astimezone(timezone.utc)
+
+
+def get_period_start(value, interval):
+    """
+    Returns the start (in UTC) of the period the given datetime belongs to.
+    """
+    value = _make_aware(value)
+    start = datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    if interval == INTERVAL_MONTH:
+        return start.replace(day=1)
+    return start - timedelta(days=start.weekday())
+
+
+def get_next_period_start(start, interval):
+    """
+    Returns the start of the period following the period starting at `start`.
+    """
+    if interval == INTERVAL_MONTH:
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=7)
+
+
+def get_partition_name(start, interval):
+    return '{}_p{}'.format(
+        Entry._meta.db_table,
+        start.strftime('%Y%m' if interval == INTERVAL_MONTH else '%Y%m%d')
+    )
+
+
+def get_default_partition_name(model=Entry):
+    return '{}_default'.format(model._meta.db_table)
+
+
+def is_partitioned(connection):
+    """
+    Returns `True` if the journal table is a partitioned table.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass',
+            [Entry._meta.db_table]
+        )
+        return cursor.fetchone() is not None
+
+
+def get_partitions(connection):
+    """
+    Returns a list of ``(name, upper bound)`` tuples of all range partitions,
+    ordered by the upper bound. The upper bounds are returned in UTC. The default
+    partition is not included.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname, EXTRACT(EPOCH FROM (regexp_match('
+            "pg_get_expr(c.relpartbound, c.oid), 'TO \\(''([^'']+)''\\)'"
+            '))[1]::timestamptz)::float AS upper_bound '
+            'FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = %s::regclass '
+            "AND pg_get_expr(c.relpartbound, c.oid) <> 'DEFAULT' ORDER BY upper_bound",
+            [Entry._meta.db_table]
+        )
+        return [
+            (name, datetime.fromtimestamp(upper_bound, timezone.utc))
+            for name, upper_bound in cursor.fetchall()
+        ]
+
+
+def convert_table(connection, interval, model=Entry):
+    """
+    Convert the journal table to a table partitioned by range of the timestamp.
+
+    The existing table is kept as partition for all entries up to the end of the
+    current period. The indexes of the (historical) `model` are created on the
+    partitioned table. Entries outside of the range partitions are stored in the
+    default partition (see `create_default_partition`).
+    """
+    if connection.vendor != 'postgresql' or connection.pg_version < 110000:
+        raise ImproperlyConfigured('Partitioning requires PostgreSQL 11 or newer.')
+
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    legacy_table = '{}_legacy'.format(table)
+    user_field = model._meta.get_field('user')
+    content_type_field = model._meta.get_field('content_type')
+    boundary = get_next_period_start(get_period_start(timezone.now(), interval), interval)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_get_serial_sequence(%s, 'id'), conname FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'p'",
+            [table, table]
+        )
+        sequence, primary_key = cursor.fetchone()
+
+        cursor.execute(
+            'SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+            'WHERE i.indrelid = %s::regclass AND NOT i.indisprimary',
+            [table]
+        )
+        indexes = [name for name, in cursor.fetchall()]
+
+        statements = [
+            'ALTER TABLE {table} RENAME TO {legacy_table}',
+            'ALTER TABLE {legacy_table} DROP CONSTRAINT {primary_key}, '
+            'ADD PRIMARY KEY ({id}, {timestamp})',
+            'ALTER SEQUENCE {sequence} OWNED BY NONE',
+            'CREATE TABLE {table} (LIKE {legacy_table} INCLUDING DEFAULTS) '
+            'PARTITION BY RANGE ({timestamp})',
+            'ALTER TABLE {table} ADD PRIMARY KEY ({id}, {timestamp})',
+        ]
+        # Historical models might still have foreign key constraints.
+        if user_field.db_constraint:
+            statements.append(
+                'ALTER TABLE {table} ADD FOREIGN KEY ({user}) REFERENCES {user_table} '
+                'DEFERRABLE INITIALLY DEFERRED')
+        if content_type_field.db_constraint:
+            statements.append(
+                'ALTER TABLE {table} ADD FOREIGN KEY ({content_type}) '
+                'REFERENCES {content_type_table} DEFERRABLE INITIALLY DEFERRED')
+        # The index names are kept for the partitioned table.
+        statements.extend(
+            'ALTER INDEX {} RENAME TO {}'.format(qn(name), qn('{}_legacy'.format(name)))
+            for name in indexes
+        )
+
+        for statement in statements:
+            cursor.execute(statement.format(
+                table=qn(table),
+                legacy_table=qn(legacy_table),
+                primary_key=qn(primary_key),
+                sequence=sequence,
+                id=qn(model._meta.pk.column),
+                timestamp=qn(model._meta.get_field('timestamp').column),
+                user=qn(user_field.column),
+                user_table=qn(user_field.related_model._meta.db_table),
+                content_type=qn(content_type_field.column),
+                content_type_table=qn(content_type_field.related_model._meta.db_table),
+            ))
+
+    with connection.schema_editor(atomic=False) as schema_editor:
+        for statement in schema_editor._model_indexes_sql(model):
+            schema_editor.execute(statement)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM (MINVALUE) TO (%s)'.format(
+                qn(table), qn(legacy_table)),
+            [boundary]
+        )
+        cursor.execute('ALTER SEQUENCE {} OWNED BY {}.{}'.format(
+            sequence, qn(table), qn(model._meta.pk.column)))
+
+    create_default_partition(connection, model)
+
+
+def create_default_partition(connection, model=Entry):
+    """
+    Create the ``DEFAULT`` partition for entries outside of the range partitions
+    (e.g. backdated entries after the legacy partition was dropped, or entries
+    of periods without partition). Returns `True` if the partition was created.
+    """
+    name = get_default_partition_name(model)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s) IS NULL', [name])
+        if not cursor.fetchone()[0]:
+            return False
+        cursor.execute('CREATE TABLE {} PARTITION OF {} DEFAULT'.format(
+            connection.ops.quote_name(name),
+            connection.ops.quote_name(model._meta.db_table)))
+    return True
+
+
+def create_partitions(connection, interval, count):
+    """
+    Create the partitions for the current and the next `count` periods.
+    Gaps after the latest existing partition are filled. Entries of the periods
+    stored in the default partition are moved to the new partitions.
+
+    Returns the names of the created partitions.
+    """
+    partitions = get_partitions(connection)
+    now = timezone.now()
+
+    start = get_period_start(now, interval)
+    if partitions:
+        start = min(start, partitions[-1][1])
+
+    end = get_period_start(now, interval)
+    for i in range(count + 1):
+        end = get_next_period_start(end, interval)
+
+    created = []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        while start < end:
+            next_start = get_next_period_start(start, interval)
+            if not partitions or start >= partitions[-1][1]:
+                name = get_partition_name(start, interval)
+                create_partition(cursor, connection, name, start, next_start)
+                created.append(name)
+            start = next_start
+
+    return created
+
+
+def create_partition(cursor, connection, name, start, end):
+    qn = connection.ops.quote_name
+    table = Entry._meta.db_table
+    default = get_default_partition_name()
+
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [default])
+    if not cursor.fetchone()[0]:
+        cursor.execute(
+            'CREATE TABLE {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)'.format(
+                qn(name), qn(table)),
+            [start, end]
+        )
+        return
+
+    # A partition can't be created if the default partition contains entries of
+    # its range, they are moved to the new table before it is attached.
+    timestamp = qn(Entry._meta.get_field('timestamp').column)
+    cursor.execute('LOCK TABLE {} IN ACCESS EXCLUSIVE MODE'.format(qn(default)))
+    cursor.execute('CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS)'.format(qn(name), qn(table)))
+    cursor.execute(
+        'WITH moved AS (DELETE FROM {default} WHERE {timestamp} >= %s AND {timestamp} < %s '
+        'RETURNING *) INSERT INTO {name} SELECT * FROM moved'.format(
+            default=qn(default), timestamp=timestamp, name=qn(name)),
+        [start, end]
+    )
+    cursor.execute(
+        'ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM (%s) TO (%s)'.format(
+            qn(table), qn(name)),
+        [start, end]
+    )
+
+
+def drop_expired_partitions(connection, cutoff):
+    """
+    Drop all partitions which only contain entries older than `cutoff`.
+
+    Returns a list of ``(name, estimated number of entries)`` tuples of the
+    dropped partitions.
+    """
+    cutoff = _make_aware(cutoff)
+    dropped = []
+    with connection.cursor() as cursor:
+        for name, upper_bound in get_partitions(connection):
+            if upper_bound > cutoff:
+                break
+
+            cursor.execute(
+                'SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = %s::regclass',
+                [name]
+            )
+            dropped.append((name, cursor.fetchone()[0]))
+            cursor.execute('DROP TABLE {}'.format(connection.ops.quote_name(name)))
+
+    return dropped
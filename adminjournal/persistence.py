@@ -1,6 +1,13 @@
 import importlib
+import threading
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+_backends = {}
+_backends_lock = threading.Lock()
 
 
 def persist(entry, backend=None):
@@ -14,11 +21,46 @@ def persist(entry, backend=None):
     return get_persistence_backend(backend).persist(entry)
 
 
+def persist_many(entries, backend=None):
+    """
+    Persist a list of `adminjournal.entry.Entry` instances at once, e.g. using a
+    single bulk insert. See `persist` for the parameters.
+
+    The return value is `True` if all entries were saved.
+    """
+    if not entries:
+        return True
+    return get_persistence_backend(backend).persist_many(entries)
+
+
+async def apersist(entry, backend=None):
+    """
+    Async variant of `persist` to be awaited in coroutines (e.g. async views under
+    ASGI). The backends write the entry without blocking the event loop.
+    """
+    return await get_persistence_backend(backend).apersist(entry)
+
+
+async def apersist_many(entries, backend=None):
+    """
+    Async variant of `persist_many`.
+    """
+    if not entries:
+        return True
+    return await get_persistence_backend(backend).apersist_many(entries)
+
+
 def get_persistence_backend(path=None):
     """
     Load a persistence backend and return a instance.
     If a path is provided, the backend is imported from that path.
     By default, ``adminjournal.persistence_backends.db.Backend`` is used.
+
+    If a list of backends is provided, a ``adminjournal.persistence_backends.fanout.Backend``
+    is returned to pass the entries to all of them.
+
+    Backends are instantiated (and set up) once per process and path. The instances
+    are closed and dropped when a ``ADMINJOURNAL_*`` setting changes.
     """
     path = path or getattr(
         settings,
@@ -26,7 +68,46 @@ def get_persistence_backend(path=None):
         'adminjournal.persistence_backends.db.Backend'
     )
 
-    module_name, class_name = path.rsplit('.', 1)
-    module = importlib.import_module(module_name)
-    backend_class = getattr(module, class_name)
-    return backend_class()
+    key = path if isinstance(path, str) else repr(path)
+
+    backend = _backends.get(key)
+    if backend is not None:
+        return backend
+
+    # The backend is set up outside of the lock, its setup might load other
+    # backends (e.g. the fanout backend) or block.
+    if isinstance(path, str):
+        module_name, class_name = path.rsplit('.', 1)
+        module = importlib.import_module(module_name)
+        backend = getattr(module, class_name)()
+    else:
+        from .persistence_backends import fanout
+        backend = fanout.Backend(path)
+    backend.setup()
+
+    with _backends_lock:
+        existing = _backends.setdefault(key, backend)
+
+    # Another thread loaded the backend in the meantime.
+    if existing is not backend:
+        backend.close()
+    return existing
+
+
+def close_persistence_backends():
+    """
+    Close all loaded persistence backends. The backends are loaded again
+    on the next call to `get_persistence_backend`.
+    """
+    with _backends_lock:
+        backends = list(_backends.values())
+        _backends.clear()
+
+    for backend in backends:
+        backend.close()
+
+
+@receiver(setting_changed)
+def reset_persistence_backends(setting, **kwargs):
+    if setting.startswith('ADMINJOURNAL_'):
+        close_persistence_backends()
@@ -0,0 +1,237 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import db
+from .base import run_in_executor
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class Writer(object):
+    """
+    Bounded in-process queue which is drained by a writer thread in batches.
+
+    The `write_batch` callable receives a list of queued items and is called
+    from the writer thread. `write_sync` (default: `write_batch`) writes items in
+    the calling thread, see the ``sync`` overflow policy. If `flush_interval` is
+    set, the writer waits up to the given number of seconds for a batch to fill
+    up. If the queue is full, the `overflow` policy decides what happens:
+
+        * ``block``: Wait until the writer thread made room for the item.
+        * ``drop_oldest``: Discard the oldest queued item.
+        * ``sync``: Call `write_sync` with the single item in the calling thread.
+    """
+    OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_SYNC = ('block', 'drop_oldest', 'sync')
+
+    def __init__(
+        self, write_batch, maxsize=1000, batch_size=100, overflow=OVERFLOW_BLOCK,
+        flush_interval=0, write_sync=None
+    ):
+        if overflow not in (self.OVERFLOW_BLOCK, self.OVERFLOW_DROP_OLDEST, self.OVERFLOW_SYNC):
+            raise ValueError('Invalid `overflow` provided: {}'.format(overflow))
+
+        self.write_batch = write_batch
+        self.write_sync = write_sync or write_batch
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.flush_interval = flush_interval
+
+        #: Number of items discarded because of the ``drop_oldest`` policy.
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    @property
+    def depth(self):
+        """
+        Returns the number of items waiting to be written.
+        """
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self):
+        """
+        Start the writer thread if it is not running in the current process.
+        """
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+
+            if self._pid is None:
+                atexit.register(self.stop)
+
+            # The queue is (re)created to not inherit locks from a parent process.
+            self._pid = os.getpid()
+            self._queue = queue.Queue(self.maxsize)
+            self._thread = threading.Thread(
+                target=self._run, name='adminjournal-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Write all queued items and stop the writer thread.
+        """
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                return
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def put(self, item):
+        """
+        Queue the item to be written by the writer thread.
+        """
+        self.start()
+
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                if self.overflow == self.OVERFLOW_BLOCK:
+                    self._queue.put(item)
+                    return
+                elif self.overflow == self.OVERFLOW_SYNC:
+                    self.write_sync([item])
+                    return
+
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+    def put_nowait(self, item):
+        """
+        Queue the item if the queue is not full. Returns `True` if the item was queued.
+        """
+        self.start()
+
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def join(self):
+        """
+        Block until all queued items are written.
+        """
+        if self._queue:
+            self._queue.join()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    timeout = deadline - time.monotonic()
+                    if timeout > 0:
+                        batch.append(self._queue.get(timeout=timeout))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            items = [item for item in batch if item is not _STOP]
+            stop = len(items) != len(batch)
+
+            try:
+                if items:
+                    self.write_batch(items)
+            except Exception:
+                logger.exception('Failed to write %s journal entries.', len(items))
+            finally:
+                for item in batch:
+                    self._queue.task_done()
+
+
+def write_instances(instances):
+    """
+    Store the given `adminjournal.models.Entry` instances from the writer thread.
+    The connections are only closed here, the request thread might be in a transaction.
+    """
+    close_old_connections()
+    try:
+        db.save_instances(instances)
+    finally:
+        close_old_connections()
+
+
+class Backend(db.Backend):
+    """
+    Database-backed persistence layer which stores entries asynchronously.
+
+    The entries are handed to a bounded queue and written in batches by a
+    writer thread. Queued entries are written when the backend is closed or
+    the process exits.
+
+    The backend has three settings:
+        * ADMINJOURNAL_BACKGROUND_QUEUE_SIZE: Maximum number of queued entries
+        * ADMINJOURNAL_BACKGROUND_BATCH_SIZE: Maximum number of entries written at once
+        * ADMINJOURNAL_BACKGROUND_OVERFLOW: Policy if the queue is full (see `Writer`)
+    """
+
+    def __init__(self):
+        self.writer = Writer(
+            write_instances,
+            maxsize=getattr(settings, 'ADMINJOURNAL_BACKGROUND_QUEUE_SIZE', 1000),
+            batch_size=getattr(settings, 'ADMINJOURNAL_BACKGROUND_BATCH_SIZE', 100),
+            overflow=getattr(settings, 'ADMINJOURNAL_BACKGROUND_OVERFLOW', 'block'),
+            write_sync=db.save_instances,
+        )
+
+    def setup(self):
+        self.writer.start()
+
+    def close(self):
+        self.writer.stop()
+
+    @property
+    def queue_depth(self):
+        """
+        Returns the number of entries waiting to be written.
+        """
+        return self.writer.depth
+
+    def persist(self, entry):
+        self.writer.put(self.get_instance(entry))
+        return True
+
+    def persist_many(self, entries):
+        for entry in entries:
+            self.persist(entry)
+        return True
+
+    async def apersist(self, entry):
+        return await self.apersist_many([entry])
+
+    async def apersist_many(self, entries):
+        instances = [self.get_instance(entry) for entry in entries]
+        for index, instance in enumerate(instances):
+            if not self.writer.put_nowait(instance):
+                # The queue is full, the overflow policy is applied in the default
+                # executor to not block the event loop.
+                await run_in_executor(self._put_all, instances[index:])
+                break
+        return True
+
+    def _put_all(self, instances):
+        for instance in instances:
+            self.writer.put(instance)
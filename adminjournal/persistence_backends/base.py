@@ -1,16 +1,113 @@
+import asyncio
+import weakref
+
+from django.db import close_old_connections
+
+
+def run_in_executor(func, *args):
+    """
+    Run `func` in the default executor of the current event loop and return a future.
+    Database connections of the executor thread are closed like at the end of
+    a request.
+    """
+    def call():
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+
+    return asyncio.get_event_loop().run_in_executor(None, call)
+
+
+class AsyncBatch(object):
+    """
+    Collects the items added by concurrent coroutines of one event loop and passes
+    them to the `write` callable at once (in the default executor). Items added
+    during the same iteration of the event loop end up in the same batch.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self._batches = weakref.WeakKeyDictionary()
+
+    async def add(self, items):
+        """
+        Add the items to the pending batch of the current event loop and wait until
+        the batch is written. Returns the result of `write`.
+        """
+        loop = asyncio.get_event_loop()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = ([], loop.create_future())
+            loop.create_task(self._flush(loop))
+
+        batch[0].extend(items)
+        # A cancelled caller must not cancel the write of the other items.
+        return await asyncio.shield(batch[1])
+
+    async def _flush(self, loop):
+        items, future = self._batches.pop(loop)
+        try:
+            result = await run_in_executor(self.write, items)
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+
 class BaseBackend(object):
     """
     Base backend to persist journal entries.
 
     Every backend must provide at least a `persist` method.
+
+    Backend instances are shared by all threads of a process. Resources which
+    should live across requests (e.g. connections, file handles or threads)
+    can be acquired in `setup` and released in `close`.
     """
 
     def __init__(self):
         pass
 
+    def setup(self):
+        """
+        The `setup` method is called once, after the backend was loaded.
+        """
+        pass
+
+    def close(self):
+        """
+        The `close` method is called when the backend is no longer used, e.g.
+        because the settings changed.
+        """
+        pass
+
     def persist(self, entry):
         """
         The `persist` method is able to persist instances of `adminjournal.entry.Entry`
         classes. The method will return `True` or `False` to signal success.
         """
         raise NotImplementedError
+
+    def persist_many(self, entries):
+        """
+        The `persist_many` method persists a list of `adminjournal.entry.Entry`
+        instances. Backends can override it to write the entries at once, by default
+        `persist` is called for every entry. Returns `True` if all entries were saved.
+        """
+        return all([self.persist(entry) for entry in entries])
+
+    async def apersist(self, entry):
+        """
+        The `apersist` coroutine is the async variant of `persist`. By default,
+        `persist` is called in the default executor of the event loop.
+        """
+        return await run_in_executor(self.persist, entry)
+
+    async def apersist_many(self, entries):
+        """
+        The `apersist_many` coroutine is the async variant of `persist_many`. By
+        default, `persist_many` is called in the default executor of the event loop.
+        """
+        return await run_in_executor(self.persist_many, entries)
@@ -0,0 +1,197 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import router, transaction
+
+from ..models import Entry
+from . import db
+
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+#: Number of times entries are written before they are dropped.
+MAX_ATTEMPTS = 2
+
+
+def _get_state():
+    if not hasattr(_state, 'pending'):
+        _state.pending = []
+        _state.failed = 0
+        _state.depth = 0
+        _state.buffers = []
+    return _state
+
+
+@contextmanager
+def buffering():
+    """
+    Context manager to collect all entries persisted via the buffered backend
+    and write them using a single bulk insert when the outermost block is left.
+
+    The entries are written even if the wrapped code raises an exception.
+    Because of this, failed requests or transactions are journaled too. Entries
+    which can't be written are logged and dropped, the result of the wrapped
+    code is kept.
+    """
+    state = _get_state()
+    state.depth += 1
+    try:
+        yield
+    finally:
+        state.depth -= 1
+        if not state.depth:
+            flush()
+            if state.pending:
+                logger.error('Failed to persist %s journal entries.', len(state.pending))
+            state.pending, state.failed = [], 0
+
+
+def _save(instances):
+    """
+    Write the instances, returns `False` if they could not be written. A
+    savepoint keeps the current transaction usable if writing fails.
+    """
+    try:
+        with transaction.atomic(using=router.db_for_write(Entry)):
+            db.save_instances(instances)
+    except Exception:
+        logger.exception('Failed to persist %s journal entries.', len(instances))
+        return False
+    return True
+
+
+def flush():
+    """
+    Write all pending entries of the current thread to the database.
+    Returns the number of written entries.
+
+    If writing fails, the entries are kept for the next flush. Entries which
+    failed before are dropped.
+    """
+    state = _get_state()
+    pending, state.pending = state.pending, []
+    failed, state.failed = state.failed, 0
+    if not pending or _save(pending):
+        return len(pending)
+
+    if failed:
+        logger.error('Dropped %s journal entries.', failed)
+    state.pending[:0] = pending[failed:]
+    state.failed += len(pending) - failed
+    return 0
+
+
+class TransactionBuffer(object):
+    """
+    Entries persisted in a transaction (or savepoint), written when the
+    transaction is committed. If the transaction is rolled back (or writing
+    fails), the entries are written afterwards (see `flush_rolled_back`).
+    """
+
+    def __init__(self, using):
+        self.using = using
+        self.pending = []
+        self.attempts = 0
+
+    def flush(self):
+        pending, self.pending = self.pending, []
+        self.attempts += 1
+        if pending and not _save(pending):
+            if self.attempts < MAX_ATTEMPTS:
+                self.pending = pending
+            else:
+                logger.error('Dropped %s journal entries.', len(pending))
+
+
+def get_transaction_buffer(using):
+    """
+    Returns the buffer of the current transaction (and savepoint) of the
+    database, its ``on_commit`` callback is registered once.
+    """
+    state = _get_state()
+    connection = transaction.get_connection(using)
+    savepoint_ids = set(connection.savepoint_ids)
+
+    for buffer in state.buffers:
+        if buffer.using == using and (
+            savepoint_ids, buffer.flush
+        ) in connection.run_on_commit:
+            return buffer
+
+    buffer = TransactionBuffer(using)
+    state.buffers.append(buffer)
+    transaction.on_commit(buffer.flush, using=using)
+    return buffer
+
+
+def flush_rolled_back(**kwargs):
+    """
+    Write the entries of rolled back transactions (and savepoints) of the current
+    thread. If a transaction is active, they are added to its buffer. Called
+    whenever entries are persisted and when a request is finished.
+    """
+    state = _get_state()
+    buffers, state.buffers = state.buffers, []
+    for buffer in buffers:
+        connection = transaction.get_connection(buffer.using)
+        registered = [callback for sids, callback in connection.run_on_commit]
+        if buffer.flush in registered:
+            state.buffers.append(buffer)
+        elif buffer.pending:
+            if connection.in_atomic_block:
+                current = get_transaction_buffer(buffer.using)
+                current.pending.extend(buffer.pending)
+                current.attempts = buffer.attempts
+            else:
+                buffer.flush()
+                if buffer.pending:
+                    state.buffers.append(buffer)
+
+
+class Backend(db.Backend):
+    """
+    Database-backed persistence layer that collects entries and stores them
+    using a single bulk insert.
+
+    Entries are buffered per thread. The buffer is written
+
+        * when the outermost `buffering` block is left (see
+          `adminjournal.middleware.JournalBufferMiddleware` to do this per request),
+        * when the current transaction is committed, if no `buffering` block is active,
+        * when the buffer of a `buffering` block reaches ``ADMINJOURNAL_BUFFER_SIZE``
+          entries (default: 100).
+
+    Entries issued in a transaction (outside of a `buffering` block) are kept in
+    a `TransactionBuffer`. If the transaction is rolled back, they are written
+    afterwards like with the middleware.
+
+    Entries persisted using `apersist` are not buffered per thread, they are
+    batched per event loop like in `adminjournal.persistence_backends.db.Backend`.
+    """
+
+    def persist(self, entry):
+        return self.persist_many([entry])
+
+    def persist_many(self, entries):
+        state = _get_state()
+        instances = [self.get_instance(entry) for entry in entries]
+
+        if not state.depth:
+            flush_rolled_back()
+            using = router.db_for_write(Entry)
+            if not transaction.get_connection(using).in_atomic_block:
+                db.save_instances(instances)
+                return True
+
+            # Entries written before the commit would be rolled back with the transaction.
+            get_transaction_buffer(using).pending.extend(instances)
+            return True
+
+        state.pending.extend(instances)
+        if len(state.pending) >= getattr(settings, 'ADMINJOURNAL_BUFFER_SIZE', 100):
+            flush()
+        return True
@@ -1,15 +1,57 @@
+from django.db import router, transaction
+
+from ..codec import encode_payload
 from ..models import Entry
-from .base import BaseBackend
+from ..signals import entries_persisted
+from .base import AsyncBatch, BaseBackend
+
+
+def save_instances(instances):
+    """
+    Store the given `adminjournal.models.Entry` instances using a single insert
+    and send the `adminjournal.signals.entries_persisted` signal. Both happen in
+    the same transaction, the receivers (e.g. the daily counts) see the entries
+    committed together with their own writes.
+    """
+    with transaction.atomic(using=router.db_for_write(Entry), savepoint=False):
+        Entry.objects.bulk_create(instances)
+        entries_persisted.send(sender=Entry, instances=instances)
 
 
 class Backend(BaseBackend):
     """
     Database-backed persistence layer for journal entries.
     Uses adminjournal.Entry model to store entries to database.
+
+    Entries persisted by concurrent coroutines of an event loop (`apersist`) are
+    stored using a single insert.
     """
 
+    def __init__(self):
+        self.batch = AsyncBatch(save_instances)
+
     def persist(self, entry):
-        Entry.objects.create(
+        save_instances([self.get_instance(entry)])
+        return True
+
+    def persist_many(self, entries):
+        save_instances([self.get_instance(entry) for entry in entries])
+        return True
+
+    async def apersist(self, entry):
+        return await self.apersist_many([entry])
+
+    async def apersist_many(self, entries):
+        await self.batch.add([self.get_instance(entry) for entry in entries])
+        return True
+
+    def get_instance(self, entry):
+        """
+        Build an unsaved `adminjournal.models.Entry` instance for the given
+        `adminjournal.entry.Entry`. Large payload values are encoded if
+        ``ADMINJOURNAL_PAYLOAD_COMPRESS_THRESHOLD`` is set (see `adminjournal.codec`).
+        """
+        return Entry(
             timestamp=entry.timestamp,
             action=entry.action,
             user=entry.user,
@@ -18,6 +60,5 @@ class Backend(BaseBackend):
             content_type_repr=entry.content_type_repr,
             object_id=entry.object_id,
             description=entry.description,
-            payload=entry.payload
+            payload=encode_payload(entry.payload)
         )
-        return True
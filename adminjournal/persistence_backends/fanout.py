@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent import futures
+
+from django.db import close_old_connections
+
+from .. import persistence
+from .base import BaseBackend
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Outcome of a single backend. `error` holds the raised exception (if any).
+Result = namedtuple('Result', ('path', 'success', 'error'))
+
+
+class BackendTimeout(Exception):
+    pass
+
+
+class BackendBusy(Exception):
+    pass
+
+
+class Backend(BaseBackend):
+    """
+    Persistence layer to pass every entry to multiple backends.
+
+    The backends are configured as list, every item is either the dotted path of
+    a backend or a dict with the keys ``BACKEND`` (dotted path) and ``TIMEOUT``.
+
+    Backends without a timeout are called one after another in the calling thread.
+    Backends with a timeout are called concurrently in (daemon) worker threads. The
+    caller waits at most ``TIMEOUT`` seconds (counted from the start of the dispatch)
+    for their result, slow backends keep running in the background. While the
+    previous call of a backend is still running, the backend is skipped, so a hung
+    backend occupies one thread at most and doesn't block the shutdown.
+
+    The backends are isolated from each other, exceptions are logged and
+    reported as failed `Result`.
+
+    In `apersist`, all backends are awaited concurrently and the timeouts apply
+    to each backend on its own.
+    """
+
+    def __init__(self, backends):
+        self.backends = [
+            (item, None) if isinstance(item, str) else (item['BACKEND'], item.get('TIMEOUT'))
+            for item in backends
+        ]
+        # Futures of the running calls per backend index.
+        self._running = {}
+        self._lock = threading.Lock()
+
+    def persist(self, entry):
+        return all(result.success for result in self.dispatch(entry))
+
+    def persist_many(self, entries):
+        return all(result.success for result in self.dispatch(entries, many=True))
+
+    async def apersist(self, entry):
+        return all(result.success for result in await self.adispatch(entry))
+
+    async def apersist_many(self, entries):
+        return all(result.success for result in await self.adispatch(entries, many=True))
+
+    async def adispatch(self, entry, many=False):
+        """
+        Async variant of `dispatch`.
+        """
+        return list(await asyncio.gather(*[
+            self._apersist(path, timeout, entry, many) for path, timeout in self.backends]))
+
+    def dispatch(self, entry, many=False):
+        """
+        Pass the entry (or the list of entries, if `many` is set) to all backends.
+        Returns a list of `Result` tuples in the order of the configured backends.
+        """
+        started = time.monotonic()
+        results = {}
+        pending = {}
+        for index, (path, timeout) in enumerate(self.backends):
+            if timeout is not None:
+                pending[index] = self._start(index, path, entry, many)
+                if pending[index] is None:
+                    logger.warning('Persistence backend %s is still busy, skipped.', path)
+                    results[index] = Result(path, False, BackendBusy(path))
+                    del pending[index]
+
+        for index, (path, timeout) in enumerate(self.backends):
+            if timeout is None:
+                results[index] = self._persist(path, entry, many)
+
+        for index, future in pending.items():
+            path, timeout = self.backends[index]
+            try:
+                results[index] = future.result(
+                    max(0, started + timeout - time.monotonic()))
+            except futures.TimeoutError:
+                logger.warning('Persistence backend %s timed out.', path)
+                results[index] = Result(path, False, BackendTimeout(path))
+
+        return [results[index] for index in range(len(self.backends))]
+
+    def _start(self, index, path, entry, many=False):
+        """
+        Call the backend in a new daemon thread, returns the future of the result
+        or `None` if the previous call of the backend is still running.
+        """
+        with self._lock:
+            running = self._running.get(index)
+            if running is not None and not running.done():
+                return None
+            future = self._running[index] = futures.Future()
+
+        def run():
+            future.set_result(self._persist_threaded(path, entry, many))
+
+        threading.Thread(target=run, name='adminjournal-fanout', daemon=True).start()
+        return future
+
+    def _persist(self, path, entry, many=False):
+        try:
+            backend = persistence.get_persistence_backend(path)
+            if many:
+                return Result(path, bool(backend.persist_many(entry)), None)
+            return Result(path, bool(backend.persist(entry)), None)
+        except Exception as exc:
+            logger.exception('Persistence backend %s failed.', path)
+            return Result(path, False, exc)
+
+    async def _apersist(self, path, timeout, entry, many=False):
+        try:
+            backend = persistence.get_persistence_backend(path)
+            if many:
+                success = await asyncio.wait_for(backend.apersist_many(entry), timeout)
+            else:
+                success = await asyncio.wait_for(backend.apersist(entry), timeout)
+            return Result(path, bool(success), None)
+        except asyncio.TimeoutError:
+            logger.warning('Persistence backend %s timed out.', path)
+            return Result(path, False, BackendTimeout(path))
+        except Exception as exc:
+            logger.exception('Persistence backend %s failed.', path)
+            return Result(path, False, exc)
+
+    def _persist_threaded(self, path, entry, many=False):
+        try:
+            return self._persist(path, entry, many)
+        finally:
+            close_old_connections()
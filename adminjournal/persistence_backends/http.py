@@ -0,0 +1,218 @@
+import gzip
+import http.client
+import logging
+import queue
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from ..spool import Spool, dump_instance
+from . import background
+
+
+logger = logging.getLogger(__name__)
+
+SENT, FAILED, REJECTED = ('sent', 'failed', 'rejected')
+
+#: Response statuses of failures which might succeed if retried, besides ``5xx``.
+RETRY_STATUSES = (408, 429)
+
+
+class ConnectionPool(object):
+    """
+    Keeps up to `size` idle persistent (keep-alive) connections to the host of the URL.
+    """
+
+    def __init__(self, url, timeout=5, size=4):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError('Invalid URL provided: {}'.format(url))
+
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https'
+            else http.client.HTTPConnection)
+        self.host = parts.netloc
+        self.path = '{}?{}'.format(parts.path, parts.query) if parts.query else parts.path
+        self.path = self.path or '/'
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(size)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager returning an idle or new connection. The connection is
+        closed if the block raises an exception, otherwise it is kept for reuse.
+        """
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self.connection_class(self.host, timeout=self.timeout)
+
+        try:
+            yield connection
+        except Exception:
+            connection.close()
+            raise
+
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class Backend(background.Backend):
+    """
+    Persistence layer which ships the entries to a collector using HTTP.
+
+    The entries are queued (see `adminjournal.persistence_backends.background.Writer`)
+    and sent in batches as gzip compressed JSON lines (one entry per line, see
+    `adminjournal.spool.dump_instance`, the payload is not encoded) using ``POST``
+    requests. Connections are kept open and reused.
+
+    Failed requests (connection errors, ``408``, ``429`` and ``5xx`` responses) are
+    retried with an exponential backoff. If a batch can't be sent, it is spilled to
+    a local spool file and sent again after the next successful request. Batches
+    rejected by the collector (other responses) are logged and dropped.
+
+    The backend has these settings:
+        * ADMINJOURNAL_HTTP_URL: URL of the collector (required)
+        * ADMINJOURNAL_HTTP_HEADERS: Additional request headers (e.g. for authentication)
+        * ADMINJOURNAL_HTTP_TIMEOUT: Timeout of the connections in seconds (default: 5)
+        * ADMINJOURNAL_HTTP_BATCH_SIZE: Maximum number of entries per request (default: 100)
+        * ADMINJOURNAL_HTTP_FLUSH_INTERVAL: Seconds to wait for a batch to fill up
+          (default: 1)
+        * ADMINJOURNAL_HTTP_RETRIES: Number of retries of a failed request (default: 3)
+        * ADMINJOURNAL_HTTP_SPILL_PATH: SQLite file to keep batches which can't be sent,
+          failed batches are dropped if not set
+    """
+    content_type = 'application/x-ndjson'
+    backoff = 0.5
+    max_backoff = 30
+
+    def __init__(self):
+        url = getattr(settings, 'ADMINJOURNAL_HTTP_URL', None)
+        if not url:
+            raise ImproperlyConfigured('ADMINJOURNAL_HTTP_URL is required to use the backend.')
+
+        self.pool = ConnectionPool(
+            url, timeout=getattr(settings, 'ADMINJOURNAL_HTTP_TIMEOUT', 5))
+        self.headers = getattr(settings, 'ADMINJOURNAL_HTTP_HEADERS', {})
+        self.retries = getattr(settings, 'ADMINJOURNAL_HTTP_RETRIES', 3)
+
+        spill_path = getattr(settings, 'ADMINJOURNAL_HTTP_SPILL_PATH', None)
+        self.spill = Spool(spill_path) if spill_path else None
+
+        self.writer = background.Writer(
+            self.write_instances,
+            maxsize=getattr(settings, 'ADMINJOURNAL_BACKGROUND_QUEUE_SIZE', 1000),
+            batch_size=getattr(settings, 'ADMINJOURNAL_HTTP_BATCH_SIZE', 100),
+            overflow=getattr(settings, 'ADMINJOURNAL_BACKGROUND_OVERFLOW', 'block'),
+            flush_interval=getattr(settings, 'ADMINJOURNAL_HTTP_FLUSH_INTERVAL', 1),
+        )
+
+    def get_instance(self, entry):
+        """
+        The payload is sent as plain JSON, it is not encoded (see `adminjournal.codec`)
+        since the collector can't decode it.
+        """
+        instance = super(Backend, self).get_instance(entry)
+        instance.payload = entry.payload
+        return instance
+
+    def close(self):
+        super(Backend, self).close()
+        self.pool.close()
+        if self.spill is not None:
+            self.spill.close()
+
+    def write_instances(self, instances):
+        """
+        Send the `adminjournal.models.Entry` instances, called from the writer thread.
+        """
+        result = self.send(instances)
+        if result == SENT:
+            self.send_spilled()
+        elif result == FAILED and self.spill is not None:
+            logger.warning('Failed to ship %s journal entries, spilled.', len(instances))
+            self.spill.append(instances)
+        else:
+            logger.error('Failed to ship %s journal entries.', len(instances))
+
+    def send_spilled(self):
+        """
+        Send the spilled entries in batches until the spill file is empty or a
+        request fails. The requests are not retried, the batches are kept for the
+        next successful request. Rejected batches are dropped.
+        """
+        if self.spill is None:
+            return
+
+        while True:
+            rows = self.spill.read(0, self.writer.batch_size)
+            if not rows:
+                return
+
+            result = self.send([instance for id_, instance in rows], retries=0)
+            if result == FAILED:
+                return
+            if result == REJECTED:
+                logger.error('Failed to ship %s spilled journal entries.', len(rows))
+            self.spill.delete(rows[-1][0])
+
+    def send(self, instances, retries=None):
+        """
+        Send the instances in one request, retried with exponential backoff (up to
+        `retries` times, default: ``ADMINJOURNAL_HTTP_RETRIES``). Returns `SENT` if
+        the collector accepted the entries, `REJECTED` if it responded with a
+        status which is not retried or `FAILED`.
+        """
+        body = gzip.compress(
+            '\n'.join(dump_instance(instance) for instance in instances).encode('utf-8'))
+        retries = self.retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(min(self.backoff * 2 ** (attempt - 1), self.max_backoff))
+
+            try:
+                status = self.post(body)
+            except (OSError, http.client.HTTPException) as exc:
+                logger.info('Request to journal collector failed: %s', exc)
+                continue
+
+            if 200 <= status < 300:
+                return SENT
+            logger.info('Journal collector responded with status %s.', status)
+            if status < 500 and status not in RETRY_STATUSES:
+                return REJECTED
+
+        return FAILED
+
+    def post(self, body):
+        """
+        Send the body using a pooled connection, returns the response status.
+        """
+        headers = {
+            'Content-Type': self.content_type,
+            'Content-Encoding': 'gzip',
+        }
+        headers.update(self.headers)
+
+        with self.pool.connection() as connection:
+            connection.request('POST', self.pool.path, body=body, headers=headers)
+            response = connection.getresponse()
+            # The response needs to be read to reuse the connection.
+            response.read()
+            if response.will_close:
+                connection.close()
+            return response.status
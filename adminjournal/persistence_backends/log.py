@@ -17,8 +17,14 @@ class Backend(BaseBackend):
     def __init__(self):
         self.logger = logging.getLogger(
             getattr(settings, 'ADMINJOURNAL_BACKEND_LOG_LOGGER', 'adminjournal'))
+        self.loglevel = logging.getLevelName(
+            getattr(settings, 'ADMINJOURNAL_BACKEND_LOG_LEVEL', 'INFO'))
 
     def persist(self, entry):
-        loglevel = getattr(settings, 'ADMINJOURNAL_BACKEND_LOG_LEVEL', 'INFO')
-        self.logger.log(logging.getLevelName(loglevel), str(entry), extra={'entry': entry})
+        # The entry is only formatted if the message is emitted.
+        if self.logger.isEnabledFor(self.loglevel):
+            self.logger.log(self.loglevel, str(entry), extra={'entry': entry})
         return True
+
+    async def apersist(self, entry):
+        return self.persist(entry)
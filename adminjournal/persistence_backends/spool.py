@@ -0,0 +1,30 @@
+from ..spool import get_spool
+from . import db
+from .base import AsyncBatch
+
+
+class Backend(db.Backend):
+    """
+    Persistence layer which appends the entries to a local SQLite spool file
+    (``ADMINJOURNAL_SPOOL_PATH``) instead of writing them to the database.
+
+    The spooled entries are stored in the database by the management command
+    ``drainadminjournal`` (see `adminjournal.spool.drain`). Entries persisted at
+    once (`persist_many`, concurrent `apersist` calls) are appended in one
+    SQLite transaction.
+    """
+
+    def __init__(self):
+        self.spool = get_spool()
+        self.batch = AsyncBatch(self.spool.append)
+
+    def close(self):
+        self.spool.close()
+
+    def persist(self, entry):
+        self.spool.append([self.get_instance(entry)])
+        return True
+
+    def persist_many(self, entries):
+        self.spool.append([self.get_instance(entry) for entry in entries])
+        return True
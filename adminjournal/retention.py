@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.utils import timezone
+
+from .entry import Entry as JournalEntry
+from .models import Entry
+
+
+class Policy(object):
+    """
+    Retention period (in days) of the entries with the action (one of the
+    ``ACTION_*`` constants of `adminjournal.entry.Entry`) and/or content type
+    (``app_label`` or ``app_label.model``).
+    """
+
+    def __init__(self, days, action=None, content_type=None):
+        self.days = days
+        self.action = action.lower() if action else None
+        self.content_type = content_type.lower() if content_type else None
+
+    def __str__(self):
+        conditions = [
+            '{}={}'.format(key, value)
+            for key, value in (('action', self.action), ('content_type', self.content_type))
+            if value
+        ] or ['default']
+        return '{} ({} days)'.format(', '.join(conditions), self.days)
+
+    def get_cutoff(self, now=None):
+        return (now or timezone.now()) - timedelta(days=self.days)
+
+    def get_q(self):
+        """
+        Returns the filter of the entries the policy applies to. Content types are
+        resolved to ids to use the index of the journal table.
+        """
+        q = Q()
+        if self.action:
+            q &= Q(action=self.action)
+        if self.content_type:
+            q &= Q(content_type_id__in=self.get_content_type_ids())
+        return q
+
+    def get_content_type_ids(self):
+        """
+        Returns the ids of the content types the policy applies to.
+        """
+        app_label, _, model = self.content_type.partition('.')
+        content_types = ContentType.objects.filter(app_label=app_label)
+        if model:
+            content_types = content_types.filter(model=model)
+        return list(content_types.values_list('pk', flat=True))
+
+
+def get_policies():
+    """
+    Returns the policies of ``ADMINJOURNAL_RETENTION_POLICIES``, followed by the
+    default policy (``ADMINJOURNAL_ENTRY_EXPIRY_DAYS``).
+    """
+    policies = []
+    for options in getattr(settings, 'ADMINJOURNAL_RETENTION_POLICIES', []):
+        options = dict(options)
+        if not isinstance(options.get('days'), int) or options['days'] < 0:
+            raise ImproperlyConfigured(
+                'ADMINJOURNAL_RETENTION_POLICIES: Invalid number of days in {}.'.format(
+                    options))
+        if not options.get('action') and not options.get('content_type'):
+            raise ImproperlyConfigured(
+                'ADMINJOURNAL_RETENTION_POLICIES: Action or content type required in {}.'
+                .format(options))
+        try:
+            policy = Policy(**options)
+        except TypeError:
+            raise ImproperlyConfigured(
+                'ADMINJOURNAL_RETENTION_POLICIES: Invalid policy {}.'.format(options))
+        if policy.action and policy.action not in JournalEntry.ACTIONS:
+            raise ImproperlyConfigured(
+                'ADMINJOURNAL_RETENTION_POLICIES: Unknown action in {}.'.format(options))
+        policies.append(policy)
+
+    policies.append(Policy(getattr(settings, 'ADMINJOURNAL_ENTRY_EXPIRY_DAYS', 365)))
+    return policies
+
+
+def get_expired(policies, now=None):
+    """
+    Yields the policies with the queryset of their expired entries. An entry belongs
+    to the first policy it matches, the default policy (the last one) applies to the
+    entries not matched by any other policy.
+    """
+    now = now or timezone.now()
+    matched = []
+    for policy in policies:
+        queryset = Entry.objects.filter(timestamp__lt=policy.get_cutoff(now))
+        q = policy.get_q()
+        if q:
+            queryset = queryset.filter(q)
+        for other in matched:
+            queryset = queryset.exclude(other)
+        matched.append(q)
+        yield policy, queryset
+
+
+def get_partition_cutoff(policies, now=None):
+    """
+    Returns the cutoff of the longest policy, partitions older than that only
+    contain expired entries.
+    """
+    return min(policy.get_cutoff(now) for policy in policies)
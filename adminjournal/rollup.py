@@ -0,0 +1,165 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import DailyCount, Entry
+
+
+def is_enabled():
+    return getattr(settings, 'ADMINJOURNAL_ROLLUP', False)
+
+
+def get_date(timestamp):
+    """
+    Returns the date of the timestamp in the current time zone.
+    """
+    if timezone.is_aware(timestamp):
+        return timezone.localdate(timestamp)
+    return timestamp.date()
+
+
+def get_key(instance):
+    """
+    Returns the ``(date, user_repr, content_type_repr, action)`` tuple the
+    `adminjournal.models.Entry` instance is counted for.
+    """
+    return (
+        get_date(instance.timestamp), instance.user_repr, instance.content_type_repr,
+        instance.action
+    )
+
+
+def increment(instances):
+    """
+    Add the given `adminjournal.models.Entry` instances to the daily counts
+    using a single ``INSERT ... ON CONFLICT`` statement.
+    """
+    add_counts(Counter(get_key(instance) for instance in instances))
+
+
+def add_counts(counts):
+    """
+    Add the counts (dict of number of entries per key, see `get_key`) to the
+    daily counts.
+    """
+    if not counts:
+        return
+
+    connection = connections[router.db_for_write(DailyCount)]
+    qn = connection.ops.quote_name
+    table = qn(DailyCount._meta.db_table)
+    columns = [
+        qn(DailyCount._meta.get_field(name).column)
+        for name in ('date', 'user_repr', 'content_type_repr', 'action', 'count')
+    ]
+
+    # Sorted to lock the rows in the same order in concurrent transactions.
+    rows = sorted(counts.items())
+    params = []
+    for key, count in rows:
+        params.extend(key + (count,))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO {table} ({columns}) VALUES {values} '
+            'ON CONFLICT ({key}) DO UPDATE SET {count} = {table}.{count} + EXCLUDED.{count}'
+            .format(
+                table=table,
+                columns=', '.join(columns),
+                values=', '.join(['(%s, %s, %s, %s, %s)'] * len(rows)),
+                key=', '.join(columns[:4]),
+                count=columns[4],
+            ),
+            params
+        )
+
+
+def increment_persisted(sender, instances, **kwargs):
+    """
+    Receiver of the `adminjournal.signals.entries_persisted` signal, counts
+    the entries if ``ADMINJOURNAL_ROLLUP`` is enabled.
+    """
+    if is_enabled():
+        increment(instances)
+
+
+def rebuild(since=None):
+    """
+    Recalculate the daily counts of all days starting with `since` (or all
+    days if `since` is `None`) from the journal entries, one day at a time (see
+    `rebuild_day`).
+
+    Counts of days whose entries were deleted in the meantime are lost, don't
+    rebuild days older than ``ADMINJOURNAL_ENTRY_EXPIRY_DAYS`` (use `add_counts`
+    to count entries added to those days).
+
+    Returns the number of daily counts written.
+    """
+    using = router.db_for_write(DailyCount)
+
+    counts = DailyCount.objects.using(using)
+    entries = Entry.objects.using(using)
+    if since is not None:
+        counts = counts.filter(date__gte=since)
+        entries = entries.filter(timestamp__gte=get_day_start(since))
+
+    # Days without committed entries or counts are only incremented.
+    days = set(entries.dates('timestamp', 'day')) | set(counts.dates('date', 'day'))
+    return sum(rebuild_day(day, using) for day in sorted(days))
+
+
+def get_day_start(day):
+    start = datetime.combine(day, time.min)
+    if settings.USE_TZ:
+        start = timezone.make_aware(start)
+    return start
+
+
+def rebuild_day(day, using=None):
+    """
+    Recalculate the daily counts of the day from the journal entries. The daily
+    counts table is locked while the day is rebuilt, concurrent increments wait
+    until the rebuilt counts are committed.
+
+    Returns the number of daily counts written.
+    """
+    using = using or router.db_for_write(DailyCount)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    entries = Entry.objects.using(using).filter(
+        timestamp__gte=get_day_start(day),
+        timestamp__lt=get_day_start(day + timedelta(days=1))
+    ).order_by().values('user_repr', 'content_type_repr', 'action').annotate(
+        entries=Count('pk'))
+    subquery, params = entries.query.get_compiler(using).as_sql()
+
+    columns = [
+        qn(DailyCount._meta.get_field(name).column)
+        for name in ('date', 'user_repr', 'content_type_repr', 'action', 'count')
+    ]
+
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            # Entries of transactions which incremented the counts are committed once
+            # the lock is granted and are counted below, later entries are
+            # incremented after the rebuild.
+            cursor.execute('LOCK TABLE {} IN SHARE ROW EXCLUSIVE MODE'.format(
+                qn(DailyCount._meta.db_table)))
+        DailyCount.objects.using(using).filter(date=day).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {table} ({columns}) '
+                'SELECT %s, user_repr, content_type_repr, action, entries '
+                'FROM ({subquery}) AS rollup'.format(
+                    table=qn(DailyCount._meta.db_table),
+                    columns=', '.join(columns),
+                    subquery=subquery
+                ),
+                (day,) + tuple(params)
+            )
+            return cursor.rowcount
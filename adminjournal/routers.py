@@ -0,0 +1,115 @@
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router
+
+
+def get_replication_lag(using):
+    """
+    Returns the number of seconds since the last transaction replayed by the
+    PostgreSQL replica, `None` if no transaction was replayed yet. The lag is `0`
+    if the database is no replica or if the replica streams from the primary and
+    replayed all received WAL (the time since the last transaction grows on an idle
+    primary otherwise). Without a streaming WAL receiver, the time since the last
+    transaction is returned even if all received WAL was replayed.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 '
+            'WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() AND EXISTS ('
+            "SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0 "
+            'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+        )
+        lag = cursor.fetchone()[0]
+    return None if lag is None else float(lag)
+
+
+class JournalRouter(object):
+    """
+    Database router to store the models of the adminjournal app in the database
+    configured as ``ADMINJOURNAL_DATABASE``. Without the setting, the router has
+    no opinion.
+
+    Journal entries are written using the connection of that database, outside of
+    the transactions of the default database.
+
+    Reads of the journal models (admin, filters, history, aggregates) are sent to
+    ``ADMINJOURNAL_READ_DATABASE`` if configured. If ``ADMINJOURNAL_READ_MAX_LAG``
+    (seconds) is set too, the replication lag is checked every `lag_check_interval`
+    seconds and reads fall back to the primary while the replica lags behind or
+    is not reachable.
+    """
+    app_label = 'adminjournal'
+    lag_check_interval = 5
+
+    def __init__(self):
+        self._lag_checks = {}
+
+    def get_database(self):
+        return getattr(settings, 'ADMINJOURNAL_DATABASE', None)
+
+    def get_read_database(self):
+        database = getattr(settings, 'ADMINJOURNAL_READ_DATABASE', None)
+        if database and self.is_replica_usable(database):
+            return database
+        return self.get_database()
+
+    def is_replica_usable(self, using):
+        """
+        Returns `True` if the replication lag of the database is within
+        ``ADMINJOURNAL_READ_MAX_LAG``. The result is kept for `lag_check_interval`.
+        """
+        max_lag = getattr(settings, 'ADMINJOURNAL_READ_MAX_LAG', None)
+        if max_lag is None:
+            return True
+
+        now = time.monotonic()
+        checked, usable = self._lag_checks.get(using, (None, False))
+        if checked is None or now - checked >= self.lag_check_interval:
+            try:
+                lag = get_replication_lag(using)
+            except DatabaseError:
+                lag = None
+            usable = lag is not None and lag <= max_lag
+            self._lag_checks[using] = (now, usable)
+        return usable
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return self.get_read_database()
+        return self.get_related_database(model, router.db_for_read, **hints)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return self.get_database()
+        return self.get_related_database(model, router.db_for_write, **hints)
+
+    def get_related_database(self, model, route, instance=None, **hints):
+        """
+        Objects related to a journal entry (users, content types) are not stored
+        in the journal database. Django would look them up in the database of the
+        entry, they are routed without the entry instead.
+        """
+        if (
+            instance is not None and
+            instance._meta.app_label == self.app_label and
+            self.get_database()
+        ):
+            return route(model)
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The journal references users and content types of other databases.
+        if self.app_label in (obj1._meta.app_label, obj2._meta.app_label):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label != self.app_label:
+            return None
+        if db == getattr(settings, 'ADMINJOURNAL_READ_DATABASE', None):
+            return False
+        database = self.get_database()
+        if database:
+            return db == database
+        return None
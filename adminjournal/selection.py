@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.db import connections, router
+
+from .models import SelectedObject, Selection
+
+
+MODE_QUERY, MODE_TABLE = ('query', 'table')
+
+
+def get_mode():
+    """
+    Returns the configured capture mode (``ADMINJOURNAL_SELECT_ACROSS_CAPTURE``)
+    or `None` if the objects of ``select_across`` actions are not captured.
+    """
+    return getattr(settings, 'ADMINJOURNAL_SELECT_ACROSS_CAPTURE', None)
+
+
+def capture(queryset, filters, mode=None):
+    """
+    Record the objects of the queryset, e.g. the changelist queryset of an action
+    on all objects. Returns a dict to be stored in the payload of the entry.
+
+    * ``query`` mode stores the `filters` (the changelist parameters) and the
+      number of objects, counted using a single aggregate.
+    * ``table`` mode stores the primary keys in the `SelectedObject` table using
+      ``INSERT ... SELECT``, the payload references the `Selection`. If the
+      queryset lives in another database, ``query`` mode is used.
+    """
+    mode = mode or get_mode()
+    using = router.db_for_write(SelectedObject)
+
+    if mode == MODE_TABLE and queryset.db == using:
+        selection = Selection.objects.using(using).create()
+        selection.count = insert_selected_objects(selection, queryset)
+        selection.save(update_fields=['count'])
+        return {'mode': MODE_TABLE, 'id': str(selection.pk), 'count': selection.count}
+
+    return {'mode': MODE_QUERY, 'filters': filters, 'count': queryset.count()}
+
+
+def insert_selected_objects(selection, queryset):
+    """
+    Store the primary keys of the queryset as `SelectedObject` rows of the
+    selection, without loading them. Returns the number of stored rows.
+    """
+    using = queryset.db
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    subquery, params = queryset.order_by().values('pk').query.get_compiler(using).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO {table} ({selection}, {object_id}) '
+            'SELECT %s, CAST({pk} AS text) FROM ({subquery}) AS selected'.format(
+                table=qn(SelectedObject._meta.db_table),
+                selection=qn(SelectedObject._meta.get_field('selection').column),
+                object_id=qn(SelectedObject._meta.get_field('object_id').column),
+                pk=qn(queryset.model._meta.pk.column),
+                subquery=subquery
+            ),
+            (selection.pk,) + tuple(params)
+        )
+        return cursor.rowcount
+
+
+def get_object_ids(selection_id):
+    """
+    Returns a queryset of the object ids recorded for the selection. Use
+    ``.iterator()`` to fetch large selections in chunks.
+    """
+    return SelectedObject.objects.filter(selection_id=selection_id).values_list(
+        'object_id', flat=True)
+
+
+def delete_expired(cutoff, using=None):
+    """
+    Delete the selections (and their objects) recorded before `cutoff`
+    without loading them. Returns the number of deleted selections.
+    """
+    using = using or router.db_for_write(Selection)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    expired = Selection.objects.using(using).filter(timestamp__lt=cutoff).values('pk')
+    subquery, params = expired.query.get_compiler(using).as_sql()
+
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM {} WHERE {} IN ({})'.format(
+            qn(SelectedObject._meta.db_table),
+            qn(SelectedObject._meta.get_field('selection').column),
+            subquery
+        ), params)
+        cursor.execute('DELETE FROM {} WHERE {} IN ({})'.format(
+            qn(Selection._meta.db_table),
+            qn(Selection._meta.pk.column),
+            subquery
+        ), params)
+        return cursor.rowcount
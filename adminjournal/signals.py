@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+
+#: Sent by the database backends after journal entries were stored.
+#: Arguments: `sender` (the `adminjournal.models.Entry` model) and `instances`
+#: (list of the stored `adminjournal.models.Entry` instances).
+entries_persisted = Signal()
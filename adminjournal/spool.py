@@ -0,0 +1,188 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import router, transaction
+from django.utils.dateparse import parse_datetime
+
+from .constraints import FOREIGN_KEYS, has_foreign_key_constraints
+from .models import Entry, SpoolCursor
+from .persistence_backends.db import save_instances
+
+
+#: Fields of `adminjournal.models.Entry` stored in the spool.
+FIELDS = (
+    'timestamp', 'action', 'user_id', 'user_repr', 'content_type_id', 'content_type_repr',
+    'object_id', 'description', 'payload')
+
+
+def dump_instance(instance):
+    """
+    Returns the JSON representation of an unsaved `adminjournal.models.Entry`.
+    """
+    data = {field: getattr(instance, field) for field in FIELDS}
+    data['timestamp'] = instance.timestamp.isoformat()
+    data['description'] = str(instance.description)
+    return json.dumps(data, separators=(',', ':'))
+
+
+def load_instance(value):
+    """
+    Returns an unsaved `adminjournal.models.Entry` for a value of `dump_instance`.
+    """
+    data = json.loads(value)
+    data['timestamp'] = parse_datetime(data['timestamp'])
+    return Entry(**data)
+
+
+class Spool(object):
+    """
+    Append-only spool of journal entries in a SQLite database (WAL mode).
+
+    Multiple processes and threads can append to the same file, SQLite serializes
+    the writes. The ids of the spooled entries are increasing in commit order and
+    never reused, the id of the last drained entry is kept as `SpoolCursor` in the
+    journal database (see `drain`). Every spool file has a random `uid` to not
+    reuse the cursor of a deleted file.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        # Connections are not shared by threads or inherited by forked processes.
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.pid = os.getpid()
+            self._local.connection = self.connect()
+        return self._local.connection
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS spool_meta (key TEXT PRIMARY KEY, value TEXT)')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS spool_entries ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)')
+        connection.execute(
+            'INSERT OR IGNORE INTO spool_meta (key, value) VALUES (?, ?)',
+            ('uid', str(uuid.uuid4())))
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            connection.close()
+        self._local.__dict__.clear()
+
+    @property
+    def uid(self):
+        return self.connection.execute(
+            "SELECT value FROM spool_meta WHERE key = 'uid'").fetchone()[0]
+
+    def append(self, instances):
+        """
+        Append the unsaved `adminjournal.models.Entry` instances in one transaction.
+        """
+        data = [(dump_instance(instance),) for instance in instances]
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany('INSERT INTO spool_entries (data) VALUES (?)', data)
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def read(self, after, limit):
+        """
+        Returns up to `limit` ``(id, instance)`` tuples of the entries after the id.
+        """
+        rows = self.connection.execute(
+            'SELECT id, data FROM spool_entries WHERE id > ? ORDER BY id LIMIT ?',
+            (after, limit))
+        return [(id_, load_instance(data)) for id_, data in rows]
+
+    def delete(self, up_to):
+        """
+        Delete the entries up to the id (including), returns the number of deleted entries.
+        """
+        return self.connection.execute(
+            'DELETE FROM spool_entries WHERE id <= ?', (up_to,)).rowcount
+
+    def count(self):
+        return self.connection.execute('SELECT COUNT(*) FROM spool_entries').fetchone()[0]
+
+
+def get_spool():
+    """
+    Returns a `Spool` for the file configured as ``ADMINJOURNAL_SPOOL_PATH``.
+    """
+    path = getattr(settings, 'ADMINJOURNAL_SPOOL_PATH', None)
+    if not path:
+        raise ImproperlyConfigured('ADMINJOURNAL_SPOOL_PATH is required to use the spool.')
+    return Spool(path)
+
+
+def clear_missing_foreign_keys(instances, using):
+    """
+    Set the user and content type of the instances to `None` if they don't exist
+    anymore, like the foreign key constraints do for stored entries. Without, the
+    constraints would fail the batch on every drain.
+    """
+    # Without constraints, the ids are kept like for stored entries.
+    if not has_foreign_key_constraints(using):
+        return
+
+    for name in FOREIGN_KEYS:
+        field = Entry._meta.get_field(name)
+        ids = {getattr(instance, field.attname) for instance in instances} - {None}
+        if not ids:
+            continue
+
+        existing = set(field.related_model._default_manager.filter(
+            pk__in=ids).values_list('pk', flat=True))
+        for instance in instances:
+            if getattr(instance, field.attname) not in existing:
+                setattr(instance, field.attname, None)
+
+
+def drain(spool, batch_size=1000):
+    """
+    Store the spooled entries in the journal database in batches of `batch_size`,
+    returns the number of stored entries.
+
+    Every batch is inserted in one transaction together with the update of the
+    `SpoolCursor`. If draining is interrupted, the entries of the cursor are
+    skipped on the next run, entries are never stored twice. Concurrent drains
+    of the same spool wait for each other. Drained entries are deleted from the
+    spool afterwards. Users and content types deleted since the entries were
+    spooled are set to `None`.
+    """
+    using = router.db_for_write(Entry)
+    uid = spool.uid
+    drained = 0
+
+    while True:
+        with transaction.atomic(using=using):
+            cursor, created = SpoolCursor.objects.using(
+                using).select_for_update().get_or_create(spool=uid)
+            rows = spool.read(cursor.position, batch_size)
+            if rows:
+                instances = [instance for id_, instance in rows]
+                clear_missing_foreign_keys(instances, using)
+                save_instances(instances)
+                cursor.position = rows[-1][0]
+                cursor.save(using=using, update_fields=['position'])
+
+        spool.delete(cursor.position)
+        drained += len(rows)
+        if len(rows) < batch_size:
+            return drained
@@ -0,0 +1,32 @@
+from django import template
+from django.contrib.admin.views.main import PAGE_VAR
+
+from ..paginator import CURSOR_VAR
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def next_page_url(cl):
+    """
+    Returns the URL of the next changelist page using the keyset cursor of the
+    current page, or an empty string if there is no cursor.
+    """
+    page = getattr(cl.paginator, 'current_page', None)
+    if not page or not getattr(page, 'next_cursor', None):
+        return ''
+    return cl.get_query_string({PAGE_VAR: cl.page_num + 1, CURSOR_VAR: page.next_cursor})
+
+
+@register.simple_tag
+def get_adminjournal_log(limit, user=None):
+    """
+    Returns the latest additions, changes and deletions from the journal (of the
+    given user) in the interface of Django's LogEntry. Replacement for Django's
+    ``get_admin_log`` tag if the journal is authoritative::
+
+        {% get_adminjournal_log 10 user=user as admin_log %}
+    """
+    from ..history import get_recent_actions
+    return get_recent_actions(limit, user)
@@ -0,0 +1,124 @@
+"""
+Measure the cost of creating journal entries (`adminjournal.entry.Entry`).
+
+Usage::
+
+    DJANGO_SETTINGS_MODULE=tests.settings python benchmarks/entry_init.py --number 100000
+
+The database needs to be migrated, the content types are looked up once.
+
+Every scenario is measured for the current `Entry` and for `BaselineEntry`, the
+eager constructor of ``adminjournal.entry.Entry`` before the lookups were cached.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def get_baseline_class():
+    """
+    Returns the `Entry` class with the constructor as it was before the user model
+    and the content types were cached, every lookup and check runs per entry.
+    """
+    from django.contrib.admin.options import get_content_type_for_model
+    from django.contrib.auth import get_user_model
+    from django.contrib.contenttypes.models import ContentType
+    from django.utils import timezone
+
+    from adminjournal.entry import Entry
+
+    class BaselineEntry(object):
+        ACTION_VIEW, ACTION_ADD, ACTION_CHANGE, ACTION_DELETE = (
+            Entry.ACTION_VIEW, Entry.ACTION_ADD, Entry.ACTION_CHANGE, Entry.ACTION_DELETE)
+
+        def __init__(
+            self, action, user, model_class=None, model=None, description=None,
+            timestamp=None, payload=None
+        ):
+            self.timestamp = timestamp or timezone.now()
+
+            if action not in (
+                self.ACTION_VIEW,
+                self.ACTION_ADD,
+                self.ACTION_CHANGE,
+                self.ACTION_DELETE
+            ):
+                raise ValueError('Invalid `action` provided: {}'.format(action))
+            self.action = action
+
+            if not isinstance(user, get_user_model()):
+                raise ValueError('Invalid `user` provided: {} ({})'.format(
+                    user, user.__class__))
+            self.user = user
+
+            if not model_class and not model:
+                raise ValueError('Missing `model_class` and/or `model`')
+
+            if isinstance(model_class, ContentType):
+                self.content_type = model_class
+            else:
+                self.content_type = get_content_type_for_model(model_class or model)
+
+            class_from_ct = self.content_type.model_class()
+            if model and not isinstance(model, class_from_ct):
+                raise ValueError('Model / model_class missmatch: {} vs {}'.format(
+                    model, class_from_ct))
+
+            self.model = model
+            self.description = description or ''
+            self.payload = payload or {}
+
+    return BaselineEntry
+
+
+def get_scenarios(entry_class):
+    from django.contrib.auth import get_user_model
+    from django.contrib.contenttypes.models import ContentType
+
+    user_model = get_user_model()
+    user = user_model(pk=1, username='benchmark')
+    content_type = ContentType.objects.get_for_model(user_model)
+
+    return [
+        ('model', lambda: entry_class(entry_class.ACTION_VIEW, user, model=user)),
+        ('model_class', lambda: entry_class(
+            entry_class.ACTION_VIEW, user, model_class=user_model)),
+        ('model_class and model', lambda: entry_class(
+            entry_class.ACTION_CHANGE, user, model_class=user_model, model=user)),
+        ('content type and model', lambda: entry_class(
+            entry_class.ACTION_CHANGE, user, model_class=content_type, model=user)),
+    ]
+
+
+def measure(create, options):
+    # Fill the caches.
+    create()
+    best = min(timeit.repeat(create, number=options.number, repeat=options.repeat))
+    return best / options.number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+
+    import django
+    django.setup()
+
+    from adminjournal.entry import Entry
+
+    print('{:<25} {:>11} {:>11}'.format('scenario', 'baseline', 'current'))
+    for (name, baseline), (__, current) in zip(
+        get_scenarios(get_baseline_class()), get_scenarios(Entry)
+    ):
+        print('{:<25} {:8.2f} us {:8.2f} us'.format(
+            name, measure(baseline, options), measure(current, options)))
+
+
+if __name__ == '__main__':
+    main()
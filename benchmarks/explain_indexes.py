@@ -0,0 +1,132 @@
+"""
+Show the query plans of the typical journal queries without and with the indexes
+of the journal table, based on a synthetic dataset.
+
+Usage::
+
+    DJANGO_SETTINGS_MODULE=tests.settings python benchmarks/explain_indexes.py --rows 1000000
+
+All changes to the database are rolled back when the script finishes.
+"""
+import argparse
+import os
+import sys
+from datetime import timedelta
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+POPULATE_SQL = """
+    WITH
+        users AS (SELECT array_agg(id) AS ids FROM auth_user),
+        content_types AS (SELECT array_agg(id) AS ids FROM django_content_type),
+        rows AS (
+            SELECT
+                users.ids[1 + floor(random() * array_length(users.ids, 1))] AS user_id,
+                content_types.ids[
+                    1 + floor(random() * array_length(content_types.ids, 1))
+                ] AS content_type_id
+            FROM generate_series(1, %s), users, content_types
+        )
+    INSERT INTO adminjournal_entry (
+        timestamp, action, user_id, user_repr, content_type_id, content_type_repr,
+        object_id, description, payload
+    )
+    SELECT
+        now() - random() * interval '365 days',
+        (ARRAY['view', 'view', 'view', 'view', 'add', 'change', 'delete'])[
+            1 + floor(random() * 7)],
+        user_id,
+        'user' || user_id,
+        content_type_id,
+        'app.model' || content_type_id,
+        floor(random() * 10000)::text,
+        '',
+        '{}'
+    FROM rows
+"""
+
+
+def get_queries():
+    from django.utils import timezone
+
+    from adminjournal.models import Entry
+
+    now = timezone.now()
+    entry = Entry.objects.order_by('?').first()
+
+    return [
+        ('Changelist', Entry.objects.order_by('-timestamp')[:100]),
+        ('Changelist, last day', Entry.objects.filter(
+            timestamp__gte=now - timedelta(days=1)).order_by('-timestamp')[:100]),
+        ('Changelist, filtered by action', Entry.objects.filter(
+            action='delete').order_by('-timestamp')[:100]),
+        ('Entries of an object', Entry.objects.filter(
+            content_type_id=entry.content_type_id, object_id=entry.object_id
+        ).order_by('-timestamp')),
+        ('Entries of a user', Entry.objects.filter(
+            user_id=entry.user_id).order_by('-timestamp')[:100]),
+        ('Expired entries (clearadminjournal batch)', Entry.objects.filter(
+            timestamp__lt=now - timedelta(days=300)).order_by('pk').values('pk')[:10000]),
+    ]
+
+
+def explain(label, analyze):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE adminjournal_entry')
+
+    print('=' * 80)
+    print(label)
+    print('=' * 80)
+    for name, queryset in get_queries():
+        print('\n-- {}\n'.format(name))
+        print(queryset.explain(analyze=analyze))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--analyze', action='store_true', help='Run EXPLAIN ANALYZE.')
+    options = parser.parse_args()
+
+    import django
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+
+    from adminjournal.models import Entry
+
+    with transaction.atomic():
+        get_user_model().objects.bulk_create([
+            get_user_model()(username='benchmark-{}'.format(i))
+            for i in range(options.users)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute(POPULATE_SQL, [options.rows])
+            # Check the deferred foreign keys now, indexes can't be created otherwise.
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for index in Entry._meta.indexes:
+                schema_editor.remove_index(Entry, index)
+
+        explain('Without indexes', options.analyze)
+
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for index in Entry._meta.indexes:
+                schema_editor.add_index(Entry, index)
+
+        explain('With indexes', options.analyze)
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
@@ -25,12 +25,14 @@ setup(
     author='Moccu GmbH & Co. KG',
     author_email='info@moccu.com',
     packages=find_packages(exclude=['tests', 'tests.*']),
-    install_requires=[],
+    install_requires=['Django>=2.1'],
     include_package_data=True,
     keywords='django',
     classifiers=[
         'Environment :: Web Environment',
         'Framework :: Django',
+        'Framework :: Django :: 2.1',
+        'Framework :: Django :: 2.2',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python :: 3',
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+from django.db import connections
+
+from adminjournal.models import Entry
+
+
+@pytest.fixture
+def run_async():
+    """
+    Returns a function to run a coroutine until it is complete in a new event loop.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def drop_foreign_key_constraints():
+    """
+    Returns a function to drop the foreign key constraints of the journal entries
+    in a database, like `adminjournal.constraints` does for other databases. The
+    statements are rolled back with the test transaction.
+    """
+    def drop(using='default'):
+        connection = connections[using]
+        table = Entry._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+            for name, constraint in constraints.items():
+                if constraint['foreign_key']:
+                    cursor.execute('ALTER TABLE {} DROP CONSTRAINT {}'.format(
+                        connection.ops.quote_name(table), connection.ops.quote_name(name)))
+    return drop
@@ -0,0 +1,211 @@
+import threading
+import time
+
+import pytest
+from django.db import transaction
+
+from adminjournal import entry, models
+from adminjournal.persistence_backends.background import Backend, Writer
+
+
+def wait_for_empty_queue(writer):
+    while writer.depth:
+        time.sleep(0.01)
+
+
+class TestWriter:
+
+    def setup(self):
+        self.batches = []
+
+    def write_batch(self, items):
+        self.batches.append(items)
+
+    def test_invalid_overflow(self):
+        with pytest.raises(ValueError) as exc:
+            Writer(self.write_batch, overflow='foo')
+        assert 'Invalid `overflow`' in str(exc.value)
+
+    def test_put(self):
+        writer = Writer(self.write_batch, batch_size=10)
+        for i in range(3):
+            writer.put(i)
+        writer.stop()
+
+        assert sum(self.batches, []) == [0, 1, 2]
+        assert writer.depth == 0
+
+    def test_put_batches(self):
+        release = threading.Event()
+        writer = Writer(lambda items: release.wait() and self.write_batch(items), batch_size=2)
+        for i in range(5):
+            writer.put(i)
+        assert writer.depth >= 3
+        release.set()
+        writer.stop()
+
+        assert sum(self.batches, []) == [0, 1, 2, 3, 4]
+        assert max(len(batch) for batch in self.batches) == 2
+
+    def test_flush_interval(self):
+        writer = Writer(self.write_batch, batch_size=10, flush_interval=0.2)
+        writer.put(0)
+        time.sleep(0.05)
+        writer.put(1)
+        writer.join()
+        writer.stop()
+
+        assert self.batches == [[0, 1]]
+
+    def test_overflow_drop_oldest(self):
+        release = threading.Event()
+        writer = Writer(
+            lambda items: release.wait() and self.write_batch(items),
+            maxsize=2, batch_size=1, overflow=Writer.OVERFLOW_DROP_OLDEST)
+        writer.put(0)
+        wait_for_empty_queue(writer)
+
+        for i in range(1, 5):
+            writer.put(i)
+
+        assert writer.depth == 2
+        assert writer.dropped == 2
+        release.set()
+        writer.stop()
+
+        assert sum(self.batches, []) == [0, 3, 4]
+
+    def test_overflow_sync(self):
+        release = threading.Event()
+        writer = Writer(
+            lambda items: (items == [3] or release.wait()) and self.write_batch(items),
+            maxsize=2, batch_size=1, overflow=Writer.OVERFLOW_SYNC)
+        writer.put(0)
+        wait_for_empty_queue(writer)
+
+        for i in range(1, 4):
+            writer.put(i)
+
+        assert self.batches == [[3]]
+        release.set()
+        writer.stop()
+
+        assert sum(self.batches, []) == [3, 0, 1, 2]
+
+    def test_overflow_write_sync(self):
+        release = threading.Event()
+        writer = Writer(
+            lambda items: release.wait() and self.write_batch(items),
+            maxsize=1, batch_size=1, overflow=Writer.OVERFLOW_SYNC,
+            write_sync=lambda items: self.write_batch(['sync'] + items))
+        writer.put(0)
+        wait_for_empty_queue(writer)
+
+        writer.put(1)
+        writer.put(2)
+
+        assert self.batches == [['sync', 2]]
+        release.set()
+        writer.stop()
+
+    def test_write_batch_error(self):
+        def write_batch(items):
+            if items == [0]:
+                raise ValueError
+            self.write_batch(items)
+
+        writer = Writer(write_batch, batch_size=1)
+        writer.put(0)
+        writer.put(1)
+        writer.stop()
+
+        assert self.batches == [[1]]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBackgroundBackend:
+
+    def test_init(self, settings):
+        settings.ADMINJOURNAL_BACKGROUND_QUEUE_SIZE = 10
+        settings.ADMINJOURNAL_BACKGROUND_BATCH_SIZE = 5
+        settings.ADMINJOURNAL_BACKGROUND_OVERFLOW = 'sync'
+
+        writer = Backend().writer
+        assert writer.maxsize == 10
+        assert writer.batch_size == 5
+        assert writer.overflow == 'sync'
+
+    def test_setup_close(self):
+        backend = Backend()
+        backend.setup()
+        assert backend.writer._thread.is_alive()
+
+        backend.close()
+        assert not backend.writer._thread.is_alive()
+
+    def test_persist(self, admin_user):
+        backend = Backend()
+        for i in range(3):
+            assert backend.persist(
+                entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+        backend.writer.join()
+
+        assert backend.queue_depth == 0
+        assert models.Entry.objects.filter(user=admin_user).count() == 3
+        backend.close()
+
+    def test_apersist(self, admin_user, run_async):
+        backend = Backend()
+        assert run_async(backend.apersist(
+            entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))) is True
+        backend.writer.join()
+
+        assert models.Entry.objects.filter(user=admin_user).count() == 1
+        backend.close()
+
+    def test_apersist_queue_full(self, admin_user, run_async, settings, monkeypatch):
+        settings.ADMINJOURNAL_BACKGROUND_QUEUE_SIZE = 1
+        settings.ADMINJOURNAL_BACKGROUND_OVERFLOW = 'sync'
+        backend = Backend()
+        monkeypatch.setattr(backend.writer, 'put_nowait', lambda item: False)
+
+        assert run_async(backend.apersist_many([
+            entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry) for i in range(2)]))
+        backend.writer.join()
+
+        assert models.Entry.objects.filter(user=admin_user).count() == 2
+        backend.close()
+
+    def test_overflow_sync_in_transaction(self, admin_user, settings, monkeypatch):
+        settings.ADMINJOURNAL_BACKGROUND_QUEUE_SIZE = 1
+        settings.ADMINJOURNAL_BACKGROUND_BATCH_SIZE = 1
+        settings.ADMINJOURNAL_BACKGROUND_OVERFLOW = 'sync'
+        backend = Backend()
+        release = threading.Event()
+        write_batch = backend.writer.write_batch
+        monkeypatch.setattr(
+            backend.writer, 'write_batch', lambda items: release.wait() and write_batch(items))
+
+        with transaction.atomic():
+            backend.persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            wait_for_empty_queue(backend.writer)
+            for i in range(2):
+                backend.persist(
+                    entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+
+            # The entry of the full queue was written using the request's connection.
+            assert models.Entry.objects.filter(user=admin_user).count() == 1
+
+        release.set()
+        backend.writer.join()
+        assert models.Entry.objects.filter(user=admin_user).count() == 3
+        backend.close()
+
+    def test_persist_many(self, admin_user):
+        backend = Backend()
+        assert backend.persist_many([
+            entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry) for i in range(3)])
+        backend.writer.join()
+
+        assert models.Entry.objects.filter(user=admin_user).count() == 3
+        backend.close()
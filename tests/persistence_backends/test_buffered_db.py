@@ -0,0 +1,177 @@
+import flexmock
+import pytest
+from django.core.signals import request_finished
+from django.db import connection, transaction
+
+from adminjournal import entry, facets, models
+from adminjournal.persistence_backends import buffered_db
+from adminjournal.persistence_backends.buffered_db import Backend, buffering, flush
+
+
+@pytest.fixture(autouse=True)
+def clear_buffer():
+    yield
+    state = buffered_db._get_state()
+    state.pending, state.failed, state.buffers = [], 0, []
+
+
+@pytest.mark.django_db
+class TestBufferedDbBackend:
+
+    def test_persist_buffering(self, admin_user, django_assert_num_queries):
+        flexmock(facets).should_receive('record')
+        backend = Backend()
+        items = [
+            entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry) for i in range(3)]
+
+        # The insert and the savepoint around it.
+        with django_assert_num_queries(3):
+            with buffering():
+                for item in items:
+                    assert backend.persist(item)
+
+        assert models.Entry.objects.count() == 3
+
+    def test_persist_many(self, admin_user, settings):
+        settings.ADMINJOURNAL_BUFFER_SIZE = 5
+        backend = Backend()
+        items = [
+            entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry) for i in range(3)]
+
+        with buffering():
+            assert backend.persist_many(items)
+            assert models.Entry.objects.exists() is False
+
+        assert models.Entry.objects.count() == 3
+
+    def test_persist_buffering_exception(self, admin_user):
+        with pytest.raises(ValueError):
+            with buffering():
+                Backend().persist(
+                    entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+                raise ValueError
+
+        assert models.Entry.objects.count() == 1
+
+    def test_flush_failed(self, admin_user):
+        flexmock(buffered_db.db).should_receive('save_instances').and_raise(
+            ValueError).once()
+
+        with buffering():
+            backend = Backend()
+            backend.persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            assert flush() == 0
+            # The entries are kept for the next flush.
+            assert len(buffered_db._get_state().pending) == 1
+            flexmock(buffered_db.db).should_call('save_instances').once()
+            assert flush() == 1
+
+        assert models.Entry.objects.count() == 1
+
+    def test_flush_failed_dropped(self, admin_user):
+        flexmock(buffered_db.db).should_receive('save_instances').and_raise(ValueError)
+
+        with buffering():
+            backend = Backend()
+            backend.persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            flush()
+            backend.persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            flush()
+            # Entries which failed twice are dropped.
+            assert len(buffered_db._get_state().pending) == 1
+
+        # The buffer is cleared when the block is left, the result is kept.
+        assert buffered_db._get_state().pending == []
+
+    def test_buffering_failed_keeps_exception(self, admin_user):
+        flexmock(buffered_db.db).should_receive('save_instances').and_raise(ValueError)
+
+        with pytest.raises(KeyError):
+            with buffering():
+                Backend().persist(
+                    entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+                raise KeyError
+
+    def test_persist_buffer_size(self, admin_user, settings):
+        settings.ADMINJOURNAL_BUFFER_SIZE = 2
+        backend = Backend()
+
+        with buffering():
+            backend.persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            assert models.Entry.objects.count() == 0
+            backend.persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            assert models.Entry.objects.count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBufferedDbBackendTransaction:
+
+    def test_persist_autocommit(self, admin_user):
+        Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+        assert models.Entry.objects.count() == 1
+
+    def test_persist_on_commit(self, admin_user):
+        with transaction.atomic():
+            Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            assert models.Entry.objects.count() == 0
+
+        assert models.Entry.objects.count() == 2
+
+    def test_persist_on_commit_registered_once(self, admin_user):
+        with transaction.atomic():
+            Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            Backend().persist_many([
+                entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry)])
+            assert len(connection.run_on_commit) == 1
+
+        assert models.Entry.objects.count() == 2
+
+    def test_persist_rollback(self, admin_user):
+        with pytest.raises(ValueError):
+            with transaction.atomic():
+                Backend().persist(
+                    entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+                raise ValueError
+
+        # The entries of the rolled back transaction are written afterwards.
+        assert models.Entry.objects.count() == 0
+        with transaction.atomic():
+            Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+        assert models.Entry.objects.count() == 2
+
+    def test_persist_rollback_request_finished(self, admin_user):
+        with pytest.raises(ValueError):
+            with transaction.atomic():
+                Backend().persist(
+                    entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+                raise ValueError
+
+        request_finished.send(sender=None)
+        assert models.Entry.objects.count() == 1
+        assert buffered_db._get_state().buffers == []
+
+    def test_persist_on_commit_failed(self, admin_user):
+        flexmock(buffered_db.db).should_receive('save_instances').and_raise(
+            ValueError).once()
+
+        with transaction.atomic():
+            Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+
+        # The entries are written again once.
+        flexmock(buffered_db.db).should_call('save_instances').once()
+        request_finished.send(sender=None)
+        assert models.Entry.objects.count() == 1
+
+    def test_persist_savepoint_rollback(self, admin_user):
+        with transaction.atomic():
+            Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            with pytest.raises(ValueError):
+                with transaction.atomic():
+                    Backend().persist(
+                        entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+                    raise ValueError
+            Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+
+        # The entry of the rolled back savepoint is written with the transaction.
+        assert models.Entry.objects.count() == 3
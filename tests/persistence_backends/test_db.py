@@ -1,3 +1,6 @@
+import asyncio
+
+import flexmock
 import pytest
 
 from adminjournal import entry, models
@@ -14,3 +17,61 @@ class TestDbBackend:
         obj = models.Entry.objects.get()
         assert obj.action == entry.Entry.ACTION_VIEW
         assert obj.user == admin_user
+
+    def test_persist_many(self, admin_user):
+        items = [
+            entry.Entry(entry.Entry.ACTION_DELETE, admin_user, models.Entry) for i in range(3)]
+        flexmock(models.Entry.objects).should_call('bulk_create').once()
+
+        assert Backend().persist_many(items)
+
+        assert models.Entry.objects.filter(action=entry.Entry.ACTION_DELETE).count() == 3
+
+    def test_persist_payload_not_encoded(self, admin_user):
+        ids = [str(i) for i in range(1000)]
+        item = entry.Entry(
+            entry.Entry.ACTION_VIEW, admin_user, models.Entry, payload={'selected_ids': ids})
+        assert Backend().persist(item)
+
+        assert models.Entry.objects.get().payload == {'selected_ids': ids}
+
+    def test_persist_encoded_payload(self, admin_user, settings):
+        settings.ADMINJOURNAL_PAYLOAD_COMPRESS_THRESHOLD = 1024
+        ids = [str(i) for i in range(1000)]
+        item = entry.Entry(
+            entry.Entry.ACTION_VIEW, admin_user, models.Entry, payload={'selected_ids': ids})
+        assert Backend().persist(item)
+
+        obj = models.Entry.objects.get()
+        assert obj.payload == {
+            'selected_ids': {'__codec__': 'ranges', 'data': [0, 999], 'str': True}}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDbBackendAsync:
+
+    def test_apersist(self, admin_user, run_async):
+        item = entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry)
+        assert run_async(Backend().apersist(item)) is True
+
+        assert models.Entry.objects.get().user == admin_user
+
+    def test_apersist_concurrent(self, admin_user, run_async):
+        backend = Backend()
+        flexmock(models.Entry.objects).should_call('bulk_create').once()
+
+        async def persist_concurrently():
+            return await asyncio.gather(*[
+                backend.apersist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+                for i in range(3)
+            ])
+
+        assert run_async(persist_concurrently()) == [True, True, True]
+        assert models.Entry.objects.count() == 3
+
+    def test_apersist_error(self, admin_user, run_async):
+        item = entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry)
+        flexmock(models.Entry.objects).should_receive('bulk_create').and_raise(ValueError)
+
+        with pytest.raises(ValueError):
+            run_async(Backend().apersist(item))
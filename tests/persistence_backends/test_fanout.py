@@ -0,0 +1,204 @@
+import asyncio
+import threading
+
+import flexmock
+import pytest
+
+from adminjournal.persistence import close_persistence_backends, get_persistence_backend
+from adminjournal.persistence_backends import db, fanout, log
+from adminjournal.persistence_backends.fanout import Backend, BackendBusy, BackendTimeout
+
+
+DB_PATH = 'adminjournal.persistence_backends.db.Backend'
+LOG_PATH = 'adminjournal.persistence_backends.log.Backend'
+
+
+class TestFanoutBackend:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        close_persistence_backends()
+        self.entry = object()
+        yield
+        close_persistence_backends()
+
+    def get_backend(self, backends):
+        backend = Backend(backends)
+        backend.setup()
+        return backend
+
+    def test_init(self):
+        backend = Backend([DB_PATH, {'BACKEND': LOG_PATH, 'TIMEOUT': 0.5}])
+        assert backend.backends == [(DB_PATH, None), (LOG_PATH, 0.5)]
+
+    def test_dispatch_without_setup(self):
+        flexmock(log.Backend).should_receive('persist').and_return(True)
+
+        backend = Backend([{'BACKEND': LOG_PATH, 'TIMEOUT': 1}])
+        assert backend.dispatch(self.entry) == [(LOG_PATH, True, None)]
+
+    def test_dispatch_after_close(self):
+        flexmock(log.Backend).should_receive('persist').and_return(True)
+
+        backend = self.get_backend([{'BACKEND': LOG_PATH, 'TIMEOUT': 1}])
+        backend.close()
+        assert backend.dispatch(self.entry) == [(LOG_PATH, True, None)]
+
+    def test_dispatch(self):
+        flexmock(db.Backend).should_receive('persist').once().with_args(
+            self.entry).and_return(True)
+        flexmock(log.Backend).should_receive('persist').once().with_args(
+            self.entry).and_return(True)
+
+        backend = self.get_backend([DB_PATH, {'BACKEND': LOG_PATH, 'TIMEOUT': 1}])
+        assert backend.dispatch(self.entry) == [
+            (DB_PATH, True, None), (LOG_PATH, True, None)]
+
+    def test_persist(self):
+        flexmock(db.Backend).should_receive('persist').and_return(True)
+        flexmock(log.Backend).should_receive('persist').and_return(True)
+
+        backend = self.get_backend([DB_PATH, {'BACKEND': LOG_PATH, 'TIMEOUT': 1}])
+        assert backend.persist(self.entry) is True
+
+    def test_persist_many(self):
+        entries = [self.entry, object()]
+        flexmock(db.Backend).should_receive('persist_many').once().with_args(
+            entries).and_return(True)
+        flexmock(log.Backend).should_receive('persist_many').once().with_args(
+            entries).and_return(True)
+
+        backend = self.get_backend([DB_PATH, {'BACKEND': LOG_PATH, 'TIMEOUT': 1}])
+        assert backend.persist_many(entries) is True
+
+    def test_dispatch_error_isolation(self):
+        error = ValueError('foo')
+        flexmock(db.Backend).should_receive('persist').and_raise(error)
+        flexmock(log.Backend).should_receive('persist').once().and_return(True)
+
+        backend = self.get_backend([DB_PATH, LOG_PATH])
+        assert backend.dispatch(self.entry) == [
+            (DB_PATH, False, error), (LOG_PATH, True, None)]
+
+    def test_dispatch_timeout(self):
+        release = threading.Event()
+        flexmock(db.Backend).should_receive('persist').and_return(True)
+        flexmock(log.Backend).should_receive('persist').replace_with(
+            lambda entry: release.wait())
+
+        backend = self.get_backend([DB_PATH, {'BACKEND': LOG_PATH, 'TIMEOUT': 0.05}])
+        results = backend.dispatch(self.entry)
+
+        assert results[0] == (DB_PATH, True, None)
+        assert results[1].path == LOG_PATH
+        assert results[1].success is False
+        assert isinstance(results[1].error, BackendTimeout)
+
+        # Closing doesn't wait for the hung backend.
+        backend.close()
+        release.set()
+
+    def test_dispatch_busy(self):
+        release = threading.Event()
+        calls = []
+
+        def persist(entry):
+            calls.append(entry)
+            release.wait()
+            return True
+
+        flexmock(db.Backend).should_receive('persist').and_return(True)
+        flexmock(log.Backend).should_receive('persist').replace_with(persist)
+        backend = self.get_backend([DB_PATH, {'BACKEND': LOG_PATH, 'TIMEOUT': 0.05}])
+
+        assert isinstance(backend.dispatch(self.entry)[1].error, BackendTimeout)
+        before = threading.active_count()
+        for i in range(3):
+            results = backend.dispatch(self.entry)
+            assert results[0] == (DB_PATH, True, None)
+            assert results[1].success is False
+            assert isinstance(results[1].error, BackendBusy)
+
+        # The hung backend isn't called again, no new threads are started.
+        assert len(calls) == 1
+        assert threading.active_count() == before
+        release.set()
+
+    def test_dispatch_threads_daemon(self):
+        release = threading.Event()
+        flexmock(log.Backend).should_receive('persist').replace_with(
+            lambda entry: release.wait())
+        backend = self.get_backend([{'BACKEND': LOG_PATH, 'TIMEOUT': 0.05}])
+
+        backend.dispatch(self.entry)
+        # Hung workers don't block the interpreter shutdown.
+        threads = [
+            thread for thread in threading.enumerate()
+            if thread.name == 'adminjournal-fanout']
+        assert threads
+        assert all(thread.daemon for thread in threads)
+        release.set()
+
+    def test_dispatch_timeout_recovers(self):
+        release = threading.Event()
+        calls = []
+
+        def persist(entry):
+            calls.append(entry)
+            if len(calls) == 1:
+                release.wait()
+            return True
+
+        flexmock(log.Backend).should_receive('persist').replace_with(persist)
+        backend = self.get_backend([{'BACKEND': LOG_PATH, 'TIMEOUT': 0.05}])
+
+        assert backend.dispatch(self.entry)[0].success is False
+        release.set()
+        backend._running[0].result(1)
+        assert backend.dispatch(self.entry)[0] == (LOG_PATH, True, None)
+
+    def test_apersist(self, run_async):
+        calls = []
+
+        async def apersist(entry):
+            calls.append(entry)
+            return True
+
+        flexmock(db.Backend).should_receive('apersist').replace_with(apersist)
+        flexmock(log.Backend).should_receive('apersist').replace_with(apersist)
+
+        backend = self.get_backend([DB_PATH, {'BACKEND': LOG_PATH, 'TIMEOUT': 0.5}])
+        assert run_async(backend.apersist(self.entry)) is True
+        assert calls == [self.entry, self.entry]
+
+    def test_adispatch_timeout_and_error(self, run_async):
+        async def fail(entries):
+            raise ValueError
+
+        async def hang(entries):
+            await asyncio.sleep(1)
+
+        flexmock(db.Backend).should_receive('apersist_many').replace_with(fail)
+        flexmock(log.Backend).should_receive('apersist_many').replace_with(hang)
+
+        backend = self.get_backend([DB_PATH, {'BACKEND': LOG_PATH, 'TIMEOUT': 0.05}])
+        results = run_async(backend.adispatch([self.entry], many=True))
+
+        assert results[0].success is False
+        assert isinstance(results[0].error, ValueError)
+        assert results[1].success is False
+        assert isinstance(results[1].error, BackendTimeout)
+
+    def test_persist_failed(self):
+        flexmock(db.Backend).should_receive('persist').and_return(False)
+        flexmock(log.Backend).should_receive('persist').and_return(True)
+
+        assert self.get_backend([DB_PATH, LOG_PATH]).persist(self.entry) is False
+
+    def test_get_persistence_backend(self, settings):
+        settings.ADMINJOURNAL_PERSISTENCE_BACKEND = [DB_PATH, LOG_PATH]
+
+        backend = get_persistence_backend()
+        assert isinstance(backend, fanout.Backend)
+        assert backend.backends == [(DB_PATH, None), (LOG_PATH, None)]
+        assert get_persistence_backend() is backend
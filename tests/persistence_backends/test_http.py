@@ -0,0 +1,206 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from adminjournal import entry, models
+from adminjournal.persistence_backends.http import FAILED, Backend, ConnectionPool
+
+
+class Collector(ThreadingMixIn, HTTPServer):
+    """
+    Stand-in journal collector which records the received entries.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super(Collector, self).__init__(('127.0.0.1', 0), CollectorHandler)
+        self.requests = []
+        self.connections = 0
+        self.statuses = []
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/entries/'.format(self.server_address[1])
+
+    @property
+    def entries(self):
+        return [json.loads(line) for body in self.requests for line in body.splitlines()]
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super(CollectorHandler, self).setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        if status == 200:
+            assert self.headers['Content-Encoding'] == 'gzip'
+            self.server.requests.append(gzip.decompress(body).decode('utf-8'))
+
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def collector():
+    server = Collector()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db
+class TestHttpBackend:
+
+    @pytest.fixture(autouse=True)
+    def http_settings(self, settings, collector):
+        settings.ADMINJOURNAL_HTTP_URL = collector.url
+        settings.ADMINJOURNAL_HTTP_FLUSH_INTERVAL = 0
+
+    def get_backend(self, monkeypatch):
+        backend = Backend()
+        monkeypatch.setattr(backend, 'backoff', 0)
+        backend.setup()
+        return backend
+
+    def create_entries(self, user, count):
+        return [entry.Entry(entry.Entry.ACTION_VIEW, user, models.Entry) for i in range(count)]
+
+    def test_missing_url(self, settings):
+        settings.ADMINJOURNAL_HTTP_URL = None
+        with pytest.raises(ImproperlyConfigured):
+            Backend()
+
+    def test_invalid_url(self):
+        with pytest.raises(ValueError):
+            ConnectionPool('ftp://localhost/')
+
+    def test_persist(self, admin_user, collector, monkeypatch):
+        backend = self.get_backend(monkeypatch)
+        assert backend.persist_many(self.create_entries(admin_user, 3))
+        backend.writer.join()
+        assert backend.persist(self.create_entries(admin_user, 1)[0])
+        backend.close()
+
+        assert len(collector.entries) == 4
+        assert collector.entries[0]['user_id'] == admin_user.pk
+        assert collector.entries[0]['action'] == entry.Entry.ACTION_VIEW
+        # The connection is kept open for the following requests.
+        assert collector.connections == 1
+
+    def test_payload_not_encoded(self, admin_user, collector, monkeypatch, settings):
+        settings.ADMINJOURNAL_PAYLOAD_COMPRESS_THRESHOLD = 10
+        backend = self.get_backend(monkeypatch)
+        backend.persist(entry.Entry(
+            entry.Entry.ACTION_VIEW, admin_user, models.Entry,
+            payload={'selected_ids': [str(i) for i in range(1000)]}))
+        backend.close()
+
+        assert collector.entries[0]['payload'] == {
+            'selected_ids': [str(i) for i in range(1000)]}
+
+    def test_batch(self, admin_user, collector, monkeypatch, settings):
+        settings.ADMINJOURNAL_HTTP_FLUSH_INTERVAL = 0.2
+        backend = self.get_backend(monkeypatch)
+        for item in self.create_entries(admin_user, 3):
+            backend.persist(item)
+        backend.close()
+
+        assert len(collector.requests) == 1
+        assert len(collector.entries) == 3
+
+    def test_retry(self, admin_user, collector, monkeypatch):
+        collector.statuses = [503, 503]
+        backend = self.get_backend(monkeypatch)
+        backend.persist(self.create_entries(admin_user, 1)[0])
+        backend.close()
+
+        assert len(collector.entries) == 1
+
+    def test_rejected(self, admin_user, collector, monkeypatch, settings, tmp_path):
+        settings.ADMINJOURNAL_HTTP_SPILL_PATH = str(tmp_path / 'spill.sqlite3')
+        collector.statuses = [400]
+        backend = self.get_backend(monkeypatch)
+
+        backend.persist_many(self.create_entries(admin_user, 2))
+        backend.writer.join()
+        backend.persist(self.create_entries(admin_user, 1)[0])
+        backend.close()
+
+        # The rejected batch is neither retried nor spilled.
+        assert len(collector.entries) == 1
+        assert backend.spill.count() == 0
+
+    def test_spill(self, admin_user, collector, monkeypatch, settings, tmp_path):
+        settings.ADMINJOURNAL_HTTP_SPILL_PATH = str(tmp_path / 'spill.sqlite3')
+        settings.ADMINJOURNAL_HTTP_RETRIES = 1
+        collector.statuses = [503, 503]
+        backend = self.get_backend(monkeypatch)
+
+        backend.persist_many(self.create_entries(admin_user, 2))
+        backend.writer.join()
+        assert collector.entries == []
+        assert backend.spill.count() == 2
+
+        backend.persist(self.create_entries(admin_user, 1)[0])
+        backend.close()
+
+        assert len(collector.entries) == 3
+        assert len(collector.requests) == 2
+
+    def test_spill_rejected(self, admin_user, collector, monkeypatch, settings, tmp_path):
+        settings.ADMINJOURNAL_HTTP_SPILL_PATH = str(tmp_path / 'spill.sqlite3')
+        settings.ADMINJOURNAL_HTTP_BATCH_SIZE = 2
+        backend = self.get_backend(monkeypatch)
+        backend.spill.append(
+            [backend.get_instance(item) for item in self.create_entries(admin_user, 3)])
+        # The new batch is accepted, the first spilled batch rejected.
+        collector.statuses = [200, 422]
+
+        backend.persist(self.create_entries(admin_user, 1)[0])
+        backend.close()
+
+        # The rejected batch doesn't block the following spilled entries.
+        assert len(collector.entries) == 2
+        assert backend.spill.count() == 0
+
+    def test_spill_failed_not_retried(
+        self, admin_user, collector, monkeypatch, settings, tmp_path
+    ):
+        settings.ADMINJOURNAL_HTTP_SPILL_PATH = str(tmp_path / 'spill.sqlite3')
+        backend = self.get_backend(monkeypatch)
+        backend.spill.append(
+            [backend.get_instance(item) for item in self.create_entries(admin_user, 2)])
+        collector.statuses = [200, 503]
+
+        backend.persist(self.create_entries(admin_user, 1)[0])
+        backend.close()
+
+        assert len(collector.entries) == 1
+        assert backend.spill.count() == 2
+        assert collector.statuses == []
+
+    def test_collector_down(self, admin_user, collector, monkeypatch, settings):
+        settings.ADMINJOURNAL_HTTP_RETRIES = 0
+        backend = self.get_backend(monkeypatch)
+        collector.shutdown()
+        collector.server_close()
+
+        instances = [backend.get_instance(item) for item in self.create_entries(admin_user, 1)]
+        assert backend.send(instances) == FAILED
+        backend.close()
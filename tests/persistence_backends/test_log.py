@@ -1,3 +1,5 @@
+import logging
+
 import flexmock
 import pytest
 
@@ -8,6 +10,10 @@ from adminjournal.persistence_backends.log import Backend
 @pytest.mark.django_db
 class TestLogBackend:
 
+    @pytest.fixture(autouse=True)
+    def enable_logger(self, caplog):
+        caplog.set_level(logging.DEBUG, logger='adminjournal')
+
     def test_persist(self, admin_user):
         backend = Backend()
         item = entry.Entry(entry.Entry.ACTION_VIEW, admin_user, admin_user.__class__)
@@ -15,6 +21,13 @@ class TestLogBackend:
             int, str(item), extra={'entry': item})
         assert backend.persist(item)
 
+    def test_apersist(self, admin_user, run_async):
+        backend = Backend()
+        item = entry.Entry(entry.Entry.ACTION_VIEW, admin_user, admin_user.__class__)
+        flexmock(backend.logger).should_receive('log').once().with_args(
+            int, str(item), extra={'entry': item})
+        assert run_async(backend.apersist(item)) is True
+
     @pytest.mark.parametrize('logger,expected', [
         (None, 'adminjournal'),
         ('adminjournal', 'adminjournal'),
@@ -38,3 +51,13 @@ class TestLogBackend:
             'log').once().with_args(expected, str, extra=dict)
 
         assert backend.persist(item)
+
+    def test_persist_disabled(self, admin_user, caplog):
+        caplog.set_level(logging.ERROR, logger='adminjournal')
+        backend = Backend()
+        item = entry.Entry(entry.Entry.ACTION_VIEW, admin_user, admin_user.__class__)
+        flexmock(backend.logger).should_receive('log').never()
+        flexmock(entry.Entry).should_receive('__str__').never()
+
+        assert backend.persist(item)
+        assert item._user_repr is None
@@ -0,0 +1,37 @@
+import pytest
+
+from adminjournal import entry, models
+from adminjournal.persistence_backends.spool import Backend
+
+
+@pytest.mark.django_db
+class TestSpoolBackend:
+
+    @pytest.fixture(autouse=True)
+    def spool_path(self, settings, tmp_path):
+        settings.ADMINJOURNAL_SPOOL_PATH = str(tmp_path / 'spool.sqlite3')
+
+    def test_persist(self, admin_user):
+        backend = Backend()
+        assert backend.persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+
+        assert backend.spool.count() == 1
+        assert models.Entry.objects.exists() is False
+        backend.close()
+
+    def test_persist_many(self, admin_user):
+        backend = Backend()
+        assert backend.persist_many([
+            entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry) for i in range(3)])
+
+        instances = [instance for id_, instance in backend.spool.read(0, 10)]
+        assert [instance.user_id for instance in instances] == [admin_user.pk] * 3
+        backend.close()
+
+    def test_apersist(self, admin_user, run_async):
+        backend = Backend()
+        assert run_async(backend.apersist(
+            entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))) is True
+
+        assert backend.spool.count() == 1
+        backend.close()
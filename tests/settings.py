@@ -9,7 +9,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': 'adminjournal_test',
-    }
+    },
+    # Used by the tests of `adminjournal.routers`.
+    'journal': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': 'adminjournal_journal_test',
+    },
 }
 
 MIDDLEWARE_CLASSES = []
@@ -37,6 +42,12 @@ ROOT_URLCONF = 'tests.urls'
 TEMPLATES = [{
     'BACKEND': 'django.template.backends.django.DjangoTemplates',
     'APP_DIRS': True,
+    'OPTIONS': {
+        'context_processors': [
+            'django.contrib.auth.context_processors.auth',
+            'django.contrib.messages.context_processors.messages',
+        ],
+    },
 }]
 
 ADMINJOURNAL_MODEL_WHITELIST = ('auth.Permission',)
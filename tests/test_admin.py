@@ -1,8 +1,14 @@
+from datetime import timedelta
+
 import pytest
 from django.contrib import admin
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
-from adminjournal.models import Entry
+from adminjournal.models import DailyCount, Entry
+from adminjournal.paginator import JournalPaginator, format_cursor
 
 
 try:
@@ -27,6 +33,18 @@ class TestEntryAdmin:
         assert admin_client.get(
             reverse('admin:adminjournal_entry_delete', args=(obj.pk,))).status_code == 403
 
+    def test_change_view_missing_user(self, admin_client, drop_foreign_key_constraints):
+        drop_foreign_key_constraints()
+        obj = Entry.objects.create(
+            action='VIEW', user_id=999999, user_repr='deleted', content_type_id=999999,
+            content_type_repr='auth.User', object_id='1')
+
+        response = admin_client.get(
+            reverse('admin:adminjournal_entry_change', args=(obj.pk,)))
+
+        assert response.status_code == 200
+        assert 'deleted' in response.content.decode()
+
     def test_lazy_description(self):
         obj = Entry.objects.create(
             action='VIEW',
@@ -46,6 +64,24 @@ class TestEntryAdmin:
         )
         assert self.modeladmin.lazy_description(obj) == "{'foo': 'bar'}"
 
+    def test_lazy_description_encoded_payload(self):
+        obj = Entry.objects.create(
+            action='VIEW',
+            user_repr='admin',
+            content_type_repr='auth.User',
+            payload={'ids': {'__codec__': 'ranges', 'data': [1, 2], 'str': False}}
+        )
+        assert self.modeladmin.lazy_description(obj) == "{'ids': [1, 2]}"
+
+    def test_decoded_payload(self):
+        obj = Entry.objects.create(
+            action='VIEW',
+            user_repr='admin',
+            content_type_repr='auth.User',
+            payload={'ids': {'__codec__': 'ranges', 'data': [1, 3], 'str': True}}
+        )
+        assert self.modeladmin.decoded_payload(obj) == {'ids': ['1', '2', '3']}
+
     def test_lazy_description_no_data(self):
         obj = Entry.objects.create(
             action='VIEW',
@@ -102,3 +138,118 @@ class TestEntryAdmin:
         )
         assert self.modeladmin.object_repr(obj) == (
             '<a href="/admin/auth/user/%s/change/">admin</a>' % admin_user.pk)
+
+
+@pytest.mark.django_db
+class TestEntryAdminFastPagination:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings):
+        settings.ADMINJOURNAL_FAST_PAGINATION = True
+        self.modeladmin = admin.site._registry[Entry]
+        self.url = reverse('admin:adminjournal_entry_changelist')
+        now = timezone.now()
+        self.entries = [
+            Entry.objects.create(
+                action='view', user_repr='admin', content_type_repr='auth.User',
+                timestamp=now - timedelta(minutes=i))
+            for i in range(150)
+        ]
+
+    def test_show_full_result_count(self, settings):
+        assert self.modeladmin.show_full_result_count is False
+        settings.ADMINJOURNAL_FAST_PAGINATION = False
+        assert self.modeladmin.show_full_result_count is True
+
+    def test_changelist(self, admin_client):
+        response = admin_client.get(self.url)
+        assert response.status_code == 200
+
+        cl = response.context_data['cl']
+        assert isinstance(cl.paginator, JournalPaginator)
+        assert cl.paginator.current_page.next_cursor == format_cursor(2, self.entries[99])
+        assert '?cursor={}&amp;p=1'.format(
+            cl.paginator.current_page.next_cursor.replace(':', '%3A').replace('+', '%2B')
+        ) in response.rendered_content
+
+    def test_changelist_cursor(self, admin_client):
+        response = admin_client.get(
+            self.url, {'p': 1, 'cursor': format_cursor(2, self.entries[99])})
+        assert response.status_code == 200
+
+        cl = response.context_data['cl']
+        assert list(cl.result_list) == self.entries[100:]
+        assert cl.paginator.current_page.next_cursor is None
+
+    def test_changelist_invalid_cursor(self, admin_client):
+        response = admin_client.get(self.url, {'p': 1, 'cursor': 'foo'})
+        assert response.status_code == 200
+        assert list(response.context_data['cl'].result_list) == self.entries[100:]
+
+
+@pytest.mark.django_db
+class TestEntryAdminExport:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.url = reverse('admin:adminjournal_entry_export')
+        Entry.objects.create(action='view', user_repr='admin', content_type_repr='auth.user')
+        Entry.objects.create(action='delete', user_repr='admin', content_type_repr='auth.user')
+
+    def test_export_link(self, admin_client):
+        response = admin_client.get(
+            reverse('admin:adminjournal_entry_changelist'), {'action__exact': 'view'})
+        assert '{}?action__exact=view&amp;format=csv'.format(
+            self.url) in response.rendered_content
+
+    def test_export(self, admin_client):
+        response = admin_client.get(self.url, {'action__exact': 'view', 'format': 'csv'})
+
+        assert response.streaming is True
+        assert response['Content-Type'] == 'text/csv'
+        assert response['Content-Disposition'].endswith('.csv"')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        assert len(lines) == 2
+        assert ',view,' in lines[1]
+
+    def test_export_jsonl(self, admin_client):
+        response = admin_client.get(self.url)
+
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert len(b''.join(response.streaming_content).splitlines()) == 2
+
+    def test_export_no_count(self, admin_client):
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(
+                self.url, {'action__exact': 'view', 'q': 'admin', 'format': 'csv'})
+            lines = b''.join(response.streaming_content).splitlines()
+
+        assert len(lines) == 2
+        assert not [query for query in queries if 'COUNT(' in query['sql']]
+
+    def test_export_invalid_filter(self, admin_client):
+        response = admin_client.get(self.url, {'foo': 'bar'})
+        assert response.status_code == 302
+
+    def test_export_permission(self, client, django_user_model):
+        user = django_user_model.objects.create_user('staff', password='staff', is_staff=True)
+        client.force_login(user)
+        assert client.get(self.url).status_code == 403
+
+
+@pytest.mark.django_db
+class TestDailyCountAdmin:
+
+    def test_no_add_permission(self, admin_client):
+        assert admin_client.get(
+            reverse('admin:adminjournal_dailycount_add')).status_code == 403
+
+    def test_changelist(self, admin_client):
+        DailyCount.objects.create(
+            date=timezone.now().date(), user_repr='admin', content_type_repr='auth.User',
+            action='VIEW', count=3)
+
+        response = admin_client.get(reverse('admin:adminjournal_dailycount_changelist'))
+
+        assert response.status_code == 200
+        assert response.context['cl'].result_count == 1
@@ -0,0 +1,87 @@
+import gzip
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from adminjournal.archive import Archive, get_checksum
+from adminjournal.spool import FIELDS
+
+
+def get_row(id_, timestamp, **kwargs):
+    record = {
+        'timestamp': timestamp, 'action': 'view', 'user_id': None, 'user_repr': 'admin',
+        'content_type_id': None, 'content_type_repr': 'auth.user', 'object_id': str(id_),
+        'description': '', 'payload': None,
+    }
+    record.update(kwargs)
+    return (id_,) + tuple(record[field] for field in FIELDS)
+
+
+class TestArchive:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.directory = str(tmp_path)
+        self.archive = Archive(self.directory)
+
+    def test_write(self):
+        segments = self.archive.write([
+            get_row(1, datetime(2019, 5, 1, 10)),
+            get_row(2, datetime(2019, 5, 1, 11), payload={'a': 1}),
+            get_row(4, datetime(2019, 5, 2, 9)),
+        ])
+
+        assert [segment['path'] for segment in segments] == [
+            os.path.join('2019', '05', '01', 'entries-1-2.jsonl.gz'),
+            os.path.join('2019', '05', '02', 'entries-4-4.jsonl.gz'),
+        ]
+        assert segments[0]['date'] == '2019-05-01'
+        assert segments[0]['entries'] == 2
+        assert (segments[0]['first_id'], segments[0]['last_id']) == (1, 2)
+
+        path = os.path.join(self.directory, segments[0]['path'])
+        assert segments[0]['sha256'] == get_checksum(path)
+        with gzip.open(path, 'rt') as f:
+            records = [json.loads(line) for line in f]
+        assert [record['timestamp'] for record in records] == [
+            '2019-05-01T10:00:00', '2019-05-01T11:00:00']
+        assert records[1]['payload'] == {'a': 1}
+
+        assert self.archive.read_manifest() == segments
+        assert not [name for name in os.listdir(os.path.dirname(path)) if name.endswith('.tmp')]
+
+    def test_write_manifest_appended(self):
+        self.archive.write([get_row(1, datetime(2019, 5, 1, 10))])
+        self.archive.write([get_row(2, datetime(2019, 5, 1, 10))])
+
+        assert [segment['first_id'] for segment in self.archive.read_manifest()] == [1, 2]
+
+    def test_write_same_content(self):
+        first = self.archive.write([get_row(1, datetime(2019, 5, 1, 10))])
+        second = self.archive.write([get_row(1, datetime(2019, 5, 1, 10))])
+
+        assert first[0]['sha256'] == second[0]['sha256']
+
+    def test_write_again_listed_once(self):
+        # E.g. the entries were archived but the process stopped before deleting them.
+        rows = [get_row(1, datetime(2019, 5, 1, 10)), get_row(2, datetime(2019, 5, 2, 10))]
+        self.archive.write(rows[:1])
+        Archive(self.directory).write(rows)
+
+        assert [segment['first_id'] for segment in self.archive.read_manifest()] == [1, 2]
+
+    def test_verify(self):
+        segments = self.archive.write([
+            get_row(1, datetime(2019, 5, 1, 10)), get_row(2, datetime(2019, 5, 2, 10))])
+        assert self.archive.verify() == []
+
+        with open(os.path.join(self.directory, segments[0]['path']), 'ab') as f:
+            f.write(b'x')
+        os.remove(os.path.join(self.directory, segments[1]['path']))
+
+        assert self.archive.verify() == [segments[0]['path'], segments[1]['path']]
+
+    def test_read_manifest_empty(self):
+        assert self.archive.read_manifest() == []
@@ -0,0 +1,95 @@
+import pytest
+
+from adminjournal import codec
+
+
+class TestEncodeValue:
+
+    def test_below_threshold(self):
+        assert codec.encode_value(['1', '2', '3'], threshold=100) == ['1', '2', '3']
+
+    def test_ranges(self):
+        ids = [str(i) for i in range(1, 501)] + ['1000', '600', '601']
+        encoded = codec.encode_value(ids, threshold=100)
+
+        assert encoded == {
+            '__codec__': 'ranges', 'data': [1, 500, 600, 601, 1000, 1000], 'str': True}
+        assert codec.decode_value(encoded) == sorted(ids, key=int)
+
+    def test_ranges_int(self):
+        encoded = codec.encode_value(list(range(1000)), threshold=100)
+
+        assert encoded == {'__codec__': 'ranges', 'data': [0, 999], 'str': False}
+        assert codec.decode_value(encoded) == list(range(1000))
+
+    def test_deltas(self):
+        ids = [str(i) for i in range(0, 20000, 3)]
+        encoded = codec.encode_value(ids, threshold=100)
+
+        assert encoded['__codec__'] == 'deltas'
+        assert len(codec._dumps(encoded)) < 200
+        assert codec.decode_value(encoded) == ids
+
+    def test_zlib(self):
+        value = ['foo'] * 1000
+        encoded = codec.encode_value(value, threshold=100)
+
+        assert encoded['__codec__'] == 'zlib'
+        assert codec.decode_value(encoded) == value
+
+    def test_no_canonical_ids(self):
+        value = ['01', '2'] * 500
+        encoded = codec.encode_value(value, threshold=100)
+
+        assert encoded['__codec__'] == 'zlib'
+        assert codec.decode_value(encoded) == value
+
+    def test_not_smaller(self):
+        value = 'abcdefghijklmnopqrstuvwxyz0123456789'
+        assert codec.encode_value(value, threshold=10) == value
+
+    def test_disabled_by_default(self):
+        value = list(range(1000))
+        assert codec.encode_value(value) == value
+        assert codec.encode_payload({'ids': value}) == {'ids': value}
+
+    def test_threshold_setting(self, settings):
+        settings.ADMINJOURNAL_PAYLOAD_COMPRESS_THRESHOLD = 10000
+        value = list(range(1000))
+        assert codec.encode_value(value) == value
+
+        settings.ADMINJOURNAL_PAYLOAD_COMPRESS_THRESHOLD = 100
+        assert codec.encode_value(value)['__codec__'] == 'ranges'
+
+
+class TestDecodeValue:
+
+    @pytest.mark.parametrize('value', [None, 'foo', [1, 2], {'foo': 'bar'}])
+    def test_plain(self, value):
+        assert codec.decode_value(value) == value
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            codec.decode_value({'__codec__': 'foo'})
+
+
+class TestPayload:
+
+    def test_round_trip(self):
+        payload = {
+            'action': 'delete_selected',
+            'selected_ids': [str(i) for i in range(5000)],
+            'filters': {'q': 'foo', 'id__in': ','.join(str(i) for i in range(5000))},
+        }
+        encoded = codec.encode_payload(payload, threshold=1024)
+
+        assert encoded['action'] == 'delete_selected'
+        assert encoded['selected_ids']['__codec__'] == 'ranges'
+        assert encoded['filters']['q'] == 'foo'
+        assert encoded['filters']['id__in']['__codec__'] == 'zlib'
+        assert codec.decode_payload(encoded) == payload
+
+    @pytest.mark.parametrize('payload', [None, {}, {'foo': 'bar'}])
+    def test_plain(self, payload):
+        assert codec.encode_payload(payload) == payload
+        assert codec.decode_payload(payload) == payload
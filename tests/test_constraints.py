@@ -0,0 +1,62 @@
+import django
+import flexmock
+import pytest
+from django.db import connections
+
+from adminjournal import constraints
+from adminjournal.models import Entry
+
+
+def get_foreign_key_columns(using='default'):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        return sorted(
+            constraint['columns'][0]
+            for constraint in connection.introspection.get_constraints(
+                cursor, Entry._meta.db_table).values()
+            if constraint['foreign_key']
+        )
+
+
+class TestHasForeignKeyConstraints:
+
+    def test_default(self):
+        assert constraints.has_foreign_key_constraints('default') is True
+
+    def test_other_database(self):
+        assert constraints.has_foreign_key_constraints('journal') is False
+
+    def test_journal_database(self, settings):
+        settings.ADMINJOURNAL_DATABASE = 'default'
+        assert constraints.has_foreign_key_constraints('default') is False
+
+
+@pytest.mark.django_db
+class TestSyncForeignKeyConstraints:
+
+    def test_migrated(self):
+        assert get_foreign_key_columns() == ['content_type_id', 'user_id']
+
+    def test_set_null(self, django_user_model):
+        user = django_user_model.objects.create(username='deleted')
+        obj = Entry.objects.create(
+            action='view', user=user, user_repr='deleted', content_type_repr='auth.user')
+        user.delete()
+
+        obj.refresh_from_db()
+        assert obj.user_id is None
+
+    def test_sync(self):
+        flexmock(constraints).should_receive('has_foreign_key_constraints').and_return(False)
+        constraints.sync_foreign_key_constraints('default')
+        assert get_foreign_key_columns() == []
+
+        flexmock(constraints).should_receive('has_foreign_key_constraints').and_return(True)
+        constraints.sync_foreign_key_constraints('default')
+        constraints.sync_foreign_key_constraints('default')
+        assert get_foreign_key_columns() == ['content_type_id', 'user_id']
+
+    @pytest.mark.skipif(django.VERSION < (2, 2), reason='Requires TestCase.databases')
+    @pytest.mark.django_db(databases=['default', 'journal'])
+    def test_journal_database(self):
+        assert get_foreign_key_columns('journal') == []
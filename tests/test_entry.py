@@ -6,6 +6,7 @@ import pytest
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 
+from adminjournal import entry as entry_module
 from adminjournal import persistence
 from adminjournal.entry import Entry
 
@@ -95,6 +96,19 @@ class TestEntry:
         entry = Entry(**self.init_kwargs)
         assert entry.user_repr == admin_user.username
 
+    def test_user_repr_memoized(self, admin_user):
+        entry = Entry(**self.init_kwargs)
+        assert entry._user_repr is None
+        assert entry.user_repr == 'admin'
+
+        admin_user.username = 'changed'
+        assert entry.user_repr == 'admin'
+
+    def test_str_memoized(self):
+        entry = Entry(**self.init_kwargs)
+        flexmock(entry.user).should_receive('__str__').and_return('admin').once()
+        assert str(entry) == str(entry)
+
     def test_content_type_repr(self):
         entry = Entry(**self.init_kwargs)
         assert entry.content_type_repr == 'auth.user'
@@ -113,3 +127,59 @@ class TestEntry:
         entry = Entry(**self.init_kwargs)
         flexmock(persistence).should_receive('persist').once().with_args(entry)
         entry.persist()
+
+    def test_apersist(self, run_async):
+        entry = Entry(**self.init_kwargs)
+        calls = []
+
+        async def apersist(entry):
+            calls.append(entry)
+            return True
+
+        flexmock(persistence).should_receive('apersist').replace_with(apersist)
+        assert run_async(entry.apersist()) is True
+        assert calls == [entry]
+
+    def test_slots(self):
+        entry = Entry(**self.init_kwargs)
+        with pytest.raises(AttributeError):
+            entry.foo = 'bar'
+
+    def test_init_cached_lookups(self, django_assert_num_queries):
+        self.init_kwargs['model_class'] = self.init_kwargs['user'].__class__
+        Entry(**self.init_kwargs)
+
+        flexmock(entry_module).should_receive('get_user_model').never()
+        flexmock(entry_module).should_receive('get_content_type_for_model').never()
+        with django_assert_num_queries(0):
+            entry = Entry(**self.init_kwargs)
+
+        assert entry.content_type == ContentType.objects.get(app_label='auth', model='user')
+
+
+@pytest.mark.django_db
+class TestCaches:
+
+    def test_get_content_type(self, admin_user):
+        content_type = entry_module.get_content_type(admin_user)
+        assert content_type == ContentType.objects.get(app_label='auth', model='user')
+        assert entry_module.get_content_type(admin_user.__class__) is content_type
+
+    def test_get_model_class(self, admin_user):
+        content_type = ContentType.objects.get(app_label='auth', model='user')
+        assert entry_module.get_model_class(content_type) is admin_user.__class__
+
+    def test_clear_caches(self, admin_user):
+        entry_module.get_content_type(admin_user)
+
+        entry_module.clear_caches()
+
+        assert entry_module._content_types == {}
+        assert entry_module._user_model is None
+
+    def test_clear_caches_other_setting(self, admin_user, settings):
+        entry_module.get_content_type(admin_user)
+
+        settings.ADMINJOURNAL_FAST_PAGINATION = True
+
+        assert entry_module._content_types != {}
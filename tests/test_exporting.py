@@ -0,0 +1,78 @@
+import io
+from datetime import datetime
+
+import pytest
+
+from adminjournal import exporting, importing
+from adminjournal.models import Entry
+
+
+def create_entry(**kwargs):
+    data = {
+        'action': 'view', 'user_repr': 'admin', 'content_type_repr': 'auth.user',
+        'timestamp': datetime(2019, 5, 1, 10),
+    }
+    data.update(kwargs)
+    return Entry.objects.create(**data)
+
+
+@pytest.mark.django_db
+class TestFilterEntries:
+
+    def test_filters(self):
+        expected = create_entry(action='delete')
+        create_entry(timestamp=datetime(2019, 4, 30, 10))
+        create_entry(timestamp=datetime(2019, 5, 2, 10))
+        create_entry(user_repr='other')
+        create_entry(content_type_repr='auth.group')
+        create_entry(action='add')
+
+        queryset = exporting.filter_entries(
+            Entry.objects.all(),
+            since=datetime(2019, 5, 1),
+            until=datetime(2019, 5, 2),
+            user='admin', content_type='auth.user', actions=['view', 'delete'])
+
+        assert list(queryset) == [expected]
+
+    def test_no_filters(self):
+        create_entry()
+        assert exporting.filter_entries(Entry.objects.all()).count() == 1
+
+
+@pytest.mark.django_db
+class TestDumpRecords:
+
+    def setup(self):
+        self.payload = {'selected_ids': {'__codec__': 'ranges', 'data': [1, 3], 'str': True}}
+
+    def test_iter_records(self):
+        create_entry(object_id='1', payload=self.payload)
+
+        records = list(exporting.iter_records(Entry.objects.all(), chunk_size=1))
+
+        assert records[0]['object_id'] == '1'
+        assert records[0]['payload'] == self.payload
+        assert records[0]['timestamp'] == '2019-05-01T10:00:00'
+
+    def test_iter_records_decode(self):
+        create_entry(payload=self.payload)
+        records = list(exporting.iter_records(Entry.objects.all(), decode=True))
+        assert records[0]['payload'] == {'selected_ids': ['1', '2', '3']}
+
+    @pytest.mark.parametrize('format', [importing.FORMAT_JSONL, importing.FORMAT_CSV])
+    def test_round_trip(self, format):
+        create_entry(object_id='1', payload=self.payload)
+        create_entry(description='Changed, "quoted"')
+        records = list(exporting.iter_records(Entry.objects.order_by('pk')))
+
+        lines = io.StringIO(''.join(exporting.dump_records(
+            [dict(record) for record in records], format)))
+
+        assert list(importing.read_records(lines, format)) == [
+            dict(record, user_id=None, content_type_id=None) for record in records]
+
+    def test_csv_header(self):
+        assert list(exporting.dump_records([], importing.FORMAT_CSV)) == [
+            'timestamp,action,user_id,user_repr,content_type_id,content_type_repr,'
+            'object_id,description,payload\r\n']
@@ -0,0 +1,175 @@
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from django.test import RequestFactory
+from django.urls import reverse
+
+from adminjournal import facets
+from adminjournal.entry import Entry as JournalEntry
+from adminjournal.filters import AppLabelListFilter, UserReprListFilter
+from adminjournal.models import Entry, Facet
+from adminjournal.persistence_backends.db import Backend
+
+
+@pytest.fixture(autouse=True)
+def reset_facets():
+    facets._known.clear()
+    cache.clear()
+    yield
+    facets._known.clear()
+    cache.clear()
+
+
+def create_entry(user_repr='admin', content_type=None):
+    return Entry.objects.create(
+        action='VIEW', user_repr=user_repr, content_type=content_type,
+        content_type_repr='auth.Permission')
+
+
+@pytest.mark.django_db
+class TestFacets:
+
+    def test_record(self):
+        content_type = ContentType.objects.get_for_model(Permission)
+        facets.record([
+            Entry(
+                user_repr='admin', content_type=content_type,
+                content_type_repr='auth.permission'),
+            Entry(user_repr='other'),
+        ])
+
+        assert set(Facet.objects.values_list('kind', 'value')) == {
+            ('user_repr', 'admin'), ('user_repr', 'other'), ('app_label', 'auth')}
+
+    def test_get_facets_no_queries(self, django_assert_num_queries):
+        # E.g. entries loaded from the spool only have the content type id.
+        content_type = ContentType.objects.get_for_model(Permission)
+        instance = Entry(
+            user_repr='admin', content_type_id=content_type.pk,
+            content_type_repr='auth.permission')
+
+        with django_assert_num_queries(0):
+            assert facets.get_facets(instance) == {
+                ('user_repr', 'admin'), ('app_label', 'auth')}
+
+    def test_record_existing(self):
+        Facet.objects.create(kind='user_repr', value='admin')
+
+        facets.record([Entry(user_repr='admin')])
+
+        assert Facet.objects.count() == 1
+
+    def test_record_in_transaction(self, django_assert_num_queries):
+        facets.record([Entry(user_repr='admin')])
+
+        # The facet is known once the transaction is committed.
+        assert facets._known.get() == set()
+        with django_assert_num_queries(3):
+            facets.record([Entry(user_repr='admin')])
+
+    def test_get_values_cached(self, django_assert_num_queries):
+        Facet.objects.create(kind='user_repr', value='b')
+        Facet.objects.create(kind='user_repr', value='a')
+        Facet.objects.create(kind='app_label', value='auth')
+
+        assert facets.get_values(facets.KIND_USER) == ['a', 'b']
+        with django_assert_num_queries(0):
+            assert facets.get_values(facets.KIND_USER) == ['a', 'b']
+
+    def test_persisted_entries_recorded(self, admin_user):
+        Backend().persist(JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+
+        assert set(Facet.objects.values_list('kind', 'value')) == {
+            ('user_repr', str(admin_user)), ('app_label', 'auth')}
+
+    def test_refresh(self):
+        create_entry('admin', ContentType.objects.get_for_model(Permission))
+        create_entry('other')
+        Facet.objects.create(kind='user_repr', value='admin')
+        Facet.objects.create(kind='user_repr', value='stale')
+
+        assert facets.refresh() == (2, 1)
+        assert set(Facet.objects.values_list('kind', 'value')) == {
+            ('user_repr', 'admin'), ('user_repr', 'other'), ('app_label', 'auth')}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFacetsTransaction:
+
+    def test_record_known(self, django_assert_num_queries):
+        facets.record([Entry(user_repr='admin')])
+
+        with django_assert_num_queries(0):
+            facets.record([Entry(user_repr='admin')])
+
+    def test_record_invalidates_cache(self):
+        assert facets.get_values(facets.KIND_USER) == []
+
+        facets.record([Entry(user_repr='admin')])
+
+        assert facets.get_values(facets.KIND_USER) == ['admin']
+
+    def test_record_rollback(self):
+        with pytest.raises(ValueError):
+            with transaction.atomic():
+                facets.record([Entry(user_repr='admin')])
+                raise ValueError
+
+        assert facets._known.get() == set()
+        facets.record([Entry(user_repr='admin')])
+        assert Facet.objects.filter(value='admin').exists()
+
+    def test_known_expires(self, monkeypatch):
+        facets.record([Entry(user_repr='admin')])
+        assert facets._known.get() == {('user_repr', 'admin')}
+
+        Facet.objects.all().delete()
+        monkeypatch.setattr(facets._known, 'expires', 0)
+
+        facets.record([Entry(user_repr='admin')])
+        assert Facet.objects.filter(value='admin').exists()
+
+
+@pytest.mark.django_db
+class TestFacetListFilters:
+
+    def get_filter(self, filter_class, params):
+        request = RequestFactory().get('/', params)
+        return filter_class(request, dict(params), Entry, admin.site._registry[Entry])
+
+    def test_lookups(self):
+        Facet.objects.create(kind='user_repr', value='admin')
+        Facet.objects.create(kind='app_label', value='auth')
+
+        assert self.get_filter(UserReprListFilter, {}).lookup_choices == [
+            ('admin', 'admin')]
+        assert self.get_filter(AppLabelListFilter, {}).lookup_choices == [
+            ('auth', 'auth')]
+
+    def test_queryset(self):
+        entry = create_entry('admin', ContentType.objects.get_for_model(Permission))
+        create_entry('other')
+
+        list_filter = self.get_filter(UserReprListFilter, {'user_repr': 'admin'})
+        assert list(list_filter.queryset(None, Entry.objects.all())) == [entry]
+
+        list_filter = self.get_filter(
+            AppLabelListFilter, {'content_type__app_label': 'auth'})
+        assert list(list_filter.queryset(None, Entry.objects.all())) == [entry]
+
+    def test_queryset_no_value(self):
+        create_entry()
+
+        list_filter = self.get_filter(UserReprListFilter, {})
+        assert list_filter.queryset(None, Entry.objects.all()).count() == 1
+
+    def test_changelist(self, admin_client):
+        create_entry('admin')
+
+        response = admin_client.get(
+            reverse('admin:adminjournal_entry_changelist'), {'user_repr': 'admin'})
+
+        assert response.status_code == 200
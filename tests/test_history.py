@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.template import Context, Template
+from django.utils import timezone
+
+from adminjournal.history import (
+    LogEntryAdapter, get_object_history, get_recent_actions, is_authoritative)
+from adminjournal.models import Entry
+from adminjournal.monkeypatch import patch_admin_site
+
+
+try:
+    from django.urls import reverse
+except ImportError:
+    from django.core.urlresolvers import reverse
+
+
+def create_entry(action, user=None, obj=None, **kwargs):
+    kwargs.setdefault('object_id', str(obj.pk) if obj else None)
+    return Entry.objects.create(
+        action=action, user=user, user_repr=str(user),
+        content_type=ContentType.objects.get_for_model(Permission),
+        content_type_repr='auth.permission', **kwargs)
+
+
+class TestIsAuthoritative:
+
+    def test_default(self):
+        assert is_authoritative() is False
+
+    def test_setting(self, settings):
+        settings.ADMINJOURNAL_AUTHORITATIVE = True
+        assert is_authoritative() is True
+
+    def test_model_admin(self, settings):
+        settings.ADMINJOURNAL_AUTHORITATIVE = True
+        model_admin = admin.ModelAdmin(Permission, admin.site)
+
+        model_admin.adminjournal_authoritative = False
+        assert is_authoritative(model_admin) is False
+
+
+@pytest.mark.django_db
+class TestLogEntryAdapter:
+
+    def test_adapter(self, admin_user):
+        obj = Permission.objects.first()
+        entry = create_entry(
+            'add', admin_user, obj, description='Added.', payload={'object_repr': 'Foo'})
+        adapter = LogEntryAdapter(entry)
+
+        assert adapter.action_time == entry.timestamp
+        assert adapter.user == admin_user
+        assert adapter.object_repr == 'Foo'
+        assert adapter.is_addition() is True
+        assert adapter.is_change() is False
+        assert adapter.is_deletion() is False
+        assert adapter.get_change_message() == 'Added.'
+        assert adapter.get_edited_object() == obj
+        assert adapter.get_admin_url() == '/admin/auth/permission/{}/change/'.format(obj.pk)
+
+    def test_object_repr_fallback(self):
+        entry = create_entry('delete', object_id='23')
+        assert LogEntryAdapter(entry).object_repr == '23'
+
+    def test_admin_url_not_registered(self):
+        entry = create_entry('change', object_id='23')
+        entry.content_type = ContentType.objects.get_for_model(ContentType)
+        assert LogEntryAdapter(entry).get_admin_url() is None
+
+
+@pytest.mark.django_db
+class TestHistory:
+
+    def test_get_object_history(self, admin_user):
+        obj = Permission.objects.first()
+        now = timezone.now()
+        change = create_entry('change', admin_user, obj, timestamp=now)
+        add = create_entry('add', admin_user, obj, timestamp=now - timedelta(days=1))
+        create_entry('view', admin_user, obj)
+        create_entry('change', admin_user, Permission.objects.last())
+
+        assert [action.entry for action in get_object_history(Permission, obj.pk)] == [
+            add, change]
+
+    def test_get_recent_actions(self, admin_user, django_user_model):
+        other = django_user_model.objects.create(username='other')
+        now = timezone.now()
+        entries = [
+            create_entry('add', admin_user, timestamp=now - timedelta(minutes=i))
+            for i in range(3)
+        ]
+        create_entry('view', admin_user)
+        create_entry('change', other)
+
+        assert [action.entry for action in get_recent_actions(2, admin_user)] == entries[:2]
+        assert len(get_recent_actions(10)) == 4
+
+    def test_template_tag(self, admin_user):
+        create_entry('add', admin_user, payload={'object_repr': 'Foo'})
+
+        output = Template(
+            '{% load adminjournal %}{% get_adminjournal_log 10 user=user as admin_log %}'
+            '{% for entry in admin_log %}{{ entry.object_repr }}{% endfor %}'
+        ).render(Context({'user': admin_user}))
+
+        assert output == 'Foo'
+
+
+class TestPatchAdminSite:
+
+    def test_index_template(self, settings):
+        settings.ADMINJOURNAL_AUTHORITATIVE = True
+        site = admin.AdminSite()
+        patch_admin_site(site)
+        assert site.index_template == 'admin/adminjournal/index.html'
+
+    def test_index_template_not_authoritative(self):
+        site = admin.AdminSite()
+        patch_admin_site(site)
+        assert site.index_template is None
+
+
+@pytest.mark.django_db
+def test_admin_index(admin_client, admin_user, monkeypatch):
+    monkeypatch.setattr(admin.site, 'index_template', 'admin/adminjournal/index.html')
+    create_entry('add', admin_user, payload={'object_repr': 'Foo perm'})
+
+    response = admin_client.get(reverse('admin:index'))
+
+    assert response.status_code == 200
+    assert 'Foo perm' in response.content.decode()
@@ -0,0 +1,189 @@
+import gzip
+import io
+import json
+from datetime import date, datetime
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.utils import timezone
+
+from adminjournal import facets, importing
+from adminjournal.models import Entry, Facet
+
+
+def get_record(**kwargs):
+    record = {
+        'timestamp': '2019-05-01T10:00:00+00:00',
+        'action': 'delete',
+        'user_id': None,
+        'user_repr': 'admin',
+        'content_type_id': None,
+        'content_type_repr': 'auth.permission',
+        'object_id': '1',
+        'description': 'Deleted',
+        'payload': {'selected_ids': {'__codec__': 'ranges', 'data': [1, 3], 'str': True}},
+    }
+    record.update(kwargs)
+    return record
+
+
+class TestGetTimestamp:
+
+    def test_naive(self):
+        assert importing.get_timestamp('2019-05-01T10:00:00') == datetime(2019, 5, 1, 10)
+
+    def test_aware(self, settings):
+        settings.TIME_ZONE = 'Europe/Berlin'
+        assert importing.get_timestamp(
+            '2019-05-01T10:00:00+00:00') == datetime(2019, 5, 1, 12)
+
+    def test_use_tz(self, settings):
+        settings.USE_TZ = True
+        settings.TIME_ZONE = 'Europe/Berlin'
+        assert importing.get_timestamp('2019-05-01T12:00:00') == datetime(
+            2019, 5, 1, 10, tzinfo=timezone.utc)
+
+
+class TestReadRecords:
+
+    def test_jsonl(self):
+        lines = io.StringIO('{}\n\n{}\n'.format(
+            json.dumps(get_record()), json.dumps(get_record(object_id=None))))
+        records = list(importing.read_records(lines))
+
+        assert records == [get_record(), get_record(object_id=None)]
+
+    def test_csv(self):
+        lines = io.StringIO(
+            'timestamp,action,user_id,user_repr,content_type_repr,object_id,payload\n'
+            '2019-05-01T10:00:00Z,view,3,admin,auth.user,,"{""a"": 1}"\n')
+        records = list(importing.read_records(lines, importing.FORMAT_CSV))
+
+        assert records[0]['user_id'] == '3'
+        assert records[0]['object_id'] is None
+        assert records[0]['payload'] == {'a': 1}
+
+    @pytest.mark.parametrize('path,expected', [
+        ('entries.jsonl', 'jsonl'),
+        ('entries.jsonl.gz', 'jsonl'),
+        ('entries.csv', 'csv'),
+        ('entries.csv.gz', 'csv'),
+    ])
+    def test_get_format(self, path, expected):
+        assert importing.get_format(path) == expected
+
+    def test_open_input_gzip(self, tmp_path):
+        path = str(tmp_path / 'entries.jsonl.gz')
+        with gzip.open(path, 'wt') as f:
+            f.write('line\n')
+
+        with importing.open_input(path) as lines:
+            assert list(lines) == ['line\n']
+
+
+class TestLineReader:
+
+    def test_read(self):
+        reader = importing.LineReader(['abc\n', 'de\n', 'f\n'])
+        assert reader.read(5) == 'abc\nd'
+        assert reader.read(-1) == 'e\nf\n'
+        assert reader.read(5) == ''
+
+
+@pytest.mark.django_db
+class TestForeignKeyResolver:
+
+    def test_resolve_repr(self, admin_user):
+        record = importing.ForeignKeyResolver().resolve(get_record(user_id=999))
+
+        assert record['user_id'] == admin_user.pk
+        assert record['content_type_id'] == ContentType.objects.get_for_model(Permission).pk
+
+    def test_resolve_id(self, admin_user):
+        record = importing.ForeignKeyResolver().resolve(
+            get_record(user_repr='renamed', user_id=str(admin_user.pk)))
+        assert record['user_id'] == admin_user.pk
+
+    def test_resolve_id_repr_matches(self, admin_user, monkeypatch, django_user_model):
+        # Users with the same representation keep the id of the record.
+        monkeypatch.setattr(django_user_model, '__str__', lambda user: user.first_name)
+        users = [
+            django_user_model.objects.create(username=username, first_name='Jane')
+            for username in ('jane1', 'jane2')
+        ]
+
+        for user in users:
+            record = importing.ForeignKeyResolver().resolve(
+                get_record(user_repr='Jane', user_id=user.pk))
+            assert record['user_id'] == user.pk
+
+    def test_resolve_str(self, admin_user, monkeypatch, django_user_model):
+        # The user repr of the entries is str(user), not the username.
+        monkeypatch.setattr(
+            django_user_model, '__str__', lambda user: 'User {}'.format(user.username))
+
+        record = importing.ForeignKeyResolver().resolve(
+            get_record(user_repr='User admin', user_id=999))
+        assert record['user_id'] == admin_user.pk
+
+    def test_resolve_unknown(self):
+        record = importing.ForeignKeyResolver().resolve(
+            get_record(user_repr='unknown', user_id=999, content_type_repr='foo.bar'))
+
+        assert record['user_id'] is None
+        assert record['content_type_id'] is None
+
+
+@pytest.mark.django_db
+class TestImportRecords:
+
+    def test_copy(self, admin_user):
+        records = [get_record(), get_record(object_id=None, description='', payload=None)]
+
+        assert importing.import_records(records) == 2
+
+        first, second = Entry.objects.order_by('pk')
+        assert first.user == admin_user
+        assert first.content_type == ContentType.objects.get_for_model(Permission)
+        assert first.object_id == '1'
+        assert first.payload == get_record()['payload']
+        assert first.timestamp.date() == date(2019, 5, 1)
+        assert second.object_id is None
+        assert second.description == ''
+        assert second.payload is None
+
+    def test_bulk_create(self, admin_user, monkeypatch):
+        monkeypatch.setattr(connections['default'], 'vendor', 'sqlite')
+        records = [get_record() for i in range(5)]
+
+        assert importing.import_records(records, batch_size=2) == 5
+
+        assert Entry.objects.filter(user=admin_user, object_id='1').count() == 5
+
+    @pytest.mark.parametrize('vendor', ['postgresql', 'sqlite'])
+    def test_naive_timestamp(self, settings, monkeypatch, vendor):
+        settings.USE_TZ = True
+        settings.TIME_ZONE = 'Europe/Berlin'
+        monkeypatch.setattr(connections['default'], 'vendor', vendor)
+
+        importing.import_records([get_record(timestamp='2019-05-01T12:00:00')])
+
+        # Read as UTC in the database, the timestamp is stored in Berlin time.
+        with connections['default'].cursor() as cursor:
+            cursor.execute("SELECT timestamp AT TIME ZONE 'UTC' FROM adminjournal_entry")
+            assert cursor.fetchone()[0] == datetime(2019, 5, 1, 10)
+
+    def test_facets(self, admin_user):
+        Facet.objects.create(kind=facets.KIND_USER, value='other')
+        records = [
+            get_record(),
+            get_record(user_repr='unknown', content_type_repr='foo.bar'),
+        ]
+
+        importing.import_records(records)
+
+        assert set(Facet.objects.values_list('kind', 'value')) == {
+            (facets.KIND_USER, 'admin'), (facets.KIND_USER, 'unknown'),
+            (facets.KIND_USER, 'other'), (facets.KIND_APP_LABEL, 'auth')}
@@ -1,10 +1,26 @@
-from datetime import timedelta
+import gzip
+import json
+from datetime import date, datetime, timedelta
+from io import StringIO
 
+import flexmock
 import pytest
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.utils import timezone
 
-from adminjournal.models import Entry
+from adminjournal import facets, rollup, spool
+from adminjournal.archive import Archive
+from adminjournal.management.commands import clearadminjournal, drainadminjournal
+from adminjournal.models import DailyCount, Entry, Facet, Selection
+
+
+def create_entries(count, days=0):
+    return [
+        Entry.objects.create(
+            action='view', user_repr='admin', content_type_repr='auth.User',
+            timestamp=timezone.now() - timedelta(days=days))
+        for i in range(count)
+    ]
 
 
 @pytest.mark.django_db
@@ -20,3 +36,324 @@ class TestClearAdminjournal:
         call_command('clearadminjournal')
 
         assert Entry.objects.get() == remaining_entry
+
+    def test_expiry_days(self, settings):
+        settings.ADMINJOURNAL_ENTRY_EXPIRY_DAYS = 10
+        create_entries(2, days=11)
+        remaining_entries = create_entries(1, days=9)
+
+        call_command('clearadminjournal', stdout=StringIO())
+
+        assert list(Entry.objects.all()) == remaining_entries
+
+    def test_batch_size(self, django_assert_num_queries):
+        create_entries(5, days=366)
+        remaining_entries = create_entries(1)
+        stdout = StringIO()
+        flexmock(clearadminjournal.selection).should_receive('delete_expired').and_return(0)
+
+        with django_assert_num_queries(3):
+            call_command('clearadminjournal', batch_size=2, stdout=stdout)
+
+        assert list(Entry.objects.all()) == remaining_entries
+        output = stdout.getvalue()
+        assert '2 entries deleted' in output
+        assert '4 entries deleted' in output
+        assert 'Operation successful. 5 entries deleted.' in output
+
+    def test_sleep(self):
+        create_entries(3, days=366)
+        flexmock(clearadminjournal.time).should_receive('sleep').with_args(0.5).once()
+
+        call_command('clearadminjournal', batch_size=2, sleep=0.5, stdout=StringIO())
+
+        assert Entry.objects.exists() is False
+
+    def test_max_runtime(self):
+        create_entries(3, days=366)
+        stdout = StringIO()
+
+        call_command('clearadminjournal', max_runtime=0, stdout=stdout)
+
+        assert Entry.objects.count() == 3
+        assert 'Maximum runtime reached' in stdout.getvalue()
+        assert 'Operation successful. 0 entries deleted.' in stdout.getvalue()
+
+    def test_expired_selections(self):
+        Selection.objects.create(timestamp=timezone.now() - timedelta(days=366))
+        Selection.objects.create()
+        stdout = StringIO()
+
+        call_command('clearadminjournal', stdout=stdout)
+
+        assert Selection.objects.count() == 1
+        assert '1 selections deleted.' in stdout.getvalue()
+
+    def test_expired_selections_retention_policies(self, settings):
+        settings.ADMINJOURNAL_RETENTION_POLICIES = [{'action': 'delete', 'days': 3650}]
+        # Might be referenced by an entry of the delete policy.
+        Selection.objects.create(timestamp=timezone.now() - timedelta(days=366))
+
+        call_command('clearadminjournal', stdout=StringIO())
+
+        assert Selection.objects.count() == 1
+
+    def test_archive(self, tmp_path):
+        expired = create_entries(3, days=366)
+        remaining_entries = create_entries(1)
+        stdout = StringIO()
+
+        call_command(
+            'clearadminjournal', batch_size=2, archive_dir=str(tmp_path), stdout=stdout)
+
+        assert list(Entry.objects.all()) == remaining_entries
+        assert 'Operation successful. 3 entries deleted.' in stdout.getvalue()
+
+        archive = Archive(str(tmp_path))
+        segments = archive.read_manifest()
+        assert sum(segment['entries'] for segment in segments) == 3
+        assert [segment['first_id'] for segment in segments] == [
+            expired[0].pk, expired[2].pk]
+        assert archive.verify() == []
+
+        # The archive can be imported again.
+        call_command(
+            'importadminjournal', *[str(tmp_path / segment['path']) for segment in segments],
+            stdout=StringIO())
+        assert Entry.objects.count() == 4
+
+    def test_archive_deletes_archived(self, tmp_path):
+        create_entries(2, days=366)
+        # Entries which expire while the batch is archived are kept.
+        flexmock(Archive).should_receive('write').replace_with(
+            lambda rows: create_entries(1, days=366))
+
+        call_command('clearadminjournal', archive_dir=str(tmp_path), stdout=StringIO())
+
+        assert Entry.objects.count() == 1
+
+    def test_retention_policies(self, settings):
+        settings.ADMINJOURNAL_RETENTION_POLICIES = [
+            {'action': 'VIEW', 'days': 30},
+            {'action': 'DELETE', 'days': 3650},
+        ]
+        create_entries(2, days=31)
+        remaining_entries = create_entries(1, days=29)
+        remaining_entries.append(Entry.objects.create(
+            action='delete', user_repr='admin', content_type_repr='auth.User',
+            timestamp=timezone.now() - timedelta(days=400)))
+        Entry.objects.create(
+            action='change', user_repr='admin', content_type_repr='auth.User',
+            timestamp=timezone.now() - timedelta(days=400))
+        stdout = StringIO()
+
+        call_command('clearadminjournal', stdout=stdout)
+
+        assert set(Entry.objects.all()) == set(remaining_entries)
+        output = stdout.getvalue()
+        assert 'Policy action=view (30 days): 2 entries deleted.' in output
+        assert 'Policy action=delete (3650 days): 0 entries deleted.' in output
+        assert 'Policy default (365 days): 1 entries deleted.' in output
+        assert 'Operation successful. 3 entries deleted.' in output
+
+    def test_retention_policies_unknown_content_type(self, settings):
+        settings.ADMINJOURNAL_RETENTION_POLICIES = [{'content_type': 'removedapp', 'days': 1}]
+        create_entries(2, days=2)
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command('clearadminjournal', stdout=stdout, stderr=stderr)
+
+        assert Entry.objects.count() == 2
+        assert 'Policy content_type=removedapp (1 days): Unknown content type, skipped.' in (
+            stderr.getvalue())
+        assert 'Operation successful. 0 entries deleted.' in stdout.getvalue()
+
+    def test_delete_batch_empty(self):
+        command = clearadminjournal.Command()
+        queryset = Entry.objects.filter(content_type_id__in=[])
+
+        assert command.delete_batch(queryset, 10) == 0
+
+    def test_retention_policies_dry_run(self, settings):
+        settings.ADMINJOURNAL_RETENTION_POLICIES = [{'action': 'VIEW', 'days': 30}]
+        create_entries(2, days=31)
+        stdout = StringIO()
+
+        call_command('clearadminjournal', dry_run=True, stdout=stdout)
+
+        assert Entry.objects.count() == 2
+        assert stdout.getvalue() == (
+            'Policy action=view (30 days): 2 entries would be deleted.\n'
+            'Policy default (365 days): 0 entries would be deleted.\n'
+            'Dry run. 2 entries would be deleted.\n')
+
+    def test_dry_run(self):
+        create_entries(3, days=366)
+        stdout = StringIO()
+
+        call_command('clearadminjournal', dry_run=True, stdout=stdout)
+
+        assert Entry.objects.count() == 3
+        assert stdout.getvalue() == 'Dry run. 3 entries would be deleted.\n'
+
+
+@pytest.mark.django_db
+class TestRefreshAdminjournalFacets:
+
+    def test_refresh(self):
+        create_entries(1)
+        Facet.objects.create(kind='user_repr', value='stale')
+        stdout = StringIO()
+
+        call_command('refreshadminjournalfacets', stdout=stdout)
+
+        assert list(Facet.objects.values_list('kind', 'value')) == [('user_repr', 'admin')]
+        assert stdout.getvalue() == (
+            'Operation successful. 1 facets created, 1 facets deleted.\n')
+
+
+@pytest.mark.django_db
+class TestRollupAdminjournal:
+
+    def create_count(self, day, count):
+        return DailyCount.objects.create(
+            date=day, user_repr='admin', content_type_repr='auth.User', action='VIEW',
+            count=count)
+
+    def test_latest_day(self):
+        create_entries(2)
+        self.create_count(date.today() - timedelta(days=1), 5)
+        self.create_count(date.today(), 1)
+        stdout = StringIO()
+
+        call_command('rollupadminjournal', stdout=stdout)
+
+        assert sorted(DailyCount.objects.values_list('count', flat=True)) == [2, 5]
+        assert stdout.getvalue() == 'Operation successful. 1 daily counts written.\n'
+
+    def test_empty(self):
+        create_entries(1, days=2)
+        create_entries(1)
+
+        call_command('rollupadminjournal', stdout=StringIO())
+
+        assert DailyCount.objects.count() == 2
+
+    def test_since(self):
+        Entry.objects.create(
+            action='VIEW', user_repr='admin', content_type_repr='auth.User',
+            timestamp=datetime(2019, 1, 2, 10))
+        self.create_count(date(2019, 1, 1), 5)
+
+        call_command('rollupadminjournal', since='2019-01-02', stdout=StringIO())
+
+        assert sorted(DailyCount.objects.values_list('count', flat=True)) == [1, 5]
+
+    def test_since_invalid(self):
+        with pytest.raises(CommandError):
+            call_command('rollupadminjournal', since='yesterday')
+
+    def test_all(self):
+        create_entries(1)
+        self.create_count(date(2019, 1, 1), 5)
+
+        call_command('rollupadminjournal', all=True, stdout=StringIO())
+
+        assert list(DailyCount.objects.values_list('count', flat=True)) == [1]
+
+
+@pytest.mark.django_db
+class TestDrainAdminjournal:
+
+    @pytest.fixture(autouse=True)
+    def spool_path(self, settings, tmp_path):
+        settings.ADMINJOURNAL_SPOOL_PATH = str(tmp_path / 'spool.sqlite3')
+
+    def test_drain(self):
+        spool.get_spool().append([
+            Entry(action='VIEW', user_repr='admin', content_type_repr='auth.User')])
+        stdout = StringIO()
+        call_command('drainadminjournal', stdout=stdout)
+
+        assert Entry.objects.count() == 1
+        assert stdout.getvalue() == 'Operation successful. 1 entries drained.\n'
+
+    def test_interval(self):
+        flexmock(spool).should_receive('drain').and_return(2).and_return(0)
+        flexmock(drainadminjournal.time).should_receive('sleep').with_args(
+            5).and_return(None).and_raise(KeyboardInterrupt)
+        stdout = StringIO()
+
+        with pytest.raises(KeyboardInterrupt):
+            call_command('drainadminjournal', '--interval=5', stdout=stdout)
+
+        assert stdout.getvalue() == '2 entries drained.\n'
+
+
+@pytest.mark.django_db
+class TestImportAdminjournal:
+
+    def test_import(self, tmp_path, settings):
+        settings.ADMINJOURNAL_ROLLUP = True
+        path = tmp_path / 'entries.jsonl'
+        path.write_text(
+            '{"timestamp": "2019-05-02T10:00:00Z", "action": "view", "user_repr": "admin", '
+            '"content_type_repr": "auth.user"}\n'
+            '{"timestamp": "2019-05-01T10:00:00Z", "action": "view", "user_repr": "admin", '
+            '"content_type_repr": "auth.user"}\n')
+        DailyCount.objects.create(
+            date=date(2019, 5, 1), user_repr='admin', content_type_repr='auth.user',
+            action='view', count=3)
+        # Only the facets of the imported entries are recorded.
+        flexmock(facets).should_receive('refresh').never()
+        flexmock(rollup).should_receive('rebuild').never()
+        stdout = StringIO()
+
+        call_command('importadminjournal', str(path), stdout=stdout)
+
+        assert Entry.objects.count() == 2
+        assert set(Facet.objects.values_list('kind', 'value')) == {
+            (facets.KIND_USER, 'admin'), (facets.KIND_APP_LABEL, 'auth')}
+        # The counts of the (expired) entries of the day are kept.
+        assert set(DailyCount.objects.values_list('date', 'count')) == {
+            (date(2019, 5, 1), 4), (date(2019, 5, 2), 1)}
+        assert stdout.getvalue() == (
+            '{0}: 2 entries imported.\n'
+            'Operation successful. 2 entries imported.\n'.format(path))
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command('importadminjournal', str(tmp_path / 'missing.jsonl'))
+
+
+@pytest.mark.django_db
+class TestExportAdminjournal:
+
+    def setup(self):
+        self.entries = create_entries(2) + create_entries(1, days=10)
+
+    def test_export_stdout(self):
+        stdout = StringIO()
+        call_command('exportadminjournal', stdout=stdout)
+
+        lines = stdout.getvalue().splitlines()
+        assert len(lines) == 3
+        # The entries are ordered by time.
+        assert json.loads(lines[0])['timestamp'] == self.entries[2].timestamp.isoformat()
+
+    def test_export_file(self, tmp_path):
+        path = tmp_path / 'entries.csv.gz'
+        stdout = StringIO()
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+
+        call_command(
+            'exportadminjournal', '--output', str(path), '--since', since,
+            '--action', 'view', stdout=stdout)
+
+        with gzip.open(str(path), 'rt') as f:
+            assert len(f.read().splitlines()) == 3
+        assert stdout.getvalue() == 'Operation successful. 2 entries exported.\n'
+
+    def test_invalid_date(self):
+        with pytest.raises(CommandError):
+            call_command('exportadminjournal', '--since', '2019-13-01')
@@ -0,0 +1,48 @@
+import flexmock
+import pytest
+from django.test import RequestFactory
+from django.utils.deprecation import MiddlewareMixin
+
+from adminjournal import entry, models
+from adminjournal.middleware import JournalBufferMiddleware
+from adminjournal.persistence_backends import buffered_db
+from adminjournal.persistence_backends.buffered_db import Backend
+
+
+@pytest.mark.django_db
+class TestJournalBufferMiddleware:
+
+    def test_call(self, admin_user):
+        def view(request):
+            for i in range(2):
+                Backend().persist(
+                    entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            assert models.Entry.objects.exists() is False
+            return 'response'
+
+        middleware = JournalBufferMiddleware(view)
+        assert middleware(RequestFactory().get('/')) == 'response'
+        assert models.Entry.objects.count() == 2
+
+    def test_call_persist_failed(self, admin_user):
+        flexmock(buffered_db.db).should_receive('save_instances').and_raise(ValueError)
+
+        def view(request):
+            Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            return 'response'
+
+        # The entries are dropped, the response is kept.
+        assert JournalBufferMiddleware(view)(RequestFactory().get('/')) == 'response'
+        assert buffered_db._get_state().pending == []
+
+    def test_middleware_mixin(self):
+        assert isinstance(JournalBufferMiddleware(), MiddlewareMixin)
+
+    def test_call_exception(self, admin_user):
+        def view(request):
+            Backend().persist(entry.Entry(entry.Entry.ACTION_VIEW, admin_user, models.Entry))
+            raise ValueError
+
+        with pytest.raises(ValueError):
+            JournalBufferMiddleware(view)(RequestFactory().get('/'))
+        assert models.Entry.objects.count() == 1
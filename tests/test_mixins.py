@@ -1,9 +1,17 @@
 import django
+import flexmock
+import pytest
 from django.contrib import admin
+from django.contrib.admin.models import LogEntry
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from adminjournal.models import Entry
+from adminjournal import persistence
+from adminjournal.mixins import collecting_entries
+from adminjournal.models import Entry, SelectedObject, Selection
+from adminjournal.persistence_backends import db
 
 
 try:
@@ -288,6 +296,32 @@ class TestJournaledModelAdminMixin:
             'selected_ids': [str(obj.pk)]
         }
 
+    def test_log_action_delete_confirmed(self, admin_client, admin_user):
+        objs = [
+            Permission.objects.create(
+                name='Foo perm {}'.format(i),
+                content_type=ContentType.objects.get_by_natural_key('auth', 'user'),
+                codename='foo{}'.format(i)
+            )
+            for i in range(3)
+        ]
+        flexmock(db).should_call('save_instances').once()
+
+        response = admin_client.post(
+            reverse('admin:auth_permission_changelist'),
+            {
+                'action': 'delete_selected',
+                '_selected_action': [obj.pk for obj in objs],
+                'post': 'yes',
+            }
+        )
+        assert response.status_code == 302
+
+        assert list(Entry.objects.order_by('pk').values_list('action', flat=True)) == [
+            'view', 'delete', 'delete', 'delete']
+        assert set(Entry.objects.filter(action='delete').values_list(
+            'object_id', flat=True)) == {str(obj.pk) for obj in objs}
+
     def test_log_action_all(self, admin_client, admin_user):
         obj = Permission.objects.create(
             name='Foo perm',
@@ -318,6 +352,59 @@ class TestJournaledModelAdminMixin:
             'selected_ids': []
         }
 
+    @pytest.mark.parametrize('mode', ['query', 'table'])
+    def test_log_action_all_capture(self, mode, admin_client, settings):
+        settings.ADMINJOURNAL_SELECT_ACROSS_CAPTURE = mode
+        count = Permission.objects.filter(codename__startswith='add_').count()
+
+        response = admin_client.post(
+            reverse('admin:auth_permission_changelist') + '?codename__startswith=add_',
+            {
+                'action': 'delete_selected',
+                '_selected_action': [Permission.objects.first().pk],
+                'select_across': 1,
+                'post': 'yes'
+            }
+        )
+        assert response.status_code == 302
+
+        selection = Entry.objects.get(action='view').payload['selection']
+        assert selection['mode'] == mode
+        assert selection['count'] == count
+        if mode == 'query':
+            assert selection['filters'] == {'codename__startswith': 'add_'}
+        else:
+            assert SelectedObject.objects.filter(selection_id=selection['id']).count() == count
+
+    def test_log_action_all_capture_unconfirmed(self, admin_client, settings):
+        settings.ADMINJOURNAL_SELECT_ACROSS_CAPTURE = 'table'
+
+        response = admin_client.post(
+            reverse('admin:auth_permission_changelist'),
+            {
+                'action': 'delete_selected',
+                '_selected_action': [Permission.objects.first().pk],
+                'select_across': 1
+            }
+        )
+        assert response.status_code == 200
+
+        assert 'selection' not in Entry.objects.get().payload
+        assert not Selection.objects.exists()
+
+    def test_log_action_all_no_capture(self, admin_client):
+        response = admin_client.post(
+            reverse('admin:auth_permission_changelist'),
+            {
+                'action': 'delete_selected',
+                '_selected_action': [Permission.objects.first().pk],
+                'select_across': 1
+            }
+        )
+        assert response.status_code == 200
+
+        assert 'selection' not in Entry.objects.get().payload
+
     def test_log_changelist_invalid(self, admin_client, admin_user):
         response = admin_client.get(
             reverse('admin:auth_permission_changelist'),
@@ -354,3 +441,143 @@ class TestJournaledModelAdminMixin:
         assert entry.object_id is None
         assert entry.description == 'Changelist viewed, filtered.'
         assert entry.payload == {'filters': {'name__icontains': 'oo'}}
+
+
+@pytest.mark.django_db
+class TestCollectingEntries:
+
+    def test_persist_once(self, admin_user):
+        modeladmin = admin.site._registry[Permission]
+        persisted = []
+        flexmock(persistence).should_receive('persist').never()
+        flexmock(persistence).should_receive('persist_many').replace_with(
+            persisted.append).once()
+
+        with collecting_entries():
+            modeladmin.log_to_adminjournal('view', admin_user, 'foo')
+            with collecting_entries():
+                modeladmin.log_to_adminjournal('view', admin_user, 'bar')
+
+        assert [entry.description for entry in persisted[0]] == ['foo', 'bar']
+
+    def test_exception(self, admin_user):
+        modeladmin = admin.site._registry[Permission]
+        flexmock(persistence).should_receive('persist_many').once()
+
+        with pytest.raises(ValueError):
+            with collecting_entries():
+                modeladmin.log_to_adminjournal('view', admin_user, 'foo')
+                raise ValueError
+
+        flexmock(persistence).should_receive('persist').once()
+        modeladmin.log_to_adminjournal('view', admin_user, 'bar')
+
+    def test_exception_persist_failed(self, admin_user):
+        modeladmin = admin.site._registry[Permission]
+        flexmock(persistence).should_receive('persist_many').and_raise(
+            RuntimeError).once()
+
+        # The exception of the action is not masked.
+        with pytest.raises(ValueError):
+            with collecting_entries():
+                modeladmin.log_to_adminjournal('view', admin_user, 'foo')
+                raise ValueError
+
+    def test_persist_failed(self, admin_user):
+        flexmock(persistence).should_receive('persist_many').and_raise(RuntimeError)
+
+        with pytest.raises(RuntimeError):
+            with collecting_entries():
+                pass
+
+
+@pytest.mark.django_db
+class TestJournaledModelAdminMixinAuthoritative:
+
+    @pytest.fixture(autouse=True)
+    def authoritative(self, settings):
+        settings.ADMINJOURNAL_AUTHORITATIVE = True
+
+    def create_permission(self):
+        return Permission.objects.create(
+            name='Foo perm',
+            content_type=ContentType.objects.get_by_natural_key('auth', 'user'),
+            codename='foo'
+        )
+
+    def test_log_change(self, admin_client):
+        obj = self.create_permission()
+        response = admin_client.post(
+            reverse('admin:auth_permission_change', args=(obj.pk,)),
+            {
+                'name': obj.name,
+                'content_type': obj.content_type_id,
+                'codename': 'foo2',
+                'Group_permissions-TOTAL_FORMS': 3,
+                'Group_permissions-INITIAL_FORMS': 0,
+                'Group_permissions-MIN_NUM_FORMS': 0,
+                'Group_permissions-MAX_NUM_FORMS': 0,
+            }
+        )
+        assert response.status_code == 302
+
+        assert LogEntry.objects.exists() is False
+        entry = Entry.objects.get()
+        assert entry.action == 'change'
+        assert entry.payload == {
+            'message': [{'changed': {'fields': ['codename']}}],
+            'object_repr': 'auth | user | Foo perm',
+        }
+
+    def test_log_deletion(self, admin_client):
+        obj = self.create_permission()
+        response = admin_client.post(
+            reverse('admin:auth_permission_delete', args=(obj.pk,)), {'post': 'yes'})
+        assert response.status_code == 302
+
+        assert LogEntry.objects.exists() is False
+        entry = Entry.objects.get()
+        assert entry.action == 'delete'
+        assert entry.payload == {'object_repr': 'auth | user | Foo perm'}
+
+    def test_model_admin_attribute(self, admin_client, settings, monkeypatch):
+        settings.ADMINJOURNAL_AUTHORITATIVE = False
+        monkeypatch.setattr(
+            admin.site._registry[Permission], 'adminjournal_authoritative', True)
+        obj = self.create_permission()
+
+        admin_client.post(
+            reverse('admin:auth_permission_delete', args=(obj.pk,)), {'post': 'yes'})
+
+        assert LogEntry.objects.exists() is False
+        assert Entry.objects.filter(action='delete').count() == 1
+
+    def test_history_view(self, admin_client, admin_user):
+        obj = self.create_permission()
+        modeladmin = admin.site._registry[Permission]
+        modeladmin.log_to_adminjournal(
+            'change', admin_user, 'Changed codename.', obj, object_repr=str(obj))
+        modeladmin.log_to_adminjournal('view', admin_user, 'Object viewed.', obj)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(
+                reverse('admin:auth_permission_history', args=(obj.pk,)))
+
+        assert response.status_code == 200
+        assert [
+            action.get_change_message() for action in response.context['action_list']
+        ] == ['Changed codename.']
+        assert 'Changed codename.' in response.content.decode()
+        # Django's LogEntry is not queried.
+        assert not any(
+            LogEntry._meta.db_table in query['sql'] for query in queries.captured_queries)
+
+    def test_history_view_not_authoritative(self, admin_client, admin_user, settings):
+        settings.ADMINJOURNAL_AUTHORITATIVE = False
+        obj = self.create_permission()
+        admin.site._registry[Permission].log_change(
+            flexmock(user=admin_user), obj, 'Changed codename.')
+
+        response = admin_client.get(reverse('admin:auth_permission_history', args=(obj.pk,)))
+
+        assert list(response.context['action_list']) == [LogEntry.objects.get()]
@@ -23,3 +23,19 @@ class TestEntryModel:
             action='VIEW', user_repr='admin', content_type_repr='auth.User',
             timestamp=timezone.now() - timedelta(minutes=2))
         assert list(Entry.objects.values_list('id', flat=True)) == [obj1.pk, obj2.pk]
+
+    def test_get_user(self, admin_user):
+        obj = Entry.objects.create(
+            action='VIEW', user=admin_user, user_repr='admin', content_type_repr='auth.User')
+        assert obj.get_user() == admin_user
+
+    def test_get_user_content_type_missing(self, drop_foreign_key_constraints):
+        # Foreign keys without constraint (separate journal database) keep the ids.
+        drop_foreign_key_constraints()
+        obj = Entry.objects.create(
+            action='VIEW', user_id=999999, user_repr='admin',
+            content_type_id=999999, content_type_repr='auth.User')
+        obj = Entry.objects.get(pk=obj.pk)
+
+        assert obj.get_user() is None
+        assert obj.get_content_type() is None
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import flexmock
+import pytest
+from django.utils import timezone
+
+from adminjournal import paginator
+from adminjournal.models import Entry
+from adminjournal.paginator import JournalPaginator, format_cursor, parse_cursor
+
+
+def create_entries(count):
+    now = timezone.now()
+    return [
+        Entry.objects.create(
+            action='view', user_repr='admin', content_type_repr='auth.User',
+            timestamp=now - timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+class TestCursor:
+
+    def test_format_cursor(self):
+        obj = Entry(pk=23, timestamp=datetime(2018, 11, 9, 11, 0, 0, tzinfo=timezone.utc))
+        assert format_cursor(2, obj) == '2:23:2018-11-09T11:00:00+00:00'
+
+    def test_parse_cursor(self):
+        assert parse_cursor('2:23:2018-11-09T11:00:00+00:00') == (
+            2, 23, datetime(2018, 11, 9, 11, 0, 0, tzinfo=timezone.utc))
+
+    @pytest.mark.parametrize('value', ['', 'foo', '2:23', 'a:23:2018-11-09', '2:23:foo'])
+    def test_parse_cursor_invalid(self, value):
+        assert parse_cursor(value) is None
+
+
+@pytest.mark.django_db
+class TestJournalPaginator:
+
+    def get_paginator(self, queryset=None, cursor=None):
+        queryset = queryset if queryset is not None else Entry.objects.order_by(
+            '-timestamp', '-pk')
+        return JournalPaginator(queryset, 2, cursor=cursor)
+
+    def test_get_estimated_count(self):
+        create_entries(3)
+        assert paginator.get_estimated_count(Entry, 'default') >= 0
+
+    def test_count_estimated(self):
+        flexmock(paginator).should_receive('get_estimated_count').and_return(200000)
+        assert self.get_paginator().count == 200000
+
+    def test_count_estimate_below_threshold(self):
+        create_entries(3)
+        flexmock(paginator).should_receive('get_estimated_count').and_return(10)
+        assert self.get_paginator().count == 3
+
+    def test_count_filtered(self):
+        create_entries(3)
+        flexmock(paginator).should_receive('get_estimated_count').never()
+        assert self.get_paginator(
+            Entry.objects.filter(action='view').order_by('-timestamp', '-pk')).count == 3
+
+    def test_page(self):
+        entries = create_entries(5)
+
+        page = self.get_paginator().page(2)
+
+        assert page.object_list == entries[2:4]
+        assert page.next_cursor == format_cursor(3, entries[3])
+
+    def test_page_cursor(self, django_assert_num_queries):
+        entries = create_entries(5)
+        instance = self.get_paginator(cursor=parse_cursor(format_cursor(3, entries[3])))
+        instance.count = 5
+
+        with django_assert_num_queries(1):
+            assert instance.page(3).object_list == entries[4:]
+        assert instance.current_page.next_cursor is None
+
+    def test_page_cursor_other_page(self):
+        entries = create_entries(5)
+        instance = self.get_paginator(cursor=parse_cursor(format_cursor(3, entries[0])))
+
+        assert instance.page(2).object_list == entries[2:4]
+
+    def test_page_other_ordering(self):
+        entries = create_entries(5)
+        instance = self.get_paginator(
+            Entry.objects.order_by('timestamp'),
+            cursor=parse_cursor(format_cursor(2, entries[0])))
+
+        page = instance.page(2)
+        assert page.object_list == entries[::-1][2:4]
+        assert page.next_cursor is None
@@ -0,0 +1,214 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+import flexmock
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.utils import timezone
+
+from adminjournal import partitioning
+from adminjournal.models import Entry
+
+
+def convert_table(interval):
+    # Fire pending foreign key checks, the table can't be altered otherwise.
+    with connection.cursor() as cursor:
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+    partitioning.convert_table(connection, interval)
+
+
+def create_entry(timestamp):
+    return Entry.objects.create(
+        action='VIEW', user_repr='admin', content_type_repr='auth.User', timestamp=timestamp)
+
+
+def get_partition(entry):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT tableoid::regclass::text FROM adminjournal_entry WHERE id = %s',
+            [entry.pk]
+        )
+        return cursor.fetchone()[0]
+
+
+class TestPeriods:
+
+    @pytest.mark.parametrize('interval,expected', [
+        ('month', datetime(2018, 11, 1, tzinfo=timezone.utc)),
+        ('week', datetime(2018, 11, 5, tzinfo=timezone.utc)),
+    ])
+    def test_get_period_start(self, interval, expected):
+        value = datetime(2018, 11, 9, 11, 0, 0, tzinfo=timezone.utc)
+        assert partitioning.get_period_start(value, interval) == expected
+
+    @pytest.mark.parametrize('interval,expected', [
+        ('month', datetime(2019, 1, 1, tzinfo=timezone.utc)),
+        ('week', datetime(2018, 12, 8, tzinfo=timezone.utc)),
+    ])
+    def test_get_next_period_start(self, interval, expected):
+        start = datetime(2018, 12, 1, tzinfo=timezone.utc)
+        assert partitioning.get_next_period_start(start, interval) == expected
+
+    @pytest.mark.parametrize('interval,expected', [
+        ('month', 'adminjournal_entry_p201811'),
+        ('week', 'adminjournal_entry_p20181105'),
+    ])
+    def test_get_partition_name(self, interval, expected):
+        start = datetime(2018, 11, 5, tzinfo=timezone.utc)
+        assert partitioning.get_partition_name(start, interval) == expected
+
+    def test_get_interval(self, settings):
+        assert partitioning.get_interval() is None
+
+        settings.ADMINJOURNAL_PARTITION_INTERVAL = 'week'
+        assert partitioning.get_interval() == 'week'
+
+    def test_get_interval_invalid(self, settings):
+        settings.ADMINJOURNAL_PARTITION_INTERVAL = 'day'
+        with pytest.raises(ImproperlyConfigured):
+            partitioning.get_interval()
+
+
+@pytest.mark.django_db
+class TestPartitioning:
+
+    def test_convert_table(self):
+        entry = create_entry(timezone.now() - timedelta(days=400))
+        assert partitioning.is_partitioned(connection) is False
+
+        convert_table('month')
+
+        assert partitioning.is_partitioned(connection) is True
+        partitions = partitioning.get_partitions(connection)
+        assert [name for name, upper_bound in partitions] == ['adminjournal_entry_legacy']
+        assert partitions[0][1] == partitioning.get_next_period_start(
+            partitioning.get_period_start(timezone.now(), 'month'), 'month')
+
+        assert list(Entry.objects.all()) == [entry]
+        assert create_entry(timezone.now()).pk > entry.pk
+        # Entries without a range partition are stored in the default partition.
+        future_entry = create_entry(timezone.now() + timedelta(days=100))
+        assert get_partition(future_entry) == 'adminjournal_entry_default'
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT indexname FROM pg_indexes WHERE tablename = %s', [Entry._meta.db_table])
+            assert {name for name, in cursor.fetchall()} == {
+                'adminjournal_entry_pkey'} | {index.name for index in Entry._meta.indexes}
+
+    def test_create_default_partition(self):
+        convert_table('month')
+        assert partitioning.create_default_partition(connection) is False
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE adminjournal_entry_default')
+        assert partitioning.create_default_partition(connection) is True
+
+    def test_create_partitions(self):
+        convert_table('month')
+
+        created = partitioning.create_partitions(connection, 'month', 2)
+
+        assert len(created) == 2
+        assert [name for name, upper_bound in partitioning.get_partitions(connection)] == [
+            'adminjournal_entry_legacy'] + created
+        assert partitioning.create_partitions(connection, 'month', 2) == []
+        assert len(partitioning.create_partitions(connection, 'month', 3)) == 1
+
+        entry = create_entry(timezone.now() + timedelta(days=35))
+        assert get_partition(entry) == created[0]
+
+    def test_create_partitions_default_entries(self):
+        convert_table('month')
+        entry = create_entry(timezone.now() + timedelta(days=35))
+        assert get_partition(entry) == 'adminjournal_entry_default'
+
+        created = partitioning.create_partitions(connection, 'month', 2)
+
+        assert get_partition(entry) == created[0]
+        assert list(Entry.objects.all()) == [entry]
+
+    def test_drop_expired_partitions(self):
+        create_entry(timezone.now() - timedelta(days=400))
+        convert_table('week')
+        created = partitioning.create_partitions(connection, 'week', 2)
+        remaining_entry = create_entry(timezone.now() + timedelta(days=8))
+
+        dropped = partitioning.drop_expired_partitions(
+            connection, timezone.now() + timedelta(days=7))
+
+        assert [name for name, count in dropped] == ['adminjournal_entry_legacy']
+        partitions = partitioning.get_partitions(connection)
+        assert [name for name, upper_bound in partitions] == created
+        assert list(Entry.objects.all()) == [remaining_entry]
+
+        # Backdated entries can be stored after the legacy partition was dropped.
+        entry = create_entry(timezone.now() - timedelta(days=400))
+        assert get_partition(entry) == 'adminjournal_entry_default'
+
+    def test_clearadminjournal(self, settings):
+        settings.ADMINJOURNAL_PARTITION_INTERVAL = 'week'
+        settings.ADMINJOURNAL_ENTRY_EXPIRY_DAYS = 10
+        convert_table('week')
+        partitioning.create_partitions(connection, 'week', 1)
+        create_entry(timezone.now() - timedelta(days=400))
+        flexmock(partitioning).should_receive('drop_expired_partitions').and_return(
+            [('adminjournal_entry_legacy', 1)]).once()
+        stdout = StringIO()
+
+        call_command('clearadminjournal', stdout=stdout)
+
+        assert Entry.objects.exists() is False
+        assert 'Partition adminjournal_entry_legacy dropped' in stdout.getvalue()
+        assert 'Operation successful. 1 entries deleted.' in stdout.getvalue()
+
+    def test_createadminjournalpartitions(self, settings):
+        settings.ADMINJOURNAL_PARTITION_INTERVAL = 'month'
+        stdout = StringIO()
+
+        call_command('createadminjournalpartitions', count=2, stdout=stdout)
+
+        assert partitioning.is_partitioned(connection) is True
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, 'adminjournal_entry')
+        assert sorted(
+            constraint['columns'] for constraint in constraints.values()
+            if constraint['foreign_key']
+        ) == [['content_type_id'], ['user_id']]
+        assert 'Converted journal table' in stdout.getvalue()
+        assert 'Operation successful. 2 partitions created.' in stdout.getvalue()
+
+    def test_createadminjournalpartitions_default_partition(self, settings):
+        settings.ADMINJOURNAL_PARTITION_INTERVAL = 'month'
+        convert_table('month')
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE adminjournal_entry_default')
+        stdout = StringIO()
+
+        call_command('createadminjournalpartitions', count=1, stdout=stdout)
+
+        assert 'Default partition created.' in stdout.getvalue()
+
+    def test_createadminjournalpartitions_disabled(self):
+        with pytest.raises(CommandError):
+            call_command('createadminjournalpartitions')
+
+    def test_clearadminjournal_archive(self, settings, tmp_path):
+        settings.ADMINJOURNAL_PARTITION_INTERVAL = 'week'
+        settings.ADMINJOURNAL_ENTRY_EXPIRY_DAYS = 10
+        convert_table('week')
+        partitioning.create_partitions(connection, 'week', 1)
+        create_entry(timezone.now() - timedelta(days=400))
+        flexmock(partitioning).should_receive('drop_expired_partitions').and_return(
+            [('adminjournal_entry_legacy', 0)]).once()
+        stdout = StringIO()
+
+        call_command('clearadminjournal', archive_dir=str(tmp_path), stdout=stdout)
+
+        assert Entry.objects.exists() is False
+        assert (tmp_path / 'manifest.jsonl').exists()
+        # The partitions are dropped after their entries were archived.
+        output = stdout.getvalue()
+        assert output.index('1 entries deleted') < output.index('Partition')
@@ -1,9 +1,19 @@
 import flexmock
+import pytest
 
-from adminjournal.persistence import get_persistence_backend, persist
+from adminjournal.persistence import (
+    apersist, apersist_many, close_persistence_backends, get_persistence_backend, persist,
+    persist_many)
 from adminjournal.persistence_backends import db, log
 
 
+@pytest.fixture(autouse=True)
+def reset_backends():
+    close_persistence_backends()
+    yield
+    close_persistence_backends()
+
+
 class TestPersist:
 
     def test_default_backend(self):
@@ -17,6 +27,47 @@ class TestPersist:
         persist(foo, 'adminjournal.persistence_backends.log.Backend')
 
 
+class TestAPersist:
+
+    def test_default_backend(self, run_async):
+        foo = object()
+        calls = []
+
+        async def backend_apersist(entry):
+            calls.append(entry)
+            return True
+
+        flexmock(db.Backend).should_receive('apersist').replace_with(backend_apersist)
+        assert run_async(apersist(foo)) is True
+        assert calls == [foo]
+
+    def test_many_empty(self, run_async):
+        flexmock(db.Backend).should_receive('apersist_many').never()
+        assert run_async(apersist_many([])) is True
+
+
+class TestPersistMany:
+
+    def test_default_backend(self):
+        foo = [object(), object()]
+        flexmock(db.Backend).should_receive('persist_many').once().with_args(foo)
+        persist_many(foo)
+
+    def test_provided_backend(self):
+        foo = [object()]
+        flexmock(log.Backend).should_receive('persist_many').once().with_args(foo)
+        persist_many(foo, 'adminjournal.persistence_backends.log.Backend')
+
+    def test_empty(self):
+        flexmock(db.Backend).should_receive('persist_many').never()
+        assert persist_many([]) is True
+
+    def test_base_backend(self):
+        foo = [object(), object()]
+        flexmock(log.Backend).should_receive('persist').twice().and_return(True)
+        assert log.Backend().persist_many(foo) is True
+
+
 class TestGetPersistenceBackend:
 
     def test_default(self):
@@ -31,3 +82,60 @@ class TestGetPersistenceBackend:
     def test_called_with_path(self, settings):
         assert isinstance(get_persistence_backend(
             'adminjournal.persistence_backends.log.Backend'), log.Backend)
+
+    def test_cached(self):
+        flexmock(db.Backend).should_receive('setup').once()
+        backend = get_persistence_backend()
+        assert get_persistence_backend() is backend
+        assert get_persistence_backend(
+            'adminjournal.persistence_backends.db.Backend') is backend
+
+    def test_setup_loads_backend(self):
+        path = 'adminjournal.persistence_backends.log.Backend'
+        flexmock(db.Backend).should_receive('setup').replace_with(
+            lambda: get_persistence_backend(path)).once()
+
+        assert isinstance(get_persistence_backend(), db.Backend)
+        assert isinstance(get_persistence_backend(path), log.Backend)
+
+    def test_loaded_concurrently(self, monkeypatch):
+        loaded, closed = [], []
+
+        def setup():
+            # Another thread loads the same backend while this one is set up.
+            if not loaded:
+                loaded.append(None)
+                loaded[0] = get_persistence_backend()
+
+        flexmock(db.Backend).should_receive('setup').replace_with(setup)
+        monkeypatch.setattr(db.Backend, 'close', lambda self: closed.append(self))
+
+        backend = get_persistence_backend()
+        assert backend is loaded[0]
+        assert get_persistence_backend() is backend
+        # The instance which lost the race is closed.
+        assert len(closed) == 1 and closed[0] is not backend
+
+    def test_settings_changed(self, settings):
+        backend = get_persistence_backend()
+        flexmock(backend).should_receive('close').once()
+
+        settings.ADMINJOURNAL_BACKEND_LOG_LEVEL = 'WARNING'
+
+        assert get_persistence_backend() is not backend
+
+    def test_settings_changed_unrelated(self, settings):
+        backend = get_persistence_backend()
+        settings.FOO = 'bar'
+        assert get_persistence_backend() is backend
+
+
+class TestClosePersistenceBackends:
+
+    def test_close(self):
+        backend = get_persistence_backend()
+        flexmock(backend).should_receive('close').once()
+
+        close_persistence_backends()
+
+        assert get_persistence_backend() is not backend
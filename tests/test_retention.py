@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+
+from adminjournal import retention
+from adminjournal.models import Entry
+
+
+def create_entry(days, action='view', model='user'):
+    content_type = ContentType.objects.get(app_label='auth', model=model)
+    return Entry.objects.create(
+        timestamp=datetime.now() - timedelta(days=days), action=action, user_repr='admin',
+        content_type=content_type, content_type_repr='auth.{}'.format(model))
+
+
+class TestPolicy:
+
+    def test_str(self):
+        assert str(retention.Policy(30, action='view')) == 'action=view (30 days)'
+        assert str(retention.Policy(90, action='view', content_type='auth.User')) == (
+            'action=view, content_type=auth.user (90 days)')
+        assert str(retention.Policy(365)) == 'default (365 days)'
+
+    def test_get_cutoff(self):
+        now = datetime(2019, 3, 1)
+        assert retention.Policy(30).get_cutoff(now) == datetime(2019, 1, 30)
+
+    @pytest.mark.django_db
+    def test_get_q_content_type(self):
+        user = create_entry(0)
+        create_entry(0, model='group')
+
+        assert list(Entry.objects.filter(
+            retention.Policy(1, content_type='auth.user').get_q())) == [user]
+        assert Entry.objects.filter(
+            retention.Policy(1, content_type='auth').get_q()).count() == 2
+        assert Entry.objects.filter(
+            retention.Policy(1, content_type='unknown').get_q()).exists() is False
+
+
+class TestGetPolicies:
+
+    def test_default(self, settings):
+        settings.ADMINJOURNAL_ENTRY_EXPIRY_DAYS = 10
+
+        policies = retention.get_policies()
+
+        assert [str(policy) for policy in policies] == ['default (10 days)']
+
+    def test_action_lowercase(self, settings):
+        settings.ADMINJOURNAL_RETENTION_POLICIES = [{'action': 'VIEW', 'days': 30}]
+        assert retention.get_policies()[0].action == 'view'
+
+    def test_policies(self, settings):
+        settings.ADMINJOURNAL_RETENTION_POLICIES = [
+            {'action': 'view', 'days': 30},
+            {'action': 'delete', 'content_type': 'auth', 'days': 3650},
+        ]
+
+        policies = retention.get_policies()
+
+        assert [str(policy) for policy in policies] == [
+            'action=view (30 days)',
+            'action=delete, content_type=auth (3650 days)',
+            'default (365 days)',
+        ]
+
+    @pytest.mark.parametrize('options', [
+        {'action': 'view'},
+        {'action': 'view', 'days': -1},
+        {'days': 30},
+        {'action': 'view', 'days': 30, 'unknown': 1},
+        {'action': 'viewed', 'days': 30},
+    ])
+    def test_invalid(self, settings, options):
+        settings.ADMINJOURNAL_RETENTION_POLICIES = [options]
+
+        with pytest.raises(ImproperlyConfigured):
+            retention.get_policies()
+
+
+@pytest.mark.django_db
+class TestGetExpired:
+
+    def test_first_match(self, settings):
+        settings.ADMINJOURNAL_RETENTION_POLICIES = [
+            {'action': 'view', 'content_type': 'auth.group', 'days': 5},
+            {'action': 'view', 'days': 30},
+        ]
+        settings.ADMINJOURNAL_ENTRY_EXPIRY_DAYS = 100
+        group_view = create_entry(10, model='group')
+        user_view = create_entry(40)
+        create_entry(20)
+        change = create_entry(200, action='change')
+        create_entry(40, action='change')
+
+        expired = [
+            (str(policy), list(queryset))
+            for policy, queryset in retention.get_expired(retention.get_policies())
+        ]
+
+        assert expired == [
+            ('action=view, content_type=auth.group (5 days)', [group_view]),
+            ('action=view (30 days)', [user_view]),
+            ('default (100 days)', [change]),
+        ]
+
+    def test_get_partition_cutoff(self):
+        now = datetime(2019, 3, 1)
+        policies = [retention.Policy(30, action='view'), retention.Policy(10)]
+
+        assert retention.get_partition_cutoff(policies, now) == datetime(2019, 1, 30)
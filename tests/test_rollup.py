@@ -0,0 +1,169 @@
+import threading
+import time
+from datetime import date, datetime
+
+import flexmock
+import pytest
+from django.contrib.auth.models import Permission
+from django.db import connection, transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from adminjournal import rollup
+from adminjournal.entry import Entry as JournalEntry
+from adminjournal.models import DailyCount, Entry
+from adminjournal.persistence_backends.db import Backend
+
+
+def create_entry(timestamp, user_repr='admin', action='VIEW'):
+    return Entry.objects.create(
+        timestamp=timestamp, action=action, user_repr=user_repr,
+        content_type_repr='auth.Permission')
+
+
+def get_counts():
+    return set(DailyCount.objects.values_list(
+        'date', 'user_repr', 'content_type_repr', 'action', 'count'))
+
+
+class TestGetDate:
+
+    def test_naive(self):
+        assert rollup.get_date(datetime(2019, 1, 1, 23, 30)) == date(2019, 1, 1)
+
+    @override_settings(USE_TZ=True, TIME_ZONE='Europe/Berlin')
+    def test_aware(self):
+        timestamp = datetime(2019, 1, 1, 23, 30, tzinfo=timezone.utc)
+        assert rollup.get_date(timestamp) == date(2019, 1, 2)
+
+
+@pytest.mark.django_db
+class TestIncrement:
+
+    def test_increment(self):
+        rollup.increment([
+            Entry(timestamp=datetime(2019, 1, 1, 10), action='VIEW', user_repr='admin',
+                  content_type_repr='auth.Permission'),
+            Entry(timestamp=datetime(2019, 1, 1, 11), action='VIEW', user_repr='admin',
+                  content_type_repr='auth.Permission'),
+            Entry(timestamp=datetime(2019, 1, 2, 10), action='ADD', user_repr='other',
+                  content_type_repr='auth.Permission'),
+        ])
+
+        assert get_counts() == {
+            (date(2019, 1, 1), 'admin', 'auth.Permission', 'VIEW', 2),
+            (date(2019, 1, 2), 'other', 'auth.Permission', 'ADD', 1),
+        }
+
+    def test_increment_existing(self, django_assert_num_queries):
+        DailyCount.objects.create(
+            date=date(2019, 1, 1), user_repr='admin', content_type_repr='auth.Permission',
+            action='VIEW', count=5)
+
+        with django_assert_num_queries(1):
+            rollup.increment([
+                Entry(timestamp=datetime(2019, 1, 1, 10), action='VIEW', user_repr='admin',
+                      content_type_repr='auth.Permission'),
+            ])
+
+        assert get_counts() == {(date(2019, 1, 1), 'admin', 'auth.Permission', 'VIEW', 6)}
+
+    def test_increment_nothing(self, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            rollup.increment([])
+
+    def test_persisted_entries_disabled(self, admin_user):
+        Backend().persist(JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+
+        assert DailyCount.objects.exists() is False
+
+    def test_persisted_entries(self, admin_user, settings):
+        settings.ADMINJOURNAL_ROLLUP = True
+
+        Backend().persist(JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+        Backend().persist(JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+
+        assert get_counts() == {
+            (date.today(), str(admin_user), 'auth.permission', JournalEntry.ACTION_VIEW, 2)}
+
+
+@pytest.mark.django_db
+class TestRebuild:
+
+    def test_rebuild(self):
+        create_entry(datetime(2019, 1, 1, 10))
+        create_entry(datetime(2019, 1, 1, 12))
+        create_entry(datetime(2019, 1, 2, 10), action='ADD')
+        DailyCount.objects.create(
+            date=date(2018, 12, 1), user_repr='admin', content_type_repr='auth.Permission',
+            action='VIEW', count=5)
+
+        assert rollup.rebuild() == 2
+        assert get_counts() == {
+            (date(2019, 1, 1), 'admin', 'auth.Permission', 'VIEW', 2),
+            (date(2019, 1, 2), 'admin', 'auth.Permission', 'ADD', 1),
+        }
+
+    def test_rebuild_since(self):
+        create_entry(datetime(2019, 1, 1, 10))
+        create_entry(datetime(2019, 1, 2, 10))
+        create_entry(datetime(2019, 1, 2, 12))
+        DailyCount.objects.create(
+            date=date(2019, 1, 1), user_repr='admin', content_type_repr='auth.Permission',
+            action='VIEW', count=5)
+        DailyCount.objects.create(
+            date=date(2019, 1, 2), user_repr='admin', content_type_repr='auth.Permission',
+            action='VIEW', count=1)
+
+        assert rollup.rebuild(date(2019, 1, 2)) == 1
+        assert get_counts() == {
+            (date(2019, 1, 1), 'admin', 'auth.Permission', 'VIEW', 5),
+            (date(2019, 1, 2), 'admin', 'auth.Permission', 'VIEW', 2),
+        }
+
+    def test_rebuild_per_day(self):
+        create_entry(datetime(2019, 1, 1, 10))
+        create_entry(datetime(2019, 1, 2, 10))
+        create_entry(datetime(2019, 1, 2, 12))
+        # The table is locked for one day at a time.
+        flexmock(rollup).should_call('rebuild_day').with_args(date(2019, 1, 1), str).once()
+        flexmock(rollup).should_call('rebuild_day').with_args(date(2019, 1, 2), str).once()
+
+        assert rollup.rebuild() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrency:
+
+    def test_persisted_entries_atomic(self, admin_user, settings):
+        settings.ADMINJOURNAL_ROLLUP = True
+        flexmock(rollup).should_receive('add_counts').and_raise(ValueError)
+
+        with pytest.raises(ValueError):
+            Backend().persist(JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+
+        assert Entry.objects.exists() is False
+
+    def test_rebuild_waits_for_increments(self, admin_user, settings):
+        settings.ADMINJOURNAL_ROLLUP = True
+        result = []
+
+        def rebuild():
+            try:
+                result.append(rollup.rebuild())
+            finally:
+                connection.close()
+
+        Backend().persist(JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+        with transaction.atomic():
+            Backend().persist(JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+            thread = threading.Thread(target=rebuild)
+            thread.start()
+            # The rebuild waits for the lock until the entry is committed.
+            time.sleep(0.2)
+            assert result == []
+
+        thread.join()
+        assert result == [1]
+        assert get_counts() == {
+            (date.today(), str(admin_user), 'auth.permission', JournalEntry.ACTION_VIEW, 2)}
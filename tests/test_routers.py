@@ -0,0 +1,132 @@
+import django
+import flexmock
+import pytest
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, transaction
+
+from adminjournal import routers
+from adminjournal.entry import Entry as JournalEntry
+from adminjournal.models import Entry, Facet
+from adminjournal.persistence_backends.db import Backend
+from adminjournal.routers import JournalRouter
+
+
+ROUTERS = ['adminjournal.routers.JournalRouter']
+
+
+class TestJournalRouter:
+
+    def test_no_database(self):
+        router = JournalRouter()
+        assert router.db_for_read(Entry) is None
+        assert router.db_for_write(Entry) is None
+        assert router.allow_migrate('default', 'adminjournal') is None
+
+    def test_database(self, settings):
+        settings.ADMINJOURNAL_DATABASE = 'journal'
+        router = JournalRouter()
+
+        assert router.db_for_read(Entry) == 'journal'
+        assert router.db_for_write(Facet) == 'journal'
+        assert router.db_for_write(Permission) is None
+
+    def test_allow_relation(self):
+        router = JournalRouter()
+        assert router.allow_relation(Entry(), Permission()) is True
+        assert router.allow_relation(Permission(), ContentType()) is None
+
+    def test_allow_migrate(self, settings):
+        settings.ADMINJOURNAL_DATABASE = 'journal'
+        router = JournalRouter()
+
+        assert router.allow_migrate('journal', 'adminjournal') is True
+        assert router.allow_migrate('default', 'adminjournal') is False
+        assert router.allow_migrate('default', 'auth') is None
+
+    def test_allow_migrate_read_database(self, settings):
+        settings.ADMINJOURNAL_READ_DATABASE = 'replica'
+        router = JournalRouter()
+
+        assert router.allow_migrate('replica', 'adminjournal') is False
+        assert router.allow_migrate('default', 'adminjournal') is None
+        assert router.allow_migrate('replica', 'auth') is None
+
+    def test_read_database(self, settings):
+        settings.ADMINJOURNAL_DATABASE = 'journal'
+        settings.ADMINJOURNAL_READ_DATABASE = 'replica'
+        flexmock(routers).should_receive('get_replication_lag').never()
+        router = JournalRouter()
+
+        assert router.db_for_read(Entry) == 'replica'
+        assert router.db_for_write(Entry) == 'journal'
+        assert router.db_for_read(Permission) is None
+
+    def test_read_max_lag(self, settings):
+        settings.ADMINJOURNAL_READ_DATABASE = 'replica'
+        settings.ADMINJOURNAL_READ_MAX_LAG = 10
+        router = JournalRouter()
+
+        flexmock(routers).should_receive('get_replication_lag').with_args(
+            'replica').and_return(5.0).and_return(15.0).and_return(None)
+        flexmock(routers.time).should_receive('monotonic').and_return(
+            100).and_return(103).and_return(105).and_return(110)
+
+        assert router.db_for_read(Entry) == 'replica'
+        # The result of the check is kept for `lag_check_interval` seconds.
+        assert router.db_for_read(Entry) == 'replica'
+        assert router.db_for_read(Entry) is None
+        assert router.db_for_read(Entry) is None
+
+    def test_read_max_lag_error(self, settings):
+        settings.ADMINJOURNAL_DATABASE = 'journal'
+        settings.ADMINJOURNAL_READ_DATABASE = 'replica'
+        settings.ADMINJOURNAL_READ_MAX_LAG = 10
+        flexmock(routers).should_receive('get_replication_lag').and_raise(DatabaseError)
+
+        assert JournalRouter().db_for_read(Entry) == 'journal'
+
+
+@pytest.mark.django_db
+class TestGetReplicationLag:
+
+    def test_primary(self):
+        assert routers.get_replication_lag('default') == 0
+
+
+@pytest.mark.skipif(django.VERSION < (2, 2), reason='Requires TestCase.databases')
+@pytest.mark.django_db(databases=['default', 'journal'])
+class TestJournalDatabase:
+
+    @pytest.fixture(autouse=True)
+    def journal_database(self, settings, drop_foreign_key_constraints):
+        settings.ADMINJOURNAL_DATABASE = 'journal'
+        settings.DATABASE_ROUTERS = ROUTERS
+        drop_foreign_key_constraints('journal')
+
+    def test_persist(self, admin_user):
+        Backend().persist(JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+
+        assert Entry.objects.using('default').exists() is False
+        entry = Entry.objects.get()
+        assert entry.user == admin_user
+        assert entry.content_type == ContentType.objects.get_for_model(Permission)
+
+    def test_persist_rollback(self, admin_user):
+        with pytest.raises(ValueError):
+            with transaction.atomic():
+                Backend().persist(
+                    JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+                raise ValueError
+
+        # The entry was written outside of the transaction of the default database.
+        assert Entry.objects.count() == 1
+
+    def test_changelist(self, admin_client, admin_user):
+        Backend().persist(JournalEntry(JournalEntry.ACTION_VIEW, admin_user, Permission))
+
+        response = admin_client.get(
+            '/admin/adminjournal/entry/', {'content_type__app_label': 'auth'})
+
+        assert response.status_code == 200
+        assert response.context['cl'].result_count == 1
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from adminjournal import selection
+from adminjournal.models import SelectedObject, Selection
+
+
+@pytest.mark.django_db
+class TestCapture:
+
+    def test_query(self, django_assert_num_queries):
+        queryset = Permission.objects.filter(codename__startswith='add_')
+
+        with django_assert_num_queries(1):
+            captured = selection.capture(queryset, {'q': 'add'}, mode='query')
+
+        assert captured == {'mode': 'query', 'filters': {'q': 'add'}, 'count': queryset.count()}
+
+    def test_setting(self, settings):
+        settings.ADMINJOURNAL_SELECT_ACROSS_CAPTURE = 'query'
+        assert selection.capture(Permission.objects.all(), {})['mode'] == 'query'
+
+    def test_table(self):
+        queryset = Permission.objects.filter(codename__startswith='add_')
+
+        captured = selection.capture(queryset, {'q': 'add'}, mode='table')
+
+        obj = Selection.objects.get()
+        assert captured == {'mode': 'table', 'id': str(obj.pk), 'count': queryset.count()}
+        assert obj.count == queryset.count()
+        assert set(selection.get_object_ids(obj.pk)) == {
+            str(pk) for pk in queryset.values_list('pk', flat=True)}
+
+    def test_table_no_python_lists(self):
+        queryset = Permission.objects.order_by('name')
+
+        with CaptureQueriesContext(connection) as queries:
+            captured = selection.capture(queryset, {}, mode='table')
+
+        assert captured['count'] == queryset.count()
+        # The ids are copied by a single INSERT ... SELECT, never fetched.
+        statements = [
+            query['sql'] for query in queries.captured_queries
+            if 'auth_permission' in query['sql']
+        ]
+        assert len(statements) == 1
+        assert statements[0].startswith('INSERT INTO "adminjournal_selectedobject"')
+
+
+@pytest.mark.django_db
+class TestDeleteExpired:
+
+    def test_delete_expired(self):
+        expired = Selection.objects.create(timestamp=timezone.now() - timedelta(days=2))
+        SelectedObject.objects.create(selection=expired, object_id='1')
+        remaining = Selection.objects.create()
+        SelectedObject.objects.create(selection=remaining, object_id='2')
+
+        assert selection.delete_expired(timezone.now() - timedelta(days=1)) == 1
+
+        assert list(Selection.objects.all()) == [remaining]
+        assert list(selection.get_object_ids(remaining.pk)) == ['2']
+        assert SelectedObject.objects.count() == 1
@@ -0,0 +1,124 @@
+import threading
+
+import flexmock
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from adminjournal import spool
+from adminjournal.entry import Entry as JournalEntry
+from adminjournal.models import Entry, SpoolCursor
+from adminjournal.persistence_backends.db import Backend
+
+
+def create_instances(user, count):
+    return [
+        Backend().get_instance(JournalEntry(
+            JournalEntry.ACTION_VIEW, user, Entry, payload={'index': i}))
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def journal_spool(tmp_path):
+    journal_spool = spool.Spool(str(tmp_path / 'spool.sqlite3'))
+    yield journal_spool
+    journal_spool.close()
+
+
+@pytest.mark.django_db
+class TestSpool:
+
+    def test_dump_load_instance(self, admin_user):
+        instance = create_instances(admin_user, 1)[0]
+        loaded = spool.load_instance(spool.dump_instance(instance))
+
+        for field in spool.FIELDS:
+            assert getattr(loaded, field) == getattr(instance, field)
+        assert loaded.pk is None
+
+    def test_append_read_delete(self, admin_user, journal_spool):
+        journal_spool.append(create_instances(admin_user, 3))
+        assert journal_spool.count() == 3
+
+        rows = journal_spool.read(1, 10)
+        assert [id_ for id_, instance in rows] == [2, 3]
+        assert [instance.payload for id_, instance in rows] == [{'index': 1}, {'index': 2}]
+
+        assert journal_spool.delete(2) == 2
+        assert journal_spool.count() == 1
+
+    def test_ids_not_reused(self, admin_user, journal_spool):
+        journal_spool.append(create_instances(admin_user, 2))
+        journal_spool.delete(2)
+        journal_spool.append(create_instances(admin_user, 1))
+
+        assert [id_ for id_, instance in journal_spool.read(0, 10)] == [3]
+
+    def test_uid(self, journal_spool, tmp_path):
+        uid = journal_spool.uid
+        assert spool.Spool(journal_spool.path).uid == uid
+        assert spool.Spool(str(tmp_path / 'other.sqlite3')).uid != uid
+
+    def test_append_threads(self, admin_user, journal_spool):
+        instances = create_instances(admin_user, 10)
+        threads = [
+            threading.Thread(target=journal_spool.append, args=(instances,))
+            for i in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert journal_spool.count() == 50
+
+    def test_get_spool(self, settings):
+        settings.ADMINJOURNAL_SPOOL_PATH = '/tmp/spool.sqlite3'
+        assert spool.get_spool().path == '/tmp/spool.sqlite3'
+
+    def test_get_spool_missing_path(self):
+        with pytest.raises(ImproperlyConfigured):
+            spool.get_spool()
+
+
+@pytest.mark.django_db
+class TestDrain:
+
+    def test_drain(self, admin_user, journal_spool):
+        journal_spool.append(create_instances(admin_user, 5))
+
+        assert spool.drain(journal_spool, batch_size=2) == 5
+
+        assert sorted(Entry.objects.values_list('payload__index', flat=True)) == [
+            0, 1, 2, 3, 4]
+        assert Entry.objects.filter(user=admin_user).count() == 5
+        assert SpoolCursor.objects.get(spool=journal_spool.uid).position == 5
+        assert journal_spool.count() == 0
+
+    def test_drain_deleted_user(self, journal_spool, django_user_model):
+        user = django_user_model.objects.create(username='deleted')
+        journal_spool.append(create_instances(user, 2))
+        user.delete()
+
+        assert spool.drain(journal_spool) == 2
+
+        assert list(Entry.objects.values_list('user_id', 'user_repr')) == [
+            (None, 'deleted'), (None, 'deleted')]
+        assert Entry.objects.filter(content_type__isnull=False).count() == 2
+
+    def test_drain_empty(self, journal_spool):
+        assert spool.drain(journal_spool) == 0
+        assert Entry.objects.exists() is False
+
+    def test_drain_replay(self, admin_user, journal_spool):
+        journal_spool.append(create_instances(admin_user, 3))
+        # The spooled entries are kept if the process stops after the commit.
+        flexmock(journal_spool).should_receive('delete').and_raise(KeyboardInterrupt)
+
+        with pytest.raises(KeyboardInterrupt):
+            spool.drain(journal_spool)
+
+        flexmock(journal_spool).should_call('delete').once()
+        assert spool.drain(journal_spool) == 0
+        assert Entry.objects.count() == 3
+        assert journal_spool.count() == 0